@@ -0,0 +1,184 @@
+"""
+Prueba de carga de la API (POST /scan) contra la granja web local (benchmarks/web_farm.py).
+
+La API corre con uvicorn en un proceso aparte, como en producción, y `--clients`
+clientes le envían peticiones sin pausa durante `--duration` segundos, repartidas
+entre `--sites` sitios de la granja (los sitios se repiten: conexiones, DNS y caché
+se reutilizan como en un servicio real). Se reporta peticiones/s, latencia
+p50/p95/p99, la latencia de la primera petición (arranque en frío), errores y el
+CPU de la API por petición (Linux). Con pocos núcleos la granja y los clientes
+compiten con la API y las peticiones/s varían mucho entre ejecuciones; el CPU por
+petición es la métrica estable (capacidad ≈ 1000 / cpu_ms_per_request por núcleo).
+
+Uso:
+    poetry run python benchmarks/api_load_bench.py --duration 20 --clients 64 -o load.json
+    poetry run python benchmarks/api_load_bench.py --env HUNTER_SCAN_CACHE=/tmp/cache.sqlite
+    poetry run python benchmarks/api_load_bench.py --baseline load.json --tolerance 0.15
+
+Con `--baseline` termina con código 1 si peticiones/s, p99 o CPU por petición empeoran
+más de la tolerancia.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import httpx
+
+from web_farm import FarmConfig, WebFarm
+
+# Métricas comparadas con la línea base: +1 si más es mejor, -1 si menos es mejor
+METRICS = {"requests_per_sec": +1, "p99_ms": -1, "cpu_ms_per_request": -1}
+
+def _cpu_seconds(pid: int) -> float:
+    """CPU (usuario + sistema) consumido por el proceso `pid`; 0 fuera de Linux."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return 0.0
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+def start_api(port: int, env: Dict[str, str]) -> subprocess.Popen:
+    environment = {**os.environ, "HUNTER_JOB_STORE": os.path.join(tempfile.mkdtemp(), "jobs.sqlite"), **env}
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend_hunter.infrastructure.api.main:app",
+         "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        env=environment,
+    )
+
+async def wait_ready(base_url: str, timeout: float = 30.0) -> float:
+    """Espera a /health y devuelve los segundos que tardó en arrancar."""
+    start = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.perf_counter() - start < timeout:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.05)
+    raise RuntimeError(f"La API no arrancó en {base_url}")
+
+async def load(base_url: str, urls: List[str], clients: int, duration: float, api_pid: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    first_ms = 0.0
+    cursor = 0
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        # Primera petición sola: lo que paga el primer usuario tras un arranque
+        start = time.perf_counter()
+        await client.post("/scan", json={"url": urls[-1]})
+        first_ms = (time.perf_counter() - start) * 1000
+
+        deadline = time.perf_counter() + duration
+
+        async def one_client() -> None:
+            nonlocal cursor, errors
+            while time.perf_counter() < deadline:
+                url = urls[cursor % len(urls)]
+                cursor += 1
+                start = time.perf_counter()
+                try:
+                    response = await client.post("/scan", json={"url": url})
+                    failed = response.status_code != 200
+                except httpx.HTTPError:
+                    failed = True
+                latencies.append(time.perf_counter() - start)
+                errors += failed
+
+        started, cpu = time.perf_counter(), _cpu_seconds(api_pid)
+        await asyncio.gather(*(one_client() for _ in range(clients)))
+        elapsed, cpu = time.perf_counter() - started, _cpu_seconds(api_pid) - cpu
+
+    percentiles = statistics.quantiles(sorted(latencies), n=100)
+    return {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 2),
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentiles[49] * 1000, 1),
+        "p95_ms": round(percentiles[94] * 1000, 1),
+        "p99_ms": round(percentiles[98] * 1000, 1),
+        "first_request_ms": round(first_ms, 1),
+        "cpu_ms_per_request": round(cpu / len(latencies) * 1000, 2),
+        "errors": errors,
+    }
+
+def main():
+    cli = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cli.add_argument("--sites", type=int, default=100, help="Sitios distintos de la granja entre los que se reparten las peticiones")
+    cli.add_argument("--clients", "-c", type=int, default=64, help="Clientes simultáneos")
+    cli.add_argument("--duration", "-d", type=float, default=20.0, help="Segundos de carga")
+    cli.add_argument("--latency-ms", type=float, default=FarmConfig.latency_ms)
+    cli.add_argument("--farm-port", type=int, default=8920)
+    cli.add_argument("--api-port", type=int, default=8930)
+    cli.add_argument("--single-host", action="store_true", help="Todos los sitios en 127.0.0.1 (sistemas sin 127.0.0.0/8)")
+    cli.add_argument("--env", action="append", default=[], metavar="CLAVE=VALOR", help="Variables HUNTER_* para la API")
+    cli.add_argument("--output", "-o", default="load-results.json")
+    cli.add_argument("--baseline", help="JSON de una ejecución anterior con el que comparar")
+    cli.add_argument("--tolerance", type=float, default=0.15, help="Empeoramiento relativo tolerado (0.15 = 15%%)")
+    args = cli.parse_args()
+
+    env = dict(item.split("=", 1) for item in args.env)
+    # Sin errores ni páginas grandes: se mide la API, no los casos raros de la granja
+    config = FarmConfig(
+        sites=args.sites, latency_ms=args.latency_ms, error_rate=0.0, large_rate=0.0,
+        single_host=args.single_host,
+    )
+    base_url = f"http://127.0.0.1:{args.api_port}"
+    with WebFarm(config, args.farm_port) as farm:
+        api = start_api(args.api_port, env)
+        try:
+            startup = asyncio.run(wait_ready(base_url))
+            metrics = asyncio.run(load(base_url, farm.urls(), args.clients, args.duration, api.pid))
+        finally:
+            api.terminate()
+            api.wait()
+    metrics["startup_ms"] = round(startup * 1000, 1)
+
+    result = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "sites": args.sites,
+        "clients": args.clients,
+        "env": env,
+        "load": metrics,
+    }
+    print(
+        f"{metrics['requests_per_sec']:8.1f} pet/s  p50 {metrics['p50_ms']:7.1f} ms  p95 {metrics['p95_ms']:7.1f} ms"
+        f"  p99 {metrics['p99_ms']:7.1f} ms  CPU {metrics['cpu_ms_per_request']:5.2f} ms/pet"
+        f"  primera {metrics['first_request_ms']:7.1f} ms  arranque {metrics['startup_ms']:7.1f} ms  errores {metrics['errors']}"
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"Resultados guardados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            before = json.load(f)["load"]
+        regressions = []
+        for metric, direction in METRICS.items():
+            old, new = before.get(metric), metrics[metric]
+            change = (new - old) / old if old else 0.0
+            if change * direction < -args.tolerance:
+                regressions.append(f"{metric}: {old} -> {new} ({change:+.0%})")
+        if regressions:
+            print(f"\nRegresiones (> {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"Sin regresiones frente a {args.baseline} (tolerancia {args.tolerance:.0%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Micro-benchmark del FingerprintEngine: coste de detección frente al número de reglas.
+
+Añade N reglas sintéticas (cabeceras, cookies, meta y URLs) a las reglas por defecto
+y mide el tiempo de `TechDetector.detect` sobre un documento ya parseado.
+
+Uso:
+    poetry run python benchmarks/fingerprint_bench.py [--rules 0 100 1000] [--repeat N]
+"""
+import argparse
+import statistics
+import time
+from typing import List
+
+from backend_hunter.domain.entities import Company
+from backend_hunter.infrastructure.analysis.document import ParsedDocument
+from backend_hunter.infrastructure.analysis.fingerprint_db import load_database
+from backend_hunter.infrastructure.analysis.fingerprints import Fingerprint, FingerprintEngine
+from backend_hunter.infrastructure.analysis.tech_detector import TechDetector
+
+HEADERS = {
+    "server": "nginx",
+    "x-powered-by": "PHP/8.2",
+    "set-cookie": "PHPSESSID=abc; path=/\nwp-settings-1=x; path=/",
+}
+
+def sample_page(size: int = 2000) -> str:
+    rows = "".join(
+        f'<div><a href="/wp-content/uploads/{i}.jpg">Foto {i}</a><a href="/p/{i}.php?id={i}">ver</a></div>'
+        for i in range(size)
+    )
+    return (
+        '<html><head><meta name="generator" content="WordPress 6.4">'
+        '<link rel="stylesheet" href="/wp-content/themes/x/style.css"></head>'
+        f"<body>{rows}</body></html>"
+    )
+
+def synthetic_rules(n: int) -> List[Fingerprint]:
+    rules = []
+    for i in range(n):
+        kind = i % 4
+        if kind == 0:
+            rules.append(Fingerprint(f"synthetic-header-{i}", "header", key="server", contains=f"srv{i}/"))
+        elif kind == 1:
+            rules.append(Fingerprint(f"synthetic-cookie-{i}", "cookie", contains=f"sess{i}_id"))
+        elif kind == 2:
+            rules.append(Fingerprint(f"synthetic-meta-{i}", "meta", key="generator", contains=f"cms{i} "))
+        else:
+            rules.append(Fingerprint(f"synthetic-url-{i}", "url", contains=f"/assets/lib{i}/"))
+    return rules
+
+def main():
+    cli = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cli.add_argument("--rules", type=int, nargs="+", default=[0, 100, 1000, 5000])
+    cli.add_argument("--repeat", type=int, default=20)
+    args = cli.parse_args()
+
+    base_rules = load_database().fingerprints
+    html = sample_page()
+    document = ParsedDocument(html)
+    print(f"Documento: {len(html) / 1024:.0f} KB, {len(document.elements)} elementos\n")
+
+    for extra in args.rules:
+        start = time.perf_counter()
+        detector = TechDetector(FingerprintEngine(base_rules + synthetic_rules(extra)))
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            detector.detect(html, HEADERS, Company(url="https://example.com"), document)
+            samples.append(time.perf_counter() - start)
+        total = len(detector.engine.fingerprints)
+        print(
+            f"{total:>6} reglas  detección {statistics.median(samples) * 1000:7.2f} ms"
+            f"  (compilación {compile_ms:7.1f} ms)"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Micro-benchmark del LocationDetector por niveles frente al anterior.
+
+El anterior parseaba el documento completo, unía todo el texto visible y buscaba
+`\\b07\\d{3}\\b` en él: cualquier 07xxx contaba, también teléfonos, precios o
+referencias. El actual busca candidatos en el HTML crudo y solo confirma (con
+fuentes estructuradas o contexto de dirección) las páginas que los tienen.
+
+Se miden dos casos del anterior: con parseo (páginas legales del rastreo, que solo
+se analizan para la ubicación) y con el documento ya parseado (portada, el parseo
+se comparte con TechDetector y solo cuesta el texto).
+
+Uso:
+    poetry run python benchmarks/location_bench.py [DIRECTORIO_CON_HTML] [--repeat N]
+
+Sin directorio se usa un corpus sintético etiquetado, con la proporción típica de
+una lista nacional: la mayoría de páginas sin ningún 07xxx, algunas direcciones de
+Baleares (pie, JSON-LD, <address>, microdatos) y trampas (teléfono, precio,
+referencia, atributos y scripts). Con directorio solo se comparan tiempos y
+cuántas páginas da por buenas cada versión.
+"""
+import argparse
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from backend_hunter.infrastructure.analysis.document import ParsedDocument
+from backend_hunter.infrastructure.analysis.fingerprint_db import load_database
+from backend_hunter.infrastructure.analysis.location_detector import LocationDetector
+
+# (html, CP esperado o None)
+Page = Tuple[str, Optional[str]]
+
+def _page(body: str, rows: int, head: str = "") -> str:
+    filler = "".join(
+        f'<div class="item"><a href="/p/{i}">Producto {i}</a><p>Descripción del producto {i}</p></div>'
+        for i in range(rows)
+    )
+    return (
+        f'<html><head><title>Empresa</title><meta name="generator" content="WordPress 6.4">{head}</head>'
+        f"<body>{filler}{body}</body></html>"
+    )
+
+def synthetic_corpus() -> List[Page]:
+    balearic = [
+        ("<footer>Carrer de Sant Miquel 1, 07002 Palma</footer>", "", "07002"),
+        ("<address>Avinguda d'Espanya 12<br>07800 Eivissa</address>", "", "07800"),
+        ("<p>Contacto</p>", '<script type="application/ld+json">{"@type": "LocalBusiness", '
+         '"address": {"@type": "PostalAddress", "postalCode": "07701"}}</script>', "07701"),
+        ('<div itemscope><span itemprop="postalCode">07400</span> Alcúdia</div>', "", "07400"),
+        ("<p>Oficinas: C/ Aragó 12, 07005</p>", "", "07005"),
+    ]
+    traps = [
+        "<footer>Calle Mayor 1, 28013 Madrid · Tel. 07123 456 789</footer>",
+        "<p>Precio especial: 07450 €</p><footer>Valencia 46001</footer>",
+        "<p>Ref. 07123 — Pedido enviado</p>",
+        '<div data-sku="07881">Oferta</div><footer>Sevilla 41001</footer>',
+        "<script>var build = 07312;</script><footer>Bilbao 48001</footer>",
+    ]
+    others = ["<footer>Calle Gran Vía 28, 28013 Madrid</footer>", "<footer>Barcelona 08001</footer>"]
+
+    corpus: List[Page] = []
+    for rows in (20, 200, 2000):
+        for i in range(16):
+            corpus.append((_page(others[i % len(others)], rows), None))
+        for body, head, code in balearic:
+            corpus.append((_page(body, rows, head), code))
+        for body in traps:
+            corpus.append((_page(body, rows), None))
+    return corpus
+
+def load_corpus(directory: Path) -> List[Page]:
+    files = sorted(directory.glob("**/*.htm*"))
+    if not files:
+        raise SystemExit(f"No se encontraron páginas .html en {directory}")
+    return [(f.read_text(encoding="utf-8", errors="replace"), None) for f in files]
+
+def bench(label: str, items: List, fn: Callable, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        samples.append((time.perf_counter() - start) / len(items))
+    per_page = statistics.median(samples) * 1000
+    print(f"{label:<44} {per_page:8.3f} ms/página")
+    return per_page
+
+def main():
+    cli = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cli.add_argument("corpus", nargs="?", type=Path, help="Directorio con páginas .html guardadas")
+    cli.add_argument("--repeat", type=int, default=5)
+    args = cli.parse_args()
+
+    labeled = args.corpus is None
+    corpus = synthetic_corpus() if labeled else load_corpus(args.corpus)
+    pages = [html for html, _ in corpus]
+    regex = load_database().postal_code_regex
+    detector = LocationDetector()
+    print(f"Corpus: {len(pages)} páginas, {sum(map(len, pages)) / 1024:.0f} KB\n")
+
+    def before(html: str) -> Optional[str]:
+        match = regex.search(ParsedDocument(html).text)
+        return match.group() if match else None
+
+    def before_shared(document: ParsedDocument) -> None:
+        # `text` es una cached_property: se descarta para medir cada repetición
+        document.__dict__.pop("text", None)
+        regex.search(document.text)
+
+    def after(html: str) -> Optional[str]:
+        found = detector.locate(html)
+        return found[0] if found else None
+
+    baseline = bench("antes: parseo + texto + regex", pages, before, args.repeat)
+    shared = bench("antes, documento compartido: texto + regex", [ParsedDocument(p) for p in pages],
+                   before_shared, args.repeat)
+    cost = bench("después: por niveles", pages, after, args.repeat)
+    print(f"{'':<44} {baseline / cost:8.1f}x frente a parseo, {shared / cost:.1f}x frente a texto")
+
+    tier1 = sum(1 for html in pages if not detector.postal_codes(html))
+    print(f"\nResueltas en el nivel 1 (sin candidatos): {tier1}/{len(pages)} ({tier1 / len(pages):.0%})")
+    if not labeled:
+        print(f"Con CP: antes {sum(before(p) is not None for p in pages)}, "
+              f"después {sum(after(p) is not None for p in pages)}")
+        return
+    for label, detect in (("antes", before), ("después", after)):
+        results = [(detect(html), expected) for html, expected in corpus]
+        false_positives = sum(1 for got, expected in results if got and not expected)
+        missed = sum(1 for got, expected in results if expected and got != expected)
+        print(f"{label:<10} falsos positivos: {false_positives:3}   CP no encontrados: {missed:3}")
+
+if __name__ == "__main__":
+    main()
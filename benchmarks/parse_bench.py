@@ -0,0 +1,85 @@
+"""
+Micro-benchmark del coste de parseo HTML por página.
+
+Compara el enfoque anterior (dos BeautifulSoup 'html.parser' por escaneo, uno por
+detector) con un único ParsedDocument compartido para cada backend disponible.
+
+Uso:
+    poetry run python benchmarks/parse_bench.py [DIRECTORIO_CON_HTML] [--repeat N]
+
+Sin directorio se usa un corpus sintético de páginas de distintos tamaños.
+"""
+import argparse
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from bs4 import BeautifulSoup
+
+from backend_hunter.infrastructure.analysis.document import PARSERS, ParsedDocument
+
+def synthetic_corpus() -> List[str]:
+    pages = []
+    for size in (20, 200, 2000):
+        rows = "".join(
+            f'<div class="item"><a href="/p/{i}">Producto {i}</a><p>Descripción {i}</p></div>'
+            for i in range(size)
+        )
+        pages.append(
+            "<html><head><title>Empresa</title>"
+            '<meta name="generator" content="WordPress 6.4">'
+            '<link rel="stylesheet" href="/wp-content/themes/x/style.css">'
+            '<script src="/wp-includes/js/jquery.js"></script></head>'
+            f"<body>{rows}<footer>Carrer de Sant Miquel 1, 07002 Palma</footer></body></html>"
+        )
+    return pages
+
+def load_corpus(directory: Path) -> List[str]:
+    files = sorted(directory.glob("**/*.htm*"))
+    if not files:
+        raise SystemExit(f"No se encontraron páginas .html en {directory}")
+    return [f.read_text(encoding="utf-8", errors="replace") for f in files]
+
+def bench(label: str, corpus: List[str], fn: Callable[[str], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in corpus:
+            fn(html)
+        samples.append((time.perf_counter() - start) / len(corpus))
+    per_page = statistics.median(samples) * 1000
+    print(f"{label:<32} {per_page:8.2f} ms/página")
+    return per_page
+
+def before(html: str) -> None:
+    # Lo que hacían TechDetector y LocationDetector por separado
+    BeautifulSoup(html, "html.parser").find("input", {"name": "csrfmiddlewaretoken"})
+    BeautifulSoup(html, "html.parser").get_text(" ", strip=True).lower()
+
+def after(parser: str) -> Callable[[str], None]:
+    def run(html: str) -> None:
+        document = ParsedDocument(html, parser=parser)
+        document.attribute_index
+        document.text
+    return run
+
+def main():
+    cli = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cli.add_argument("corpus", nargs="?", type=Path, help="Directorio con páginas .html guardadas")
+    cli.add_argument("--repeat", type=int, default=5)
+    args = cli.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus()
+    print(f"Corpus: {len(corpus)} páginas, {sum(map(len, corpus)) / 1024:.0f} KB\n")
+
+    baseline = bench("antes: 2x bs4 html.parser", corpus, before, args.repeat)
+    for parser in PARSERS:
+        if ParsedDocument("<p></p>", parser=parser).parser != parser:
+            print(f"{'después: ' + parser:<32} (no disponible)")
+            continue
+        cost = bench(f"después: {parser}", corpus, after(parser), args.repeat)
+        print(f"{'':<32} {baseline / cost:8.1f}x más rápido")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Benchmark de extremo a extremo contra una granja web local (benchmarks/web_farm.py).
+
+Escenarios:
+    scan  ScanCompanyUseCase con `--concurrency` escaneos simultáneos
+    bulk  BulkScanUseCase.execute_stream sobre todos los sitios de la granja
+    api   POST /scan de la app FastAPI (lifespan real, transporte ASGI en proceso)
+
+Cada escenario corre en un proceso nuevo y reporta URLs/s, latencia p50/p99 por URL,
+CPU por página (del proceso del escáner; la granja va aparte), pico de RSS y
+acierto frente al perfil conocido de cada sitio. El resultado se guarda en JSON;
+con `--baseline` se compara con una ejecución anterior y termina con código 1 si
+alguna métrica empeora más de `--tolerance`.
+
+Uso:
+    poetry run python benchmarks/scan_bench.py --sites 2000 -o bench.json
+    poetry run python benchmarks/scan_bench.py --baseline bench.json --tolerance 0.15
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from backend_hunter.application.bulk_scan import BulkScanUseCase
+from backend_hunter.application.report_writers import ReportWriter
+from backend_hunter.application.use_cases import ScanCompanyUseCase
+from backend_hunter.infrastructure.analysis.analyzer_service import AnalyzerService
+from backend_hunter.infrastructure.scraping.scraper import AsyncWebScraper
+
+from web_farm import FarmConfig, SiteProfile, WebFarm, site_profile, site_url
+
+SCENARIOS = ("scan", "bulk", "api")
+
+# Métricas comparadas con la línea base: +1 si más es mejor, -1 si menos es mejor
+METRICS = {"urls_per_sec": +1, "p50_ms": -1, "p99_ms": -1, "cpu_ms_per_page": -1, "peak_rss_mb": -1}
+
+@dataclass
+class _Run:
+    latencies: List[float] = field(default_factory=list)
+    success: int = 0
+    errors: int = 0
+    correct: int = 0
+
+    def score(self, profile: SiteProfile, stacks: List[str], compliance: str, error: bool) -> None:
+        """Compara lo detectado con el perfil del sitio (un 500 esperado cuenta como acierto)."""
+        if error:
+            self.errors += 1
+            self.correct += profile.error
+            return
+        self.success += 1
+        stack_ok = profile.stack in stacks if profile.stack else not stacks or stacks == ["Unknown"]
+        compliance_ok = (compliance == "Compliant") == profile.balearic
+        self.correct += stack_ok and compliance_ok
+
+class _ScoringWriter(ReportWriter):
+    """Puntúa cada fila del reporte al llegar, sin guardarla."""
+    def __init__(self, run: _Run, profiles: Dict[str, SiteProfile]):
+        super().__init__(os.devnull)
+        self.run = run
+        self.profiles = profiles
+
+    def write(self, row: Dict[str, Any]) -> None:
+        stacks = [s for s in row["tech_stacks"].split(", ") if s]
+        self.run.score(self.profiles[row["url"]], stacks, row["compliance"], row["status"] != "success")
+        self.rows_written += 1
+
+    def close(self) -> None:
+        pass
+
+def _timed(use_case: ScanCompanyUseCase, latencies: List[float]) -> None:
+    # Mide cada escaneo individual dentro del caso de uso por lotes
+    execute = use_case.execute
+
+    async def run(url: str):
+        start = time.perf_counter()
+        try:
+            return await execute(url)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    use_case.execute = run
+
+async def _bench_scan(urls: List[str], profiles: Dict[str, SiteProfile], concurrency: int) -> _Run:
+    run = _Run()
+    slots = asyncio.Semaphore(concurrency)
+    async with AsyncWebScraper() as scraper:
+        use_case = ScanCompanyUseCase(scraper, AnalyzerService())
+        _timed(use_case, run.latencies)
+
+        async def one(url: str) -> None:
+            async with slots:
+                company = await use_case.execute(url)
+            run.score(
+                profiles[url], [s.value for s in company.detected_stacks],
+                company.compliance_status.value, company.scan_error is not None,
+            )
+
+        await asyncio.gather(*(one(url) for url in urls))
+    return run
+
+async def _bench_bulk(urls: List[str], profiles: Dict[str, SiteProfile], concurrency: int) -> _Run:
+    run = _Run()
+    async with AsyncWebScraper() as scraper:
+        use_case = BulkScanUseCase(scraper, AnalyzerService(), concurrency=concurrency)
+        _timed(use_case.scan_use_case, run.latencies)
+        await use_case.execute_stream(urls, _ScoringWriter(run, profiles))
+    return run
+
+async def _bench_api(urls: List[str], profiles: Dict[str, SiteProfile], concurrency: int) -> _Run:
+    run = _Run()
+    slots = asyncio.Semaphore(concurrency)
+    os.environ["HUNTER_JOB_STORE"] = os.path.join(tempfile.mkdtemp(), "jobs.sqlite")
+    from backend_hunter.infrastructure.api.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=120) as client:
+
+            async def one(url: str) -> None:
+                async with slots:
+                    start = time.perf_counter()
+                    response = await client.post("/scan", json={"url": url})
+                    run.latencies.append(time.perf_counter() - start)
+                body = response.json()
+                failed = response.status_code != 200 or body.get("error") is not None
+                run.score(
+                    profiles[url], body.get("detected_stacks", []),
+                    body.get("compliance_status", ""), failed,
+                )
+
+            await asyncio.gather(*(one(url) for url in urls))
+    return run
+
+BENCHES = {"scan": _bench_scan, "bulk": _bench_bulk, "api": _bench_api}
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux da KB, macOS bytes
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+def run_scenario(name: str, config: FarmConfig, port: int, count: int, concurrency: int) -> Dict[str, Any]:
+    """Ejecuta un escenario (en su propio proceso) y devuelve sus métricas."""
+    urls = [site_url(config, port, i) for i in range(count)]
+    profiles = {url: site_profile(config, i) for i, url in enumerate(urls)}
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    run = asyncio.run(BENCHES[name](urls, profiles, concurrency))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    latencies = sorted(run.latencies)
+    percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "urls": count,
+        "concurrency": concurrency,
+        "seconds": round(wall, 3),
+        "urls_per_sec": round(count / wall, 1),
+        "p50_ms": round(percentiles[49] * 1000, 1),
+        "p99_ms": round(percentiles[98] * 1000, 1),
+        "cpu_ms_per_page": round(cpu / count * 1000, 2),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "success": run.success,
+        "errors": run.errors,
+        "accuracy": round(run.correct / count, 4),
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regresiones de `current` frente a `baseline` (mismo escenario y métrica)."""
+    regressions = []
+    for name, metrics in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        for metric, direction in METRICS.items():
+            old, new = before.get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if change * direction < -tolerance:
+                regressions.append(f"{name}.{metric}: {old} -> {new} ({change:+.0%})")
+        if metrics["accuracy"] < before.get("accuracy", 0):
+            regressions.append(f"{name}.accuracy: {before['accuracy']} -> {metrics['accuracy']}")
+    return regressions
+
+def main():
+    cli = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cli.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    cli.add_argument("--sites", type=int, default=2000, help="Sitios de la granja (escenario bulk)")
+    cli.add_argument("--sample", type=int, default=300, help="Sitios usados en los escenarios scan y api")
+    cli.add_argument("--concurrency", "-n", type=int, default=100)
+    cli.add_argument("--latency-ms", type=float, default=FarmConfig.latency_ms)
+    cli.add_argument("--error-rate", type=float, default=FarmConfig.error_rate)
+    cli.add_argument("--redirect-rate", type=float, default=FarmConfig.redirect_rate)
+    cli.add_argument("--large-rate", type=float, default=FarmConfig.large_rate)
+    cli.add_argument("--large-kb", type=int, default=FarmConfig.large_kb)
+    cli.add_argument("--seed", type=int, default=FarmConfig.seed)
+    cli.add_argument("--port", type=int, default=8900)
+    cli.add_argument("--single-host", action="store_true", help="Todos los sitios en 127.0.0.1 (sistemas sin 127.0.0.0/8)")
+    cli.add_argument("--output", "-o", default="bench-results.json")
+    cli.add_argument("--baseline", help="JSON de una ejecución anterior con el que comparar")
+    cli.add_argument("--tolerance", type=float, default=0.15, help="Empeoramiento relativo tolerado (0.15 = 15%%)")
+    args = cli.parse_args()
+
+    config = FarmConfig(
+        sites=args.sites, seed=args.seed, latency_ms=args.latency_ms, error_rate=args.error_rate,
+        redirect_rate=args.redirect_rate, large_rate=args.large_rate, large_kb=args.large_kb,
+        single_host=args.single_host,
+    )
+    result: Dict[str, Any] = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "farm": asdict(config),
+        "scenarios": {},
+    }
+    context = multiprocessing.get_context("spawn")
+    with WebFarm(config, args.port):
+        for name in args.scenarios:
+            count = args.sites if name == "bulk" else min(args.sample, args.sites)
+            # Proceso nuevo por escenario: el pico de RSS es solo suyo
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                metrics = pool.submit(run_scenario, name, config, args.port, count, args.concurrency).result()
+            result["scenarios"][name] = metrics
+            print(
+                f"{name:<5} {metrics['urls_per_sec']:8.1f} URL/s  p50 {metrics['p50_ms']:7.1f} ms"
+                f"  p99 {metrics['p99_ms']:7.1f} ms  CPU {metrics['cpu_ms_per_page']:6.2f} ms/pág"
+                f"  RSS {metrics['peak_rss_mb']:6.1f} MB  acierto {metrics['accuracy']:.1%}"
+            )
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nResultados guardados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\nRegresiones (> {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"Sin regresiones frente a {args.baseline} (tolerancia {args.tolerance:.0%})")
+
+if __name__ == "__main__":
+    main()
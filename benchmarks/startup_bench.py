@@ -0,0 +1,114 @@
+"""
+Arranque en frío del CLI `hunter`: tiempo de importación y de proceso completo.
+
+Cada caso se lanza en un proceso nuevo con `python -X importtime` y se mide:
+- importación: suma del tiempo acumulado de los módulos de primer nivel (lo que
+  cuesta cargar el CLI y lo que el comando importa al ejecutarse)
+- proceso: tiempo de reloj desde el lanzamiento hasta la salida
+- módulos prohibidos: dependencias pesadas que ese comando no debe cargar
+  (pandas en `scan`, cualquier cosa de red o análisis en `--help`)
+
+`scan` se lanza contra una página servida en local, sin salir a la red.
+
+Uso:
+    poetry run python benchmarks/startup_bench.py [--repeat N] [--help-budget-ms MS] [--scan-budget-ms MS]
+
+Sale con código 1 si la mediana de importación de un caso supera su presupuesto o
+si un comando carga un módulo prohibido, para usarlo como control de regresiones.
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Set, Tuple
+
+PAGE = (
+    b'<html><head><meta name="generator" content="WordPress 6.4"></head>'
+    b'<body><footer>Carrer de Sant Miquel 1, 07002 Palma</footer></body></html>'
+)
+
+HEAVY = {'pandas', 'pyarrow', 'numpy', 'openpyxl'}
+NETWORK = {'httpx', 'httpcore', 'lxml', 'bs4'}
+
+_IMPORT_LINE = re.compile(r'^import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)$')
+
+class _Page(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+def _imports(command: List[str]) -> Tuple[str, float]:
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', *command], capture_output=True, text=True)
+    wall = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise SystemExit(f"{' '.join(command)} falló:\n{result.stdout}{result.stderr}")
+    return result.stderr, wall
+
+def _top_level(report: str) -> Dict[str, int]:
+    """Módulos importados en primer nivel -> µs acumulados (con todo su árbol)"""
+    found = {}
+    for line in report.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match and not match.group(2):
+            found[match.group(3)] = int(match.group(1))
+    return found
+
+def run(args: List[str], startup: Set[str]) -> Tuple[float, float, Set[str]]:
+    """(ms de importación, ms de proceso, paquetes raíz importados)"""
+    report, wall = _imports(['-m', 'backend_hunter.main', *args])
+    # Lo que carga el intérprete al arrancar (site, .pth...) no depende del CLI
+    total = sum(us for module, us in _top_level(report).items() if module not in startup)
+    imported = {m.group(3).split('.')[0] for m in map(_IMPORT_LINE.match, report.splitlines()) if m}
+    return total / 1000, wall, imported
+
+def main():
+    cli = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cli.add_argument('--repeat', type=int, default=5)
+    cli.add_argument('--help-budget-ms', type=float, default=200, help='Importación máxima de `hunter --help`')
+    cli.add_argument('--scan-budget-ms', type=float, default=500, help='Importación máxima de `hunter scan URL`')
+    args = cli.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Page)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    startup = set(_top_level(_imports(['-c', 'pass'])[0]))
+    cases = [
+        ('hunter --help', ['--help'], args.help_budget_ms, HEAVY | NETWORK),
+        ('hunter scan --help', ['scan', '--help'], args.help_budget_ms, HEAVY | NETWORK),
+        ('hunter scan URL', ['scan', url], args.scan_budget_ms, HEAVY),
+    ]
+    failures = []
+    print(f"{'caso':<22} {'importación':>12} {'proceso':>10} {'presupuesto':>12}")
+    for label, command, budget, forbidden in cases:
+        runs = [run(command, startup) for _ in range(args.repeat)]
+        imports = statistics.median(r[0] for r in runs)
+        wall = statistics.median(r[1] for r in runs)
+        loaded = sorted(forbidden & runs[0][2])
+        print(f"{label:<22} {imports:9.0f} ms {wall:7.0f} ms {budget:9.0f} ms")
+        if imports > budget:
+            failures.append(f"{label}: {imports:.0f} ms de importación > {budget:.0f} ms")
+        if loaded:
+            failures.append(f"{label}: importa {', '.join(loaded)}")
+    server.shutdown()
+
+    if failures:
+        print("\nFuera de presupuesto:")
+        for failure in failures:
+            print(f"  ✗ {failure}")
+        sys.exit(1)
+    print("\n✓ Dentro de presupuesto")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+"""
+Granja web simulada para benchmarks: miles de sitios sintéticos en un único servidor local.
+
+Cada sitio tiene un perfil determinista (semilla + índice): stack con sus huellas
+(cabeceras y cookies), dirección en Baleares o fuera, latencia, y a veces error 5xx,
+redirección o página grande. El servidor corre en un proceso aparte para que su CPU
+no cuente en las mediciones del escáner.
+
+En Linux cada sitio es una IP de loopback distinta (127.1.x.y), así los límites por
+host del scheduler se comportan como con sitios reales. Con `single_host=True` (otros
+sistemas) todos comparten 127.0.0.1 y el sitio va en la ruta (/s/<n>/).
+
+Uso independiente:
+    poetry run python benchmarks/web_farm.py --sites 5000 --port 8900
+"""
+import argparse
+import asyncio
+import multiprocessing
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# (stack esperado, cabeceras, cookie) de cada perfil de servidor
+STACK_PROFILES: List[Tuple[str, Dict[str, str], Optional[str]]] = [
+    ("PHP", {"Server": "Apache", "X-Powered-By": "PHP/8.2.12"}, "PHPSESSID=f3a9; path=/"),
+    ("PHP", {"Server": "nginx"}, "laravel_session=eyJpdiI6; path=/; httponly"),
+    ("Python", {"Server": "gunicorn"}, "csrftoken=Zx81; path=/"),
+    ("Python", {"Server": "uvicorn"}, None),
+    ("Node.js", {"Server": "nginx", "X-Powered-By": "Express"}, "connect.sid=s%3Aab; path=/"),
+    (".NET", {"Server": "Kestrel"}, ".AspNetCore.Session=CfDJ8; path=/"),
+    ("Java", {"Server": "Apache-Coyote/1.1 Tomcat"}, "JSESSIONID=8A1F; path=/"),
+    ("Ruby", {"Server": "nginx"}, "_rails_session=bm9; path=/"),
+    ("", {"Server": "cloudflare"}, None),  # sin huellas: stack desconocido
+]
+
+BALEARIC_ADDRESSES = [
+    "Carrer de Sant Miquel 12, 07002 Palma, Illes Balears",
+    "Avinguda d'Ignasi Wallis 25, 07800 Eivissa",
+    "Carrer de Ses Moreres 3, 07701 Maó, Menorca",
+]
+OTHER_ADDRESSES = [
+    "Calle Mayor 5, 28013 Madrid",
+    "Carrer de Pallars 84, 08018 Barcelona",
+    "Calle Colón 20, 46004 Valencia",
+]
+
+@dataclass
+class FarmConfig:
+    sites: int = 1000
+    seed: int = 42
+    latency_ms: float = 50.0  # latencia media; cada sitio la escala entre 0.5x y 1.5x
+    error_rate: float = 0.03  # sitios que responden siempre 500
+    redirect_rate: float = 0.2  # sitios cuya portada redirige a /inicio
+    large_rate: float = 0.02  # sitios con página grande
+    large_kb: int = 1024
+    balearic_rate: float = 0.3
+    page_kb: int = 40  # tamaño aproximado de una página normal
+    single_host: bool = False
+
+@dataclass
+class SiteProfile:
+    index: int
+    stack: str
+    headers: Dict[str, str]
+    cookie: Optional[str]
+    address: str
+    balearic: bool
+    latency: float  # segundos
+    error: bool
+    redirect: bool
+    large: bool
+
+def site_profile(config: FarmConfig, index: int) -> SiteProfile:
+    rng = random.Random(config.seed * 1_000_003 + index)
+    stack, headers, cookie = rng.choice(STACK_PROFILES)
+    balearic = rng.random() < config.balearic_rate
+    return SiteProfile(
+        index=index,
+        stack=stack,
+        headers=headers,
+        cookie=cookie,
+        address=rng.choice(BALEARIC_ADDRESSES if balearic else OTHER_ADDRESSES),
+        balearic=balearic,
+        latency=config.latency_ms / 1000 * rng.uniform(0.5, 1.5),
+        error=rng.random() < config.error_rate,
+        redirect=rng.random() < config.redirect_rate,
+        large=rng.random() < config.large_rate,
+    )
+
+def site_url(config: FarmConfig, port: int, index: int) -> str:
+    if config.single_host:
+        return f"http://127.0.0.1:{port}/s/{index}/"
+    return f"http://127.1.{index // 250}.{index % 250 + 1}:{port}/"
+
+def _site_index(config: FarmConfig, host: str, target: str) -> Tuple[Optional[int], str]:
+    """Índice del sitio y ruta dentro del sitio."""
+    if config.single_host:
+        parts = target.split("/", 3)  # ['', 's', '<n>', resto]
+        if len(parts) < 3 or parts[1] != "s" or not parts[2].isdigit():
+            return None, target
+        return int(parts[2]), "/" + (parts[3] if len(parts) > 3 else "")
+    octets = host.split(":")[0].split(".")
+    if len(octets) != 4 or octets[:2] != ["127", "1"]:
+        return None, target
+    return int(octets[2]) * 250 + int(octets[3]) - 1, target
+
+@dataclass
+class _Farm:
+    config: FarmConfig
+    profiles: Dict[int, SiteProfile] = field(default_factory=dict)
+    filler: str = ""
+
+    def __post_init__(self):
+        row = '<div class="item"><a href="/p/{i}">Producto {i}</a><p>Descripción del producto {i}</p></div>'
+        self.filler = "".join(row.format(i=i) for i in range(4000))
+
+    def profile(self, index: int) -> SiteProfile:
+        profile = self.profiles.get(index)
+        if profile is None:
+            profile = self.profiles[index] = site_profile(self.config, index)
+        return profile
+
+    def page(self, profile: SiteProfile, root: str) -> bytes:
+        kb = self.config.large_kb if profile.large else self.config.page_kb
+        filler = (self.filler * (kb * 1024 // len(self.filler) + 1))[: kb * 1024]
+        html = (
+            f"<html><head><title>Empresa {profile.index}</title>"
+            f'<link rel="stylesheet" href="{root}static/site.css"></head><body>'
+            f'<nav><a href="{root}">Inicio</a><a href="{root}aviso-legal">Aviso legal</a>'
+            f'<a href="{root}contacto">Contacto</a></nav>{filler}'
+            f"<footer>Empresa {profile.index} S.L. · {profile.address}</footer></body></html>"
+        )
+        return html.encode("utf-8")
+
+    def respond(self, host: str, target: str) -> Tuple[float, int, List[Tuple[str, str]], bytes]:
+        index, path = _site_index(self.config, host, target)
+        if index is None or index >= self.config.sites:
+            return 0.0, 404, [("Content-Type", "text/plain")], b"unknown site"
+        profile = self.profile(index)
+        root = f"/s/{index}/" if self.config.single_host else "/"
+        headers = list(profile.headers.items())
+        if profile.error:
+            return profile.latency, 500, headers + [("Content-Type", "text/html")], b"<h1>Internal Server Error</h1>"
+        if profile.redirect and path == "/":
+            return profile.latency, 301, headers + [("Location", f"{root}inicio")], b""
+        if profile.cookie:
+            headers.append(("Set-Cookie", profile.cookie))
+        headers.append(("Content-Type", "text/html; charset=utf-8"))
+        return profile.latency, 200, headers, self.page(profile, root)
+
+REASONS = {200: "OK", 301: "Moved Permanently", 404: "Not Found", 500: "Internal Server Error"}
+
+async def _serve(config: FarmConfig, host: str, port: int, ready=None) -> None:
+    farm = _Farm(config)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                _, target, _ = lines[0].split(" ", 2)
+                request_headers = {
+                    k.strip().lower(): v.strip() for k, v in (l.split(":", 1) for l in lines[1:] if ":" in l)
+                }
+                latency, status, headers, body = farm.respond(request_headers.get("host", ""), target)
+                if latency:
+                    await asyncio.sleep(latency)
+                response = [f"HTTP/1.1 {status} {REASONS[status]}", f"Content-Length: {len(body)}"]
+                response += [f"{k}: {v}" for k, v in headers]
+                writer.write(("\r\n".join(response) + "\r\n\r\n").encode("latin-1") + body)
+                await writer.drain()
+                if request_headers.get("connection", "").lower() == "close":
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port, backlog=4096)
+    if ready is not None:
+        ready.set()
+    async with server:
+        await server.serve_forever()
+
+def _run(config: FarmConfig, host: str, port: int, ready) -> None:
+    asyncio.run(_serve(config, host, port, ready))
+
+class WebFarm:
+    """Arranca la granja en un proceso hijo mientras dura el bloque `with`."""
+    def __init__(self, config: FarmConfig, port: int = 8900):
+        self.config = config
+        self.port = port
+        self._process: Optional[multiprocessing.Process] = None
+
+    def url(self, index: int) -> str:
+        return site_url(self.config, self.port, index)
+
+    def urls(self, count: Optional[int] = None) -> List[str]:
+        return [self.url(i) for i in range(count or self.config.sites)]
+
+    def profile(self, index: int) -> SiteProfile:
+        return site_profile(self.config, index)
+
+    def __enter__(self) -> "WebFarm":
+        context = multiprocessing.get_context("spawn")
+        ready = context.Event()
+        # 0.0.0.0 acepta cualquier IP de 127.0.0.0/8 (un sitio por IP)
+        host = "127.0.0.1" if self.config.single_host else "0.0.0.0"
+        self._process = context.Process(target=_run, args=(self.config, host, self.port, ready), daemon=True)
+        self._process.start()
+        if not ready.wait(10):
+            self.__exit__()
+            raise RuntimeError(f"La granja no arrancó en el puerto {self.port}")
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+def main():
+    cli = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cli.add_argument("--sites", type=int, default=FarmConfig.sites)
+    cli.add_argument("--port", type=int, default=8900)
+    cli.add_argument("--latency-ms", type=float, default=FarmConfig.latency_ms)
+    cli.add_argument("--single-host", action="store_true")
+    args = cli.parse_args()
+
+    config = FarmConfig(sites=args.sites, latency_ms=args.latency_ms, single_host=args.single_host)
+    with WebFarm(config, args.port) as farm:
+        print(f"Granja de {config.sites} sitios: {farm.url(0)} … {farm.url(config.sites - 1)}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,200 @@
 import asyncio
-import pandas as pd
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field, replace
 from datetime import datetime
-from typing import List
+from typing import (
+    TYPE_CHECKING, Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Union,
+)
 from pathlib import Path
+from urllib.parse import urlsplit
 from ..domain.entities import Company
-from .use_cases import ScanCompanyUseCase
-from .ports import IScraper, IAnalyzer
+from ..domain.enums import ordered, to_mask
+from ..domain.urls import site_key
+from .metrics import ScanMetrics
+from .single_flight import SingleFlight
+from .use_cases import CrawlBudget, ScanCompanyUseCase
+from .ports import IResolver, IScanCache, IScanJournal, IScraper, IAnalyzer
+from .report_writers import (
+    DELTA_COLUMNS, REPORT_COLUMNS, TIMING_COLUMNS, TIMING_STAGES, ReportColumns, ReportWriter,
+    arrow_schema, require_pyarrow,
+)
+
+# pandas solo hace falta para leer CSV y para los DataFrame: `hunter stream` no lo carga
+if TYPE_CHECKING:
+    import pandas as pd
+
+@dataclass
+class BulkSummary:
+    """Resumen incremental de un escaneo masivo (no retiene las filas)."""
+    total: int = 0
+    success: int = 0
+    errors: int = 0
+    resumed: int = 0  # filas ya completadas en una ejecución anterior (no re-escaneadas)
+    changed: int = 0  # filas con diferencias frente al escaneo anterior (con `delta`)
+    tech_counts: Counter = field(default_factory=Counter)
+    error_counts: Counter = field(default_factory=Counter)
+
+    def add(self, row: Dict[str, Any]) -> None:
+        self.total += 1
+        if row.get('changes'):
+            self.changed += 1
+        if row['status'] == 'success':
+            self.success += 1
+            self.tech_counts[row['tech_stacks']] += 1
+        else:
+            self.errors += 1
+            self.error_counts[row.get('error_class') or 'unknown'] += 1
+
+    @classmethod
+    def from_dataframe(cls, df: "pd.DataFrame") -> "BulkSummary":
+        summary = cls()
+        for row in df.to_dict('records'):
+            summary.add(row)
+        return summary
+
+def read_csv_urls(csv_path: str, url_column: str = 'url', chunk_size: int = 10_000) -> Iterator[str]:
+    """
+    Lee la columna de URLs por bloques, sin cargar el CSV completo.
+    """
+    import pandas as pd
+    columns = pd.read_csv(csv_path, nrows=0).columns
+    if url_column not in columns:
+        raise ValueError(f"Column '{url_column}' not found in CSV. Available: {list(columns)}")
+    for chunk in pd.read_csv(csv_path, usecols=[url_column], chunksize=chunk_size, dtype=str):
+        yield from chunk[url_column].dropna()
+
+async def read_lines(stream: TextIO, buffer: int = 1_000) -> AsyncIterator[str]:
+    """
+    URLs de un flujo de texto (stdin), una por línea, a medida que llegan.
+
+    Un hilo lee el flujo para no bloquear el loop y se detiene con `buffer` líneas
+    sin consumir: si el escaneo va más lento que la entrada, la tubería se llena y
+    el proceso que escribe en ella espera. Las líneas vacías y las que empiezan por
+    `#` se ignoran; un dominio sin esquema se escanea por https. Un error de
+    lectura (p.ej. bytes que no son UTF-8) se relanza aquí, tras las líneas previas.
+    """
+    loop = asyncio.get_running_loop()
+    lines: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+
+    def put(item: Union[str, Exception, None]) -> None:
+        asyncio.run_coroutine_threadsafe(lines.put(item), loop).result()
+
+    def pump() -> None:
+        end: Optional[Exception] = None
+        try:
+            for line in stream:
+                url = line.strip()
+                if url and not url.startswith('#'):
+                    put(url if '://' in url else f"https://{url}")
+        except Exception as e:
+            end = e
+        finally:
+            # Siempre se cierra la cola (None o el error): el consumidor no espera para siempre
+            try:
+                put(end)
+            except RuntimeError:
+                # El loop ya terminó (p.ej. la salida se cerró): nadie espera
+                pass
+
+    # Hilo daemon: una lectura bloqueada en stdin no impide salir al terminar
+    threading.Thread(target=pump, name="read-lines", daemon=True).start()
+    while True:
+        item = await lines.get()
+        if item is None:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+def _for_url(result: Union[Company, Exception], url: str) -> Union[Company, Exception]:
+    # Resultado de un duplicado: misma detección, pero con la URL de su fila
+    if isinstance(result, Exception) or result.url == url:
+        return result
+    return replace(result, url=url)
+
+def error_row(url: str, error: Exception) -> Dict[str, Any]:
+    """Fila de reporte de una URL cuyo escaneo lanzó `error`."""
+    return {
+        'url': url,
+        'status': 'error',
+        'error': str(error),
+        'tech_stacks': '',
+        'frameworks': '',
+        'compliance': 'Unknown',
+        'postal_code': '',
+        'scanned_at': datetime.now().isoformat(),
+        'cache': '',
+        'pages': 0,
+        'truncated': False,
+        'ips': '',
+        'attempts': getattr(error, 'attempts', 1),
+        'error_class': getattr(error, 'error_class', type(error).__name__),
+        'stack_mask': 0,
+        'framework_mask': 0,
+    }
 
 class BulkScanUseCase:
     """
     Caso de Uso: Escanear múltiples empresas desde un archivo CSV.
     Genera un reporte en Pandas DataFrame.
+
+    Las URLs duplicadas (mismo `site_key`) se escanean una sola vez y su resultado
+    se replica en cada fila: el reporte conserva una fila por entrada.
+
+    Con `resolver`, los hosts se pre-resuelven en paralelo por delante de los
+    escaneos; cuando les toca, la IP ya está en caché (o el fallo DNS, que se
+    reporta sin descargar nada).
+
+    Con `timings`, cada fila lleva la duración de sus etapas (columnas `*_ms`).
+
+    Con `delta` (requiere `cache`), cada fila lleva en `changes` sus diferencias con
+    el escaneo anterior; `changed_rows` / ChangedRowsWriter dejan solo las que cambiaron.
     """
-    def __init__(self, scraper: IScraper, analyzer: IAnalyzer, concurrency: int = 5):
+    # Resultados recientes que el modo streaming recuerda para deduplicar
+    RECENT_RESULTS = 10_000
+
+    def __init__(self, scraper: IScraper, analyzer: IAnalyzer, concurrency: int = 5,
+                 cache: Optional[IScanCache] = None, crawl: Optional[CrawlBudget] = None,
+                 flights: Optional[SingleFlight] = None, resolver: Optional[IResolver] = None,
+                 metrics: Optional[ScanMetrics] = None, timings: bool = False, delta: bool = False):
+        if delta and cache is None:
+            raise ValueError("Delta mode needs a scan cache with the previous results")
         self.scraper = scraper
         self.analyzer = analyzer
         self.concurrency = concurrency
-        self.scan_use_case = ScanCompanyUseCase(scraper, analyzer)
+        self.resolver = resolver
+        self.timings = timings
+        self.delta = delta
+        self.columns = REPORT_COLUMNS + (DELTA_COLUMNS if delta else []) + (TIMING_COLUMNS if timings else [])
+        self.scan_use_case = ScanCompanyUseCase(
+            scraper, analyzer, cache=cache, crawl=crawl, flights=flights, resolver=resolver, metrics=metrics
+        )
+        self.reused = 0  # filas servidas con el resultado de otra fila duplicada
+        self._prefetching: Set[asyncio.Task] = set()
+
+    def _prefetch(self, url: str) -> None:
+        """Lanza la resolución DNS del host sin esperarla."""
+        if self.resolver is None:
+            return
+
+        async def resolve(host: str):
+            try:
+                await self.resolver.resolve(host)
+            except Exception:
+                # El fallo queda en la caché del resolutor; el escaneo lo reportará
+                pass
+
+        task = asyncio.ensure_future(resolve(urlsplit(url).hostname or ''))
+        # Referencia fuerte hasta que termine (el loop solo guarda referencias débiles)
+        self._prefetching.add(task)
+        task.add_done_callback(self._prefetching.discard)
+
+    @property
+    def duplicates(self) -> int:
+        return self.reused + self.scan_use_case.flights.shared
 
-    async def execute(self, urls: List[str]) -> pd.DataFrame:
+    async def execute(self, urls: List[str]) -> "pd.DataFrame":
         """
         Escanea una lista de URLs y retorna un DataFrame con los resultados.
         """
@@ -27,17 +203,28 @@ class BulkScanUseCase:
         async def scan_with_limit(url: str) -> Company:
             async with semaphore:
                 return await self.scan_use_case.execute(url)
-        
-        tasks = [scan_with_limit(url) for url in urls]
-        companies = await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Una tarea por sitio distinto (la primera URL de cada uno)
+        keys = [site_key(url) for url in urls]
+        unique: Dict[str, str] = {}
+        for key, url in zip(keys, urls):
+            unique.setdefault(key, url)
+        self.reused += len(urls) - len(unique)
+        for url in unique.values():
+            self._prefetch(url)
+
+        tasks = [scan_with_limit(url) for url in unique.values()]
+        results = dict(zip(unique, await asyncio.gather(*tasks, return_exceptions=True)))
+        companies = [_for_url(results[key], url) for key, url in zip(keys, urls)]
         
         # Convertir resultados a DataFrame
         return self._to_dataframe(companies, urls)
     
-    async def execute_from_csv(self, csv_path: str, url_column: str = 'url') -> pd.DataFrame:
+    async def execute_from_csv(self, csv_path: str, url_column: str = 'url') -> "pd.DataFrame":
         """
         Lee URLs desde un archivo CSV y ejecuta el escaneo.
         """
+        import pandas as pd
         df = pd.read_csv(csv_path)
         if url_column not in df.columns:
             raise ValueError(f"Column '{url_column}' not found in CSV. Available: {list(df.columns)}")
@@ -45,45 +232,180 @@ class BulkScanUseCase:
         urls = df[url_column].dropna().tolist()
         return await self.execute(urls)
     
-    def _to_dataframe(self, companies: List, original_urls: List[str]) -> pd.DataFrame:
-        rows = []
-        for i, result in enumerate(companies):
-            if isinstance(result, Exception):
-                rows.append({
-                    'url': original_urls[i],
-                    'status': 'error',
-                    'error': str(result),
-                    'tech_stacks': '',
-                    'frameworks': '',
-                    'compliance': 'Unknown',
-                    'postal_code': '',
-                    'scanned_at': datetime.now().isoformat()
-                })
+    async def execute_stream(self, urls: Union[Iterable[str], AsyncIterable[str]],
+                             writer: Optional[ReportWriter] = None,
+                             journal: Optional[IScanJournal] = None, resume: bool = False) -> BulkSummary:
+        """
+        Escanea en modo streaming con memoria acotada: una cola limitada alimenta
+        un pool fijo de `concurrency` workers y cada resultado se escribe al terminar
+        (en orden de finalización, no de entrada).
+
+        `urls` puede ser asíncrono (p.ej. `read_lines(sys.stdin)`): los escaneos
+        empiezan mientras la entrada se sigue produciendo.
+
+        Con `journal`, cada fila se registra como checkpoint; con `resume`, las filas
+        ya completadas con éxito se saltan y solo se reintentan las fallidas o pendientes.
+        """
+        # Con resolutor la cola es más larga: más hosts pre-resolviéndose por delante
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * (8 if self.resolver else 2))
+        summary = BulkSummary()
+        # Duplicados cercanos (listas ordenadas): LRU acotado de resultados por sitio.
+        # Los duplicados simultáneos ya los coalesce el single-flight del escaneo.
+        recent: "OrderedDict[str, Union[Company, Exception]]" = OrderedDict()
+        completed: Dict[int, str] = {}
+        if journal is not None:
+            if resume:
+                completed = journal.completed()
             else:
-                company = result
-                rows.append({
-                    'url': company.url,
-                    'status': 'success',
-                    'error': '',
-                    'tech_stacks': ', '.join([s.value for s in company.detected_stacks]),
-                    'frameworks': ', '.join([f.value for f in company.detected_frameworks]),
-                    'compliance': company.compliance_status.value,
-                    'postal_code': company.postal_code or '',
-                    'scanned_at': company.last_scanned_at.isoformat() if company.last_scanned_at else ''
-                })
-        
-        return pd.DataFrame(rows)
+                journal.reset()
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                try:
+                    if item is None:
+                        return
+                    index, url = item
+                    key = site_key(url)
+                    if key in recent:
+                        recent.move_to_end(key)
+                        result = _for_url(recent[key], url)
+                        self.reused += 1
+                    else:
+                        try:
+                            result: Union[Company, Exception] = await self.scan_use_case.execute(url)
+                        except Exception as e:
+                            result = e
+                        recent[key] = result
+                        if len(recent) > self.RECENT_RESULTS:
+                            recent.popitem(last=False)
+                    row = self._to_row(result, url)
+                    if writer is not None:
+                        writer.write(row)
+                        # Si la salida va lenta (tubería llena), este worker espera
+                        await writer.drain()
+                    if journal is not None:
+                        journal.record(index, url, row)
+                    summary.add(row)
+                finally:
+                    queue.task_done()
+
+        async def each_url():
+            if isinstance(urls, AsyncIterable):
+                async for url in urls:
+                    yield url
+            else:
+                for url in urls:
+                    yield url
+
+        async def producer():
+            index = -1
+            async for url in each_url():
+                index += 1
+                if completed.get(index) == url:
+                    summary.resumed += 1
+                    continue
+                # La resolución DNS empieza al encolar: va por delante de los workers
+                self._prefetch(url)
+                # Bloquea cuando la cola está llena: la lectura va al ritmo de los workers
+                await queue.put((index, url))
+            for _ in range(self.concurrency):
+                await queue.put(None)
+
+        tasks = [asyncio.create_task(producer())]
+        tasks += [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            # Si un worker falla (p.ej. error de escritura) se cancela todo el pipeline
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return summary
+
+    async def execute_stream_from_csv(self, csv_path: str, writer: Optional[ReportWriter] = None,
+                                      url_column: str = 'url', chunk_size: int = 10_000,
+                                      journal: Optional[IScanJournal] = None,
+                                      resume: bool = False) -> BulkSummary:
+        """
+        Versión streaming de `execute_from_csv`: lee por bloques y escribe de forma incremental.
+        """
+        urls = read_csv_urls(csv_path, url_column, chunk_size)
+        return await self.execute_stream(urls, writer, journal=journal, resume=resume)
+
+    def _to_dataframe(self, companies: List, original_urls: List[str]) -> "pd.DataFrame":
+        # Columnar desde el principio: ninguna lista de diccionarios por fila
+        columns = ReportColumns(self.columns)
+        for i, result in enumerate(companies):
+            columns.append(self._to_row(result, original_urls[i]))
+        return columns.to_dataframe()
+
+    def _to_row(self, result: Union[Company, Exception], original_url: str) -> Dict[str, Any]:
+        if isinstance(result, Exception):
+            return error_row(original_url, result)
+        company = result
+        row = {
+            'url': company.url,
+            'status': 'error' if company.scan_error else 'success',
+            'error': company.scan_error or '',
+            # Orden de definición: la misma combinación da siempre el mismo texto (categoría)
+            'tech_stacks': ', '.join(s.value for s in ordered(company.detected_stacks)),
+            'frameworks': ', '.join(f.value for f in ordered(company.detected_frameworks)),
+            'compliance': company.compliance_status.value,
+            'postal_code': company.postal_code or '',
+            'scanned_at': company.last_scanned_at.isoformat() if company.last_scanned_at else '',
+            'cache': company.cache_status or '',
+            'pages': company.pages_scanned,
+            'truncated': company.truncated,
+            'ips': ', '.join(company.ip_addresses),
+            'attempts': company.attempts,
+            'error_class': company.error_class or '',
+            'stack_mask': to_mask(company.detected_stacks),
+            'framework_mask': to_mask(company.detected_frameworks),
+        }
+        if self.delta:
+            row['changes'] = '; '.join(company.changes)
+        if self.timings:
+            for stage, column in zip(TIMING_STAGES, TIMING_COLUMNS):
+                row[column] = round(company.timings.get(stage, 0.0) * 1000, 2)
+        return row
+
+def journal_to_dataframe(journal: IScanJournal, columns: Optional[List[str]] = None) -> "pd.DataFrame":
+    """
+    Reporte completo (todas las ejecuciones) a partir del diario, en orden de entrada.
+    """
+    columns = ReportColumns(columns)
+    for row in journal.rows():
+        columns.append(row)
+    return columns.to_dataframe()
+
+def changed_rows(df: "pd.DataFrame") -> "pd.DataFrame":
+    """Solo las filas con diferencias frente al escaneo anterior (feed de cambios)."""
+    return df[df['changes'] != ''].reset_index(drop=True)
 
-def export_report(df: pd.DataFrame, output_path: str, format: str = 'csv'):
+def export_report(df: "pd.DataFrame", output_path: str, format: str = 'csv'):
     """
     Exporta el DataFrame a un archivo.
+    Parquet y Arrow IPC conservan los tipos (categóricas, máscaras, fechas).
     """
     path = Path(output_path)
     if format == 'csv':
-        df.to_csv(path, index=False)
+        df.to_csv(path, index=False, date_format='%Y-%m-%dT%H:%M:%S.%f')
     elif format == 'json':
-        df.to_json(path, orient='records', indent=2)
+        df.to_json(path, orient='records', indent=2, date_format='iso')
+    elif format == 'ndjson':
+        df.to_json(path, orient='records', lines=True, date_format='iso')
     elif format == 'excel':
         df.to_excel(path, index=False)
+    elif format in ('parquet', 'arrow', 'feather'):
+        pa = require_pyarrow()
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if set(REPORT_COLUMNS) <= set(df.columns) <= set(REPORT_COLUMNS + DELTA_COLUMNS + TIMING_COLUMNS):
+            table = table.cast(arrow_schema(pa, list(df.columns)))
+        if format == 'parquet':
+            import pyarrow.parquet as pq
+            pq.write_table(table, str(path))
+        else:
+            with pa.ipc.new_file(str(path), table.schema) as writer:
+                writer.write_table(table)
     else:
         raise ValueError(f"Unsupported format: {format}")
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import socket
+import uuid
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+from .bulk_scan import BulkScanUseCase, BulkSummary, error_row
+from .metrics import ScanMetrics
+from .ports import (
+    FetchError, IAnalyzer, IResolver, IScanCache, IScanJournal, IScraper, IWorkQueue, RunProgress, WorkUnit,
+)
+from .report_writers import ReportWriter
+from .single_flight import SingleFlight
+from .use_cases import CrawlBudget
+
+class _UnitJournal(IScanJournal):
+    """Filas de un bloque en memoria hasta entregarlo (un bloque cabe de sobra)."""
+    def __init__(self):
+        self.recorded: Dict[int, Dict[str, Any]] = {}
+
+    def completed(self) -> Dict[int, str]:
+        return {}
+
+    def record(self, index: int, url: str, row: Dict[str, Any]) -> None:
+        self.recorded[index] = row
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        for index in sorted(self.recorded):
+            yield self.recorded[index]
+
+    def reset(self) -> None:
+        self.recorded.clear()
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+class ScanWorker:
+    """
+    Caso de Uso: worker de un escaneo distribuido.
+
+    Arrienda bloques de la cola compartida y los escanea con BulkScanUseCase sobre
+    sus propias dependencias de larga duración (scraper, analizador, caché). Mientras
+    trabaja renueva el arrendamiento; si el proceso muere, el bloque vence y otro
+    worker lo repite. Si una renovación falla (el bloque venció y ya es de otro),
+    deja de escanearlo y no entrega nada.
+    """
+    def __init__(self, queue: IWorkQueue, scraper: IScraper, analyzer: IAnalyzer,
+                 worker_id: Optional[str] = None, concurrency: int = 20,
+                 cache: Optional[IScanCache] = None, resolver: Optional[IResolver] = None,
+                 metrics: Optional[ScanMetrics] = None, renew_every: float = 60.0):
+        self.queue = queue
+        self.scraper = scraper
+        self.analyzer = analyzer
+        self.worker_id = worker_id or default_worker_id()
+        self.concurrency = concurrency
+        self.cache = cache
+        self.resolver = resolver
+        self.metrics = metrics
+        self.renew_every = renew_every
+        self.flights = SingleFlight()
+        self.units = 0  # bloques entregados
+        self.lost = 0  # bloques abandonados al perder el arrendamiento
+        self.scanned = 0
+        self.errors = 0
+
+    async def run(self, run_id: Optional[str] = None, exit_when_idle: bool = True, poll: float = 2.0) -> int:
+        """Procesa bloques hasta que no queda trabajo (o indefinidamente); devuelve cuántos."""
+        while True:
+            unit = self.queue.lease(self.worker_id, run_id)
+            if unit is not None:
+                await self.process(unit)
+                continue
+            # Sin bloques libres: si otros aún tienen arrendamientos, pueden vencer
+            if exit_when_idle and self.queue.progress(run_id).leased == 0:
+                return self.units
+            await asyncio.sleep(poll)
+
+    async def process(self, unit: WorkUnit) -> None:
+        use_case = BulkScanUseCase(
+            self.scraper, self.analyzer, concurrency=self.concurrency, cache=self.cache,
+            crawl=CrawlBudget() if unit.crawl else None, flights=self.flights,
+            resolver=self.resolver, metrics=self.metrics,
+        )
+        journal = _UnitJournal()
+        scan = asyncio.create_task(use_case.execute_stream(unit.urls, journal=journal))
+        renewer = asyncio.create_task(self._keep_leased(unit))
+        try:
+            # El renovador solo termina antes que el escaneo si el bloque ya no es nuestro
+            await asyncio.wait({scan, renewer}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            scan.cancel()
+            renewer.cancel()
+            await asyncio.gather(scan, renewer, return_exceptions=True)
+        if scan.cancelled():
+            self.lost += 1
+            return
+        summary = scan.result()
+        rows = [(unit.start + i, row) for i, row in journal.recorded.items()]
+        if not self.queue.complete(unit, self.worker_id, rows):
+            self.lost += 1
+            return
+        self.units += 1
+        self.scanned += summary.total
+        self.errors += summary.errors
+
+    async def _keep_leased(self, unit: WorkUnit) -> None:
+        """Renueva hasta que lo cancelen; vuelve si el arrendamiento se perdió."""
+        while True:
+            await asyncio.sleep(self.renew_every)
+            if not self.queue.renew(unit, self.worker_id):
+                return
+
+class DistributedBulkScan:
+    """
+    Caso de Uso: coordinador de un escaneo distribuido.
+    Reparte la entrada en bloques de la cola, sigue el progreso devolviendo a la
+    cola los bloques de workers caídos y combina las filas en un único reporte.
+    """
+    def __init__(self, queue: IWorkQueue):
+        self.queue = queue
+        self.requeued = 0
+
+    def submit(self, urls: Iterable[str], chunk_size: int = 500, crawl: bool = False) -> str:
+        return self.queue.create_run(urls, chunk_size=chunk_size, crawl=crawl)
+
+    async def wait(self, run_id: str, poll: float = 2.0,
+                   on_progress: Optional[Callable[[RunProgress], None]] = None,
+                   should_stop: Optional[Callable[[], bool]] = None) -> RunProgress:
+        """Espera a que todos los bloques terminen (o a `should_stop`)."""
+        while True:
+            self.requeued += self.queue.requeue_expired()
+            progress = self.queue.progress(run_id)
+            if on_progress is not None:
+                on_progress(progress)
+            if progress.finished or (should_stop is not None and should_stop()):
+                return progress
+            await asyncio.sleep(poll)
+
+    def merge(self, run_id: str, writer: ReportWriter) -> BulkSummary:
+        """Escribe el reporte en orden de entrada; los bloques abandonados salen como error."""
+        summary = BulkSummary()
+        failed = {
+            index: error_row(url, FetchError("Work unit abandoned after repeated worker failures", 'worker_failed', 0))
+            for index, url in self.queue.failed_urls(run_id)
+        }
+        rows = self.queue.rows(run_id)
+        for index, row in _merge_ordered(rows, failed):
+            writer.write(row)
+            summary.add(row)
+        return summary
+
+def _merge_ordered(rows: Iterator, extra: Dict[int, Dict[str, Any]]) -> Iterator:
+    # `rows` ya viene ordenado; las filas extra (pocas) se intercalan por posición
+    pending = sorted(extra.items())
+    for index, row in rows:
+        while pending and pending[0][0] < index:
+            yield pending.pop(0)
+        yield index, row
+    yield from pending
@@ -0,0 +1,110 @@
+import asyncio
+from typing import Any, Dict, Iterator, List, Optional
+from .bulk_scan import BulkScanUseCase
+from .metrics import ScanMetrics
+from .ports import IAnalyzer, IJobStore, IScanCache, IScanJournal, IScraper, ScanJob
+from .single_flight import SingleFlight
+from .use_cases import CrawlBudget
+
+FINISHED = ('done', 'failed')
+
+class _NotifyingJournal(IScanJournal):
+    """Delegado del diario de un trabajo que avisa al runner de cada fila nueva."""
+    def __init__(self, journal: IScanJournal, notify):
+        self._journal = journal
+        self._notify = notify
+
+    def completed(self) -> Dict[int, str]:
+        return self._journal.completed()
+
+    def record(self, index: int, url: str, row: Dict[str, Any]) -> None:
+        self._journal.record(index, url, row)
+        self._notify()
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        return self._journal.rows()
+
+    def reset(self) -> None:
+        self._journal.reset()
+
+class ScanJobRunner:
+    """
+    Caso de Uso: trabajos de escaneo por lotes en segundo plano.
+
+    Los trabajos se persisten en un IJobStore y se ejecutan con BulkScanUseCase
+    sobre dependencias compartidas de larga duración (scraper, analizador, caché).
+    Al arrancar se reencolan los trabajos interrumpidos y se reanudan desde su diario.
+    """
+    def __init__(self, store: IJobStore, scraper: IScraper, analyzer: IAnalyzer,
+                 cache: Optional[IScanCache] = None, concurrency: int = 20, max_jobs: int = 2,
+                 flights: Optional[SingleFlight] = None, metrics: Optional[ScanMetrics] = None):
+        self.store = store
+        self.scraper = scraper
+        self.analyzer = analyzer
+        self.cache = cache
+        self.concurrency = concurrency
+        self.max_jobs = max_jobs
+        self.flights = flights
+        self.metrics = metrics
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._updates: Dict[str, asyncio.Event] = {}
+
+    async def start(self) -> None:
+        for job in self.store.unfinished():
+            self._queue.put_nowait(job.id)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_jobs)]
+
+    async def stop(self) -> None:
+        # Los trabajos en curso quedan como 'running' y se reanudan en el próximo arranque
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, urls: List[str], crawl: bool = False) -> ScanJob:
+        job = self.store.create(urls, crawl=crawl)
+        self._queue.put_nowait(job.id)
+        return job
+
+    async def wait_for_update(self, job_id: str, timeout: float = 15.0) -> None:
+        """Espera a que el trabajo registre una fila nueva o cambie de estado (o al timeout)."""
+        event = self._updates.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _notify(self, job_id: str) -> None:
+        event = self._updates.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = self.store.get(job_id)
+        if job is None or job.status in FINISHED:
+            return
+        self.store.set_status(job_id, 'running')
+        self._notify(job_id)
+        use_case = BulkScanUseCase(
+            self.scraper, self.analyzer, concurrency=self.concurrency, cache=self.cache,
+            crawl=CrawlBudget() if job.crawl else None, flights=self.flights, metrics=self.metrics,
+        )
+        journal = _NotifyingJournal(self.store.journal(job_id), lambda: self._notify(job_id))
+        try:
+            await use_case.execute_stream(self.store.urls(job_id), journal=journal, resume=True)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.store.set_status(job_id, 'failed', error=str(e))
+        else:
+            self.store.set_status(job_id, 'done')
+        self._notify(job_id)
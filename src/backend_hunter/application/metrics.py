@@ -0,0 +1,89 @@
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Sequence
+from ..domain.entities import Company
+
+# Etapas de un escaneo, en orden (ver Company.timings)
+STAGES = (
+    'dns', 'queue', 'connect', 'tls', 'ttfb', 'download', 'fetch',
+    'signature', 'parse', 'tech', 'location', 'crawl', 'total',
+)
+
+# Límites superiores de los buckets, en segundos
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class Histogram:
+    """Histograma de buckets fijos (memoria constante, compatible con Prometheus)."""
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # el último es +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimación por interpolación lineal dentro del bucket (como histogram_quantile)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+class ScanMetrics:
+    """
+    Agregados de todos los escaneos de un proceso: un histograma por etapa,
+    escaneos por resultado y coincidencias por regla de huellas.
+    Se alimenta de las entidades ya escaneadas, así funciona igual con el análisis
+    en un pool de procesos.
+    """
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.stages: Dict[str, Histogram] = {}
+        self.scans: Counter = Counter()  # (resultado, error_class)
+        self.rule_hits: Counter = Counter()
+
+    def observe(self, company: Company) -> None:
+        for stage, seconds in company.timings.items():
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+        if company.scan_error:
+            outcome = 'error'
+        elif company.cache_status in ('hit', 'stale'):
+            outcome = 'cached'
+        else:
+            outcome = 'success'
+        self.scans[(outcome, company.error_class or '')] += 1
+        # Solo cuenta las reglas de documentos analizados ahora (no los servidos de caché)
+        if 'tech' in company.timings:
+            self.rule_hits.update(company.matched_rules)
+
+    def summary(self) -> List[Dict[str, float]]:
+        """Una fila por etapa observada, en el orden de STAGES: n, media, p50 y p95 en ms."""
+        ordered = [s for s in STAGES if s in self.stages] + sorted(set(self.stages) - set(STAGES))
+        return [
+            {
+                'stage': stage,
+                'count': self.stages[stage].count,
+                'mean_ms': self.stages[stage].mean * 1000,
+                'p50_ms': self.stages[stage].quantile(0.5) * 1000,
+                'p95_ms': self.stages[stage].quantile(0.95) * 1000,
+            }
+            for stage in ordered
+        ]
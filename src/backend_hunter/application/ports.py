@@ -1,6 +1,38 @@
+import hashlib
+import time
 from abc import ABC, abstractmethod
-from typing import Optional, Dict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from ..domain.entities import Company
+from ..domain.enums import BackendStack, ComplianceStatus, Framework
+
+@dataclass
+class FetchResult:
+    """
+    Resultado de una única descarga HTTP: cuerpo, cabeceras y metadatos.
+    Las cabeceras van en minúsculas; `set_cookies` conserva cada Set-Cookie por separado.
+    """
+    url: str
+    final_url: str
+    status_code: int
+    headers: Dict[str, str]
+    content: str
+    set_cookies: List[str] = field(default_factory=list)
+    elapsed: float = 0.0  # segundos, incluyendo redirecciones
+    attempts: int = 1  # intentos consumidos por la política de reintentos
+    truncated: bool = False  # cuerpo recortado por límite de tamaño o corte tras el <head>
+    timings: Dict[str, float] = field(default_factory=dict)  # etapas de red: queue, connect, tls, ttfb, download
+
+class FetchError(Exception):
+    """
+    Descarga fallida tras agotar los reintentos.
+    `error_class` es una categoría estable para reportes: 'timeout', 'connect', 'dns',
+    'protocol', 'circuit_open', 'content_type' o 'http_<código>'.
+    """
+    def __init__(self, message: str, error_class: str, attempts: int = 1):
+        super().__init__(message)
+        self.error_class = error_class
+        self.attempts = attempts
 
 class IScraper(ABC):
     """
@@ -17,6 +49,75 @@ class IScraper(ABC):
         """Obtiene las cabeceras HTTP."""
         pass
 
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """
+        Descarga la página y sus cabeceras.
+        Las implementaciones deberían hacerlo en una sola petición; por defecto
+        se combina `fetch_page` + `get_headers` para mantener compatibilidad.
+        `headers` son cabeceras extra de la petición (p.ej. If-None-Match); una respuesta
+        304 se devuelve con `status_code=304` y cuerpo vacío.
+        """
+        start = time.perf_counter()
+        content = await self.fetch_page(url)
+        headers = {k.lower(): v for k, v in (await self.get_headers(url)).items()}
+        cookie = headers.get('set-cookie')
+        return FetchResult(
+            url=url,
+            final_url=url,
+            status_code=200,
+            headers=headers,
+            content=content,
+            set_cookies=[cookie] if cookie else [],
+            elapsed=time.perf_counter() - start,
+        )
+
+@dataclass
+class AnalysisResult:
+    """
+    Resultado compacto y serializable (pickle) de un análisis.
+    Permite analizar en otro proceso y aplicar el resultado a la entidad en el principal.
+    """
+    stacks: Tuple[BackendStack, ...] = ()
+    frameworks: Tuple[Framework, ...] = ()
+    compliance_status: ComplianceStatus = ComplianceStatus.UNKNOWN
+    postal_code: Optional[str] = None
+    location_details: str = ""
+    timings: Dict[str, float] = field(default_factory=dict)
+    rules: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_company(cls, company: Company) -> "AnalysisResult":
+        return cls(
+            stacks=tuple(company.detected_stacks),
+            frameworks=tuple(company.detected_frameworks),
+            compliance_status=company.compliance_status,
+            postal_code=company.postal_code,
+            location_details=company.location_details,
+            timings=dict(company.timings),
+            rules=tuple(company.matched_rules),
+        )
+
+    def apply(self, company: Company) -> Company:
+        company.detected_stacks.update(self.stacks)
+        company.detected_frameworks.update(self.frameworks)
+        for stage, seconds in self.timings.items():
+            company.add_timing(stage, seconds)
+        company.matched_rules.extend(self.rules)
+        if self.compliance_status != ComplianceStatus.UNKNOWN:
+            company.compliance_status = self.compliance_status
+            company.postal_code = self.postal_code
+            company.location_details = self.location_details
+        return company
+
+class IResolver(ABC):
+    """
+    Puerto para la resolución DNS previa a la descarga.
+    """
+    @abstractmethod
+    async def resolve(self, host: str) -> List[str]:
+        """IPs del host; lanza FetchError(error_class='dns') si no existe o no tiene A/AAAA."""
+        pass
+
 class IAnalyzer(ABC):
     """
     Puerto para el servicio de Análisis de contenido.
@@ -30,3 +131,240 @@ class IAnalyzer(ABC):
     def analyze_compliance(self, html_content: str, company: Company) -> Company:
         """Analiza el contenido para verificar conformidad fiscal (FCT)."""
         pass
+
+    def analyze(self, html_content: str, headers: Dict[str, str], company: Company) -> Company:
+        """
+        Análisis completo (stack + conformidad) de un documento.
+        Las implementaciones pueden sobrescribirlo para compartir el parseo entre ambos.
+        """
+        self.analyze_stack(html_content, headers, company)
+        self.analyze_compliance(html_content, company)
+        return company
+
+    def warm_up(self) -> None:
+        """Prepara lo que el primer análisis pagaría (servicios de larga vida). Opcional."""
+        pass
+
+    async def analyze_async(self, html_content: str, headers: Dict[str, str], company: Company) -> Company:
+        """
+        Versión awaitable de `analyze` para los casos de uso asíncronos.
+        Por defecto analiza en el mismo hilo; las implementaciones con pool de procesos
+        la sobrescriben para no bloquear el event loop.
+        """
+        return self.analyze(html_content, headers, company)
+
+    async def analyze_compliance_async(self, html_content: str, company: Company) -> Company:
+        """Versión awaitable de `analyze_compliance` (páginas secundarias del rastreo)."""
+        return self.analyze_compliance(html_content, company)
+
+    async def find_legal_links(self, html_content: str, base_url: str, limit: int = 3) -> List[str]:
+        """
+        Enlaces del mismo sitio donde suele estar la dirección (aviso legal, contacto...),
+        por prioridad. Por defecto no se propone ninguno (sin rastreo secundario).
+        """
+        return []
+
+    def signature(self, html_content: str, headers: Dict[str, str]) -> str:
+        """
+        Firma de lo que el análisis tiene en cuenta del documento: con la misma firma
+        el resultado sería el mismo. Debe ser barata (se calcula antes de analizar).
+        Por defecto, el hash del contenido completo.
+        """
+        return hashlib.sha256(html_content.encode('utf-8', 'replace')).hexdigest()
+
+@dataclass
+class CachedScan:
+    """
+    Último resultado conocido de una URL junto con los validadores HTTP,
+    el hash del contenido del que se obtuvo y su firma (IAnalyzer.signature).
+    """
+    company: Company
+    content_hash: str
+    stored_at: float  # epoch (segundos)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    signature: Optional[str] = None
+
+    def validators(self) -> Dict[str, str]:
+        """Cabeceras para una petición condicional."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+@dataclass
+class CacheStats:
+    hits: int = 0    # dentro del TTL, sin red
+    stale: int = 0   # TTL vencido pero revalidado (304, mismo contenido o misma firma), sin reanalizar
+    misses: int = 0  # descargado y analizado
+
+    def as_dict(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'stale': self.stale, 'misses': self.misses}
+
+class IScanCache(ABC):
+    """
+    Puerto para la caché de resultados de escaneo, indexada por URL normalizada.
+    """
+    ttl: float  # segundos durante los que un resultado se sirve sin revalidar
+    stats: CacheStats
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CachedScan]:
+        pass
+
+    @abstractmethod
+    async def put(self, key: str, entry: CachedScan) -> None:
+        pass
+
+class IScanJournal(ABC):
+    """
+    Puerto para el diario de checkpoints de un escaneo masivo.
+    Registra cada fila del reporte en cuanto termina, indexada por su posición
+    en la entrada, para poder reanudar tras una interrupción.
+    """
+    @abstractmethod
+    def completed(self) -> Dict[int, str]:
+        """Posición -> URL de las filas terminadas con éxito."""
+        pass
+
+    @abstractmethod
+    def record(self, index: int, url: str, row: Dict[str, Any]) -> None:
+        pass
+
+    @abstractmethod
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """Todas las filas registradas, en orden de entrada."""
+        pass
+
+    @abstractmethod
+    def reset(self) -> None:
+        pass
+
+@dataclass
+class ScanJob:
+    """Trabajo de escaneo por lotes lanzado desde la API."""
+    id: str
+    status: str  # 'queued' | 'running' | 'done' | 'failed'
+    total: int
+    created_at: float
+    crawl: bool = False
+    completed: int = 0
+    errors: int = 0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+class IJobStore(ABC):
+    """
+    Puerto para la persistencia de trabajos por lotes: URLs de entrada, estado
+    y resultados (vía un IScanJournal por trabajo), para sobrevivir a reinicios.
+    """
+    @abstractmethod
+    def create(self, urls: List[str], crawl: bool = False) -> ScanJob:
+        pass
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[ScanJob]:
+        pass
+
+    @abstractmethod
+    def unfinished(self) -> List[ScanJob]:
+        """Trabajos en cola o interrumpidos, por orden de creación."""
+        pass
+
+    @abstractmethod
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        pass
+
+    @abstractmethod
+    def urls(self, job_id: str) -> Iterator[str]:
+        pass
+
+    @abstractmethod
+    def journal(self, job_id: str) -> IScanJournal:
+        pass
+
+    @abstractmethod
+    def results(self, job_id: str, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Filas terminadas en orden de entrada (paginadas)."""
+        pass
+
+    @abstractmethod
+    def results_since(self, job_id: str, cursor: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """Filas terminadas después de `cursor`, en orden de finalización, y el nuevo cursor."""
+        pass
+
+@dataclass
+class WorkUnit:
+    """Bloque de URLs de un escaneo distribuido, arrendado a un único worker."""
+    run_id: str
+    index: int
+    start: int  # posición en la entrada de la primera URL del bloque
+    urls: List[str]
+    crawl: bool = False
+    attempts: int = 0  # arrendamientos hasta ahora (incluido el actual)
+
+@dataclass
+class RunProgress:
+    """Estado de los bloques de un escaneo distribuido."""
+    total: int = 0  # URLs
+    units: int = 0
+    pending: int = 0
+    leased: int = 0
+    done: int = 0
+    failed: int = 0  # abandonados tras agotar los arrendamientos
+
+    @property
+    def finished(self) -> bool:
+        return self.units > 0 and self.pending == 0 and self.leased == 0
+
+class IWorkQueue(ABC):
+    """
+    Puerto para la cola de trabajo compartida de los escaneos distribuidos.
+
+    El coordinador parte la entrada en bloques; cada worker arrienda uno durante
+    un tiempo limitado, lo renueva mientras trabaja y entrega sus filas. Un bloque
+    cuyo arrendamiento vence (worker caído) vuelve a la cola.
+    """
+    @abstractmethod
+    def create_run(self, urls: Iterable[str], chunk_size: int = 500, crawl: bool = False) -> str:
+        pass
+
+    @abstractmethod
+    def lease(self, worker_id: str, run_id: Optional[str] = None) -> Optional[WorkUnit]:
+        """Siguiente bloque libre (o con arrendamiento vencido); None si no queda ninguno."""
+        pass
+
+    @abstractmethod
+    def renew(self, unit: WorkUnit, worker_id: str) -> bool:
+        """Prolonga el arrendamiento; False si el bloque ya no es de este worker."""
+        pass
+
+    @abstractmethod
+    def complete(self, unit: WorkUnit, worker_id: str, rows: List[Tuple[int, Dict[str, Any]]]) -> bool:
+        """
+        Guarda las filas del bloque (posición en la entrada, fila) y lo marca terminado.
+        False (y nada guardado) si el bloque ya no es de este worker.
+        """
+        pass
+
+    @abstractmethod
+    def requeue_expired(self) -> int:
+        """Devuelve a la cola los bloques con arrendamiento vencido; cuántos."""
+        pass
+
+    @abstractmethod
+    def progress(self, run_id: Optional[str] = None) -> RunProgress:
+        pass
+
+    @abstractmethod
+    def rows(self, run_id: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Filas entregadas, en orden de entrada."""
+        pass
+
+    @abstractmethod
+    def failed_urls(self, run_id: str) -> Iterator[Tuple[int, str]]:
+        """URLs de los bloques abandonados, con su posición en la entrada."""
+        pass
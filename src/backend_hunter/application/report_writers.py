@@ -0,0 +1,326 @@
+import csv
+import json
+import sys
+import threading
+from abc import ABC, abstractmethod
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO
+
+# Columnas de una fila de reporte, en orden
+REPORT_COLUMNS = [
+    'url', 'status', 'error', 'tech_stacks', 'frameworks',
+    'compliance', 'postal_code', 'scanned_at', 'cache',
+    'pages', 'truncated', 'attempts', 'error_class', 'ips',
+    'stack_mask', 'framework_mask',
+]
+
+# Columna opcional con las diferencias frente al escaneo anterior (bulk --delta)
+DELTA_COLUMNS = ['changes']
+
+# Columnas opcionales con la duración de cada etapa en ms (bulk --timings)
+TIMING_STAGES = ('queue', 'connect', 'tls', 'ttfb', 'download', 'parse', 'tech', 'location', 'total')
+TIMING_COLUMNS = [f'{stage}_ms' for stage in TIMING_STAGES]
+
+# Tipos compactos por columna (el resto son texto).
+# Categóricas: pocos valores distintos, se guardan como códigos + diccionario.
+CATEGORICAL_COLUMNS = ('status', 'tech_stacks', 'frameworks', 'compliance', 'cache', 'error_class')
+# Enteras, con su typecode de `array`: 'h' int16, 'H' uint16 (máscaras de BackendStack/Framework)
+INTEGER_COLUMNS = {'pages': 'h', 'attempts': 'h', 'stack_mask': 'H', 'framework_mask': 'H'}
+FLOAT_COLUMNS = tuple(TIMING_COLUMNS)  # float32
+BOOLEAN_COLUMNS = ('truncated',)
+TIMESTAMP_COLUMNS = ('scanned_at',)
+
+class ReportColumns:
+    """
+    Acumulador columnar de filas de reporte.
+
+    En lugar de una lista de diccionarios guarda una columna por campo: enteros en
+    `array`, categóricas como códigos int32 y diccionario de valores. Los diccionarios
+    se conservan entre `clear()`, así los lotes sucesivos de Arrow comparten códigos.
+    """
+    def __init__(self, columns: Optional[List[str]] = None):
+        self.columns = columns or REPORT_COLUMNS
+        self._categories: Dict[str, Dict[str, int]] = {c: {} for c in self.columns if c in CATEGORICAL_COLUMNS}
+        self.clear()
+
+    def clear(self) -> None:
+        self._data: Dict[str, Any] = {}
+        for c in self.columns:
+            if c in CATEGORICAL_COLUMNS:
+                self._data[c] = array('i')
+            elif c in INTEGER_COLUMNS:
+                self._data[c] = array(INTEGER_COLUMNS[c])
+            elif c in FLOAT_COLUMNS:
+                self._data[c] = array('f')
+            elif c in BOOLEAN_COLUMNS:
+                self._data[c] = array('b')
+            else:
+                self._data[c] = []
+        self.rows = 0
+
+    def append(self, row: Dict[str, Any]) -> None:
+        for c in self.columns:
+            value = row.get(c)
+            if c in CATEGORICAL_COLUMNS:
+                categories = self._categories[c]
+                value = '' if value is None else str(value)
+                code = categories.get(value)
+                if code is None:
+                    code = categories[value] = len(categories)
+                self._data[c].append(code)
+            elif c in INTEGER_COLUMNS or c in BOOLEAN_COLUMNS:
+                self._data[c].append(int(value or 0))
+            elif c in FLOAT_COLUMNS:
+                self._data[c].append(float(value or 0))
+            else:
+                self._data[c].append(None if value in (None, '') and c in TIMESTAMP_COLUMNS else value)
+        self.rows += 1
+
+    def categories(self, column: str) -> List[str]:
+        return list(self._categories[column])
+
+    def to_dataframe(self):
+        """DataFrame con categóricas, enteros estrechos y fechas como datetime64."""
+        import numpy as np
+        import pandas as pd
+        data = {}
+        for c in self.columns:
+            values = self._data[c]
+            if c in CATEGORICAL_COLUMNS:
+                data[c] = pd.Categorical.from_codes(values, categories=self.categories(c))
+            elif c in INTEGER_COLUMNS or c in FLOAT_COLUMNS:
+                # El typecode de `array` es también un dtype de numpy ('h' int16, 'H' uint16, 'f' float32)
+                data[c] = np.array(values, dtype=values.typecode)
+            elif c in BOOLEAN_COLUMNS:
+                data[c] = np.array(values, dtype=bool)
+            elif c in TIMESTAMP_COLUMNS:
+                data[c] = pd.to_datetime(pd.Series(values, dtype=object), format='ISO8601', errors='coerce')
+            else:
+                data[c] = pd.Series(values).fillna('')
+        return pd.DataFrame(data, columns=self.columns)
+
+    def to_arrow(self, pa, schema):
+        """Lote de Arrow con el esquema de `arrow_schema` (diccionarios acumulados)."""
+        arrays = []
+        for field in schema:
+            values = self._data[field.name]
+            if field.name in CATEGORICAL_COLUMNS:
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array(values, type=pa.int32()), pa.array(self.categories(field.name), type=pa.string())
+                ))
+            elif field.name in TIMESTAMP_COLUMNS:
+                arrays.append(pa.array(values, type=pa.string()).cast(field.type))
+            elif field.name in BOOLEAN_COLUMNS:
+                arrays.append(pa.array(values, type=pa.int8()).cast(field.type))
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        return pa.record_batch(arrays, schema=schema)
+
+def arrow_schema(pa, columns: Optional[List[str]] = None):
+    """Esquema tipado de Arrow/Parquet: las herramientas de BI filtran sin parsear texto."""
+    integer_types = {'h': pa.int16(), 'H': pa.uint16()}
+    fields = []
+    for c in columns or REPORT_COLUMNS:
+        if c in CATEGORICAL_COLUMNS:
+            fields.append((c, pa.dictionary(pa.int32(), pa.string())))
+        elif c in INTEGER_COLUMNS:
+            fields.append((c, integer_types[INTEGER_COLUMNS[c]]))
+        elif c in FLOAT_COLUMNS:
+            fields.append((c, pa.float32()))
+        elif c in BOOLEAN_COLUMNS:
+            fields.append((c, pa.bool_()))
+        elif c in TIMESTAMP_COLUMNS:
+            fields.append((c, pa.timestamp('us')))
+        else:
+            fields.append((c, pa.string()))
+    return pa.schema(fields)
+
+def require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ValueError("Parquet/Arrow output requires pyarrow (poetry install -E parquet)")
+    return pyarrow
+
+class ReportWriter(ABC):
+    """
+    Escritor incremental de filas de reporte.
+    Cada fila se persiste al llegar, así un fallo a mitad de ejecución
+    no pierde lo ya escaneado.
+    """
+    def __init__(self, path: str, columns: Optional[List[str]] = None):
+        self.path = Path(path)
+        self.columns = columns or REPORT_COLUMNS
+        self.rows_written = 0
+
+    @abstractmethod
+    def write(self, row: Dict[str, Any]) -> None:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+    async def drain(self) -> None:
+        """Espera a que lo escrito salga; solo bloquea en salidas con backpressure (tuberías)."""
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+class CsvReportWriter(ReportWriter):
+    def __init__(self, path: str, columns: Optional[List[str]] = None):
+        super().__init__(path, columns)
+        self._file = self.path.open('w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction='ignore')
+        self._writer.writeheader()
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._writer.writerow(row)
+        self._file.flush()
+        self.rows_written += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+class NdjsonReportWriter(ReportWriter):
+    def __init__(self, path: str, columns: Optional[List[str]] = None):
+        super().__init__(path, columns)
+        self._file = self.path.open('w', encoding='utf-8')
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._file.write(json.dumps({c: row.get(c) for c in self.columns}, ensure_ascii=False) + '\n')
+        self._file.flush()
+        self.rows_written += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+class PipeReportWriter(ReportWriter):
+    """
+    NDJSON hacia un flujo ya abierto (stdout), una línea por resultado.
+
+    `write` solo encola la línea y `drain` la escribe en un hilo: si el consumidor
+    va lento y la tubería se llena, esperan los workers que escriben, no el loop
+    (las descargas en curso siguen). El flujo es del proceso y no se cierra.
+    """
+    def __init__(self, stream: TextIO, columns: Optional[List[str]] = None):
+        super().__init__('-', columns)
+        self.stream = stream
+        self._pending: List[str] = []
+        self._lock = threading.Lock()
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._pending.append(json.dumps({c: row.get(c) for c in self.columns}, ensure_ascii=False) + '\n')
+        self.rows_written += 1
+
+    def _flush(self) -> None:
+        with self._lock:
+            lines, self._pending = self._pending, []
+            if lines:
+                self.stream.write(''.join(lines))
+                self.stream.flush()
+
+    async def drain(self) -> None:
+        # asyncio solo al escribir: el CLI importa este módulo al arrancar
+        import asyncio
+        if self._pending:
+            await asyncio.to_thread(self._flush)
+
+    def close(self) -> None:
+        self._flush()
+
+class _ArrowReportWriter(ReportWriter):
+    """Base de los escritores columnares: agrupa las filas en lotes de `batch_size`."""
+    def __init__(self, path: str, columns: Optional[List[str]] = None, batch_size: int = 10_000):
+        super().__init__(path, columns)
+        self._pa = require_pyarrow()
+        self.schema = arrow_schema(self._pa, self.columns)
+        self.batch_size = batch_size
+        self._buffer = ReportColumns(self.columns)
+        self._writer = self._open()
+
+    @abstractmethod
+    def _open(self):
+        pass
+
+    @abstractmethod
+    def _write_batch(self, batch) -> None:
+        pass
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._buffer.append(row)
+        self.rows_written += 1
+        if self._buffer.rows >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer.rows:
+            return
+        self._write_batch(self._buffer.to_arrow(self._pa, self.schema))
+        self._buffer.clear()
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+class ParquetReportWriter(_ArrowReportWriter):
+    """Un row group por lote; las categóricas quedan con codificación de diccionario."""
+    def _open(self):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(str(self.path), self.schema)
+
+    def _write_batch(self, batch) -> None:
+        self._writer.write_table(self._pa.Table.from_batches([batch]))
+
+class ArrowReportWriter(_ArrowReportWriter):
+    """Fichero Arrow IPC (Feather v2); cada lote añade solo los valores nuevos del diccionario."""
+    def _open(self):
+        options = self._pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+        return self._pa.ipc.new_file(str(self.path), self.schema, options=options)
+
+    def _write_batch(self, batch) -> None:
+        self._writer.write_batch(batch)
+
+class ChangedRowsWriter(ReportWriter):
+    """Feed de cambios: reenvía a `writer` solo las filas con `changes`."""
+    def __init__(self, writer: ReportWriter):
+        super().__init__(str(writer.path), writer.columns)
+        self.writer = writer
+
+    def write(self, row: Dict[str, Any]) -> None:
+        if row.get('changes'):
+            self.writer.write(row)
+            self.rows_written += 1
+
+    async def drain(self) -> None:
+        await self.writer.drain()
+
+    def close(self) -> None:
+        self.writer.close()
+
+STREAM_FORMATS = ('csv', 'ndjson', 'parquet', 'arrow')
+# Formatos del reporte completo, escrito al final (bulk_scan.export_report)
+EXPORT_FORMATS = ('csv', 'json', 'ndjson', 'excel', 'parquet', 'arrow', 'feather')
+
+def open_report_writer(path: str, format: str = 'csv', columns: Optional[List[str]] = None) -> ReportWriter:
+    """
+    Crea el escritor incremental para `format` (csv, ndjson/json, parquet o arrow).
+    Con `path` "-" escribe NDJSON en stdout.
+    """
+    if path == '-':
+        if format not in ('ndjson', 'json'):
+            raise ValueError(f"Only ndjson can be written to stdout, not {format}")
+        return PipeReportWriter(sys.stdout, columns)
+    if format == 'csv':
+        return CsvReportWriter(path, columns)
+    if format in ('ndjson', 'json'):
+        return NdjsonReportWriter(path, columns)
+    if format == 'parquet':
+        return ParquetReportWriter(path, columns)
+    if format in ('arrow', 'feather'):
+        return ArrowReportWriter(path, columns)
+    raise ValueError(f"Unsupported streaming format: {format}. Available: {list(STREAM_FORMATS)}")
@@ -0,0 +1,45 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """
+    Coalescencia de llamadas concurrentes: mientras una ejecución con la misma clave
+    está en vuelo, las siguientes esperan su resultado en lugar de repetirla.
+
+    La ejecución corre en su propia tarea: cancelar a uno de los que esperan
+    no la cancela para los demás. Si se cancelan todos (p.ej. se aborta un escaneo
+    masivo), nadie quiere ya el resultado y la ejecución se cancela también.
+    """
+    def __init__(self):
+        self.shared = 0  # llamadas servidas por una ejecución ajena
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Devuelve el resultado y si se compartió con otra llamada."""
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.shared += 1
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task), shared
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                # Sin nadie esperando; si ya terminó, `cancel` no hace nada
+                task.cancel()
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -1,34 +1,215 @@
+import asyncio
+import copy
+import hashlib
+import time
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
+from urllib.parse import urlsplit
+from ..domain.changes import FIRST_SEEN, describe_changes
 from ..domain.entities import Company
-from .ports import IScraper, IAnalyzer
+from ..domain.enums import ComplianceStatus
+from ..domain.urls import normalize_url, site_key
+from .metrics import ScanMetrics
+from .ports import CachedScan, IResolver, IScanCache, IScraper, IAnalyzer
+from .single_flight import SingleFlight
+
+@dataclass
+class CrawlBudget:
+    """
+    Límites del rastreo secundario de páginas legales/contacto por sitio.
+    `max_bytes` cuenta el contenido de esas páginas (la portada no consume presupuesto).
+    """
+    max_pages: int = 3
+    max_bytes: int = 2_000_000
 
 class ScanCompanyUseCase:
     """
     Caso de Uso: Escanear una empresa individual.
     Orquestra el flujo de obtención de datos y análisis.
+
+    Con `cache`, los resultados dentro del TTL se sirven sin red y los vencidos
+    se revalidan con una petición condicional antes de reanalizar. Si la página
+    cambió pero no su firma (lo que miran los detectores), tampoco se reanaliza;
+    salvo si el resultado salió también de páginas rastreadas, que la portada no cubre.
+    Al reanalizar, `company.changes` describe las diferencias con el resultado anterior.
+
+    Con `crawl`, si la portada no revela el CP se rastrean en paralelo sus enlaces
+    a aviso legal / contacto, dentro del presupuesto, hasta encontrarlo.
+
+    Los escaneos concurrentes del mismo sitio (http/https, con o sin www, barra final)
+    comparten una única ejecución; `flights` puede compartirse entre casos de uso.
+
+    Con `resolver`, el host se resuelve antes de descargar: un dominio inexistente
+    falla al instante (error 'dns') sin ocupar conexión ni esperar al timeout.
+
+    Cada escaneo deja en `company.timings` la duración de sus etapas (red, parseo,
+    detección); con `metrics` se agregan además en histogramas y contadores por regla.
     """
-    def __init__(self, scraper: IScraper, analyzer: IAnalyzer):
+    def __init__(self, scraper: IScraper, analyzer: IAnalyzer, cache: Optional[IScanCache] = None,
+                 crawl: Optional[CrawlBudget] = None, flights: Optional[SingleFlight] = None,
+                 resolver: Optional[IResolver] = None, metrics: Optional[ScanMetrics] = None):
         self.scraper = scraper
         self.analyzer = analyzer
+        self.cache = cache
+        self.crawl = crawl
+        self.flights = flights if flights is not None else SingleFlight()
+        self.resolver = resolver
+        self.metrics = metrics
 
     async def execute(self, url: str) -> Company:
+        # Con rastreo el resultado es más completo: no se mezcla con escaneos sin él
+        key = (site_key(url), self.crawl is not None)
+        company, shared = await self.flights.run(key, lambda: self._timed_scan(url))
+        if shared:
+            # Copia propia para cada llamante, con la URL que pidió
+            company = copy.deepcopy(company)
+            company.url = url
+        return company
+
+    async def _timed_scan(self, url: str) -> Company:
+        start = time.perf_counter()
+        company = await self._scan(url)
+        company.add_timing('total', time.perf_counter() - start)
+        if self.metrics is not None:
+            self.metrics.observe(company)
+        return company
+
+    async def _scan(self, url: str) -> Company:
+        # 0. Resultado en caché (con rastreo, en su propia entrada: el de la portada sola
+        # no sirve a quien pide rastreo)
+        key = normalize_url(url)
+        if self.crawl is not None:
+            key = f"{key} crawl"
+        cached = await self.cache.get(key) if self.cache else None
+        if cached and time.time() - cached.stored_at < self.cache.ttl:
+            self.cache.stats.hits += 1
+            return self._from_cache(cached, url, 'hit')
+
+        # Un resultado que salió también de páginas rastreadas no se revalida solo con
+        # la portada (el aviso legal puede haber cambiado): se descarga y rastrea de nuevo
+        revalidate = cached is not None and cached.company.pages_scanned <= 1
+
         # 1. Crear la entidad
         company = Company(url=url)
-        
+
         # 2. Obtener datos crudos (Infraestructura de Red)
         try:
-            html_content = await self.scraper.fetch_page(url)
-            headers = await self.scraper.get_headers(url)
+            if self.resolver:
+                start = time.perf_counter()
+                company.ip_addresses = await self.resolver.resolve(urlsplit(url).hostname or '')
+                company.add_timing('dns', time.perf_counter() - start)
+            # Una sola petición: cuerpo y cabeceras salen de la misma respuesta
+            result = await self.scraper.fetch(url, headers=cached.validators() if revalidate else None)
+            html_content = result.content
+            headers = result.headers
+            for stage, seconds in result.timings.items():
+                company.add_timing(stage, seconds)
+            company.add_timing('fetch', result.elapsed)
         except Exception as e:
-            # En un caso real, manejaríamos errores de red aquí
-            print(f"Error scanning {url}: {e}")
+            # El fallo queda en la entidad para no confundirlo con "nada detectado";
+            # cómo y dónde se informa lo decide quien muestra el resultado
+            company.scan_error = str(e) or type(e).__name__
+            company.error_class = getattr(e, 'error_class', type(e).__name__)
+            company.attempts = getattr(e, 'attempts', 1)
+            return company
+
+        content_hash = hashlib.sha256(html_content.encode('utf-8', 'replace')).hexdigest()
+        etag = headers.get('etag')
+        last_modified = headers.get('last-modified')
+        signature = None
+        if self.cache and result.status_code != 304:
+            start = time.perf_counter()
+            signature = self.analyzer.signature(html_content, headers)
+            company.add_timing('signature', time.perf_counter() - start)
+
+        # 2b. Sin cambios desde el último escaneo: 304, mismo contenido o misma firma
+        if revalidate and (result.status_code == 304 or content_hash == cached.content_hash
+                       or (signature is not None and signature == cached.signature)):
+            self.cache.stats.stale += 1
+            if result.status_code != 304:
+                cached.content_hash = content_hash
+            cached.stored_at = time.time()
+            cached.etag = etag or cached.etag
+            cached.last_modified = last_modified or cached.last_modified
+            cached.company.last_scanned_at = datetime.now()
+            await self.cache.put(key, cached)
+            ip_addresses, timings = company.ip_addresses, company.timings
+            company = self._from_cache(cached, url, 'stale')
+            company.attempts = result.attempts
+            company.ip_addresses = ip_addresses
+            company.timings = timings
             return company
 
         # 3. Analizar datos (Infraestructura de Análisis)
         # Pasamos la entidad para que sea enriquecida
-        self.analyzer.analyze_stack(html_content, headers, company)
-        self.analyzer.analyze_compliance(html_content, company)
-        
+        await self.analyzer.analyze_async(html_content, headers, company)
+        company.pages_scanned = 1
+        company.truncated = result.truncated
+
+        # 3b. Rastreo secundario: el CP suele estar en el aviso legal o en contacto
+        if self.crawl and company.compliance_status != ComplianceStatus.COMPLIANT:
+            start = time.perf_counter()
+            await self._crawl_legal_pages(company, html_content, result.final_url)
+            company.add_timing('crawl', time.perf_counter() - start)
+
         company.last_scanned_at = datetime.now()
-        
+        company.attempts = result.attempts
+
+        if self.cache:
+            self.cache.stats.misses += 1
+            company.cache_status = 'miss'
+            company.changes = describe_changes(cached.company, company) if cached else [FIRST_SEEN]
+            await self.cache.put(key, CachedScan(
+                company=copy.deepcopy(company),
+                content_hash=content_hash,
+                stored_at=time.time(),
+                etag=etag,
+                last_modified=last_modified,
+                signature=signature,
+            ))
+
+        return company
+
+    async def _crawl_legal_pages(self, company: Company, html_content: str, base_url: str) -> None:
+        links = await self.analyzer.find_legal_links(html_content, base_url, self.crawl.max_pages)
+        if not links:
+            return
+
+        remaining = self.crawl.max_bytes
+        tasks = [asyncio.create_task(self.scraper.fetch(link)) for link in links]
+        try:
+            for next_page in asyncio.as_completed(tasks):
+                try:
+                    page = await next_page
+                except Exception:
+                    # Una página secundaria caída no invalida el escaneo
+                    continue
+                # El presupuesto es de bytes (UTF-8), no de caracteres
+                data = page.content.encode('utf-8', 'replace')
+                content = data[:remaining].decode('utf-8', 'ignore')
+                company.pages_scanned += 1
+                company.truncated = company.truncated or page.truncated or len(data) > remaining
+                remaining -= len(data)
+                await self.analyzer.analyze_compliance_async(content, company)
+                if company.compliance_status == ComplianceStatus.COMPLIANT:
+                    company.location_details = f"{company.location_details} ({page.final_url})"
+                    break
+                if remaining <= 0:
+                    break
+        finally:
+            # Parada temprana: se cancelan las descargas que queden
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    def _from_cache(cached: CachedScan, url: str, status: str) -> Company:
+        # Copia: el llamante puede modificar la entidad sin tocar la caché
+        company = copy.deepcopy(cached.company)
+        company.url = url
+        company.cache_status = status
+        company.attempts = 0
+        company.timings = {}
+        company.changes = []
         return company
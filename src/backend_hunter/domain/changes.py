@@ -0,0 +1,37 @@
+from typing import List, Set
+from .entities import Company
+from .enums import ComplianceStatus, ordered
+
+# Cambio de un sitio sin escaneo anterior con el que comparar
+FIRST_SEEN = "first seen"
+
+def _names(members: Set) -> str:
+    return ', '.join(m.value for m in ordered(members))
+
+def _set_change(label: str, before: Set, after: Set) -> List[str]:
+    if before == after:
+        return []
+    if not before:
+        return [f"{label} detected: {_names(after)}"]
+    if not after:
+        return [f"{label} no longer detected (was {_names(before)})"]
+    return [f"{label} changed from {_names(before)} to {_names(after)}"]
+
+def describe_changes(before: Company, after: Company) -> List[str]:
+    """
+    Diferencias relevantes entre dos escaneos del mismo sitio, en texto legible
+    ("stack changed from PHP to Node.js", "became compliant (07001)").
+    Lista vacía si nada cambió.
+    """
+    changes = _set_change("stack", before.detected_stacks, after.detected_stacks)
+    changes += _set_change("frameworks", before.detected_frameworks, after.detected_frameworks)
+
+    was_compliant = before.compliance_status == ComplianceStatus.COMPLIANT
+    is_compliant = after.compliance_status == ComplianceStatus.COMPLIANT
+    if is_compliant and not was_compliant:
+        changes.append(f"became compliant ({after.postal_code})")
+    elif was_compliant and not is_compliant:
+        changes.append(f"no longer compliant (was {before.postal_code})")
+    elif is_compliant and before.postal_code != after.postal_code:
+        changes.append(f"postal code changed from {before.postal_code} to {after.postal_code}")
+    return changes
@@ -1,13 +1,14 @@
 from dataclasses import dataclass, field
-from typing import List, Optional, Set
+from typing import Dict, List, Optional, Set
 from datetime import datetime
 from .enums import BackendStack, Framework, ComplianceStatus
 
-@dataclass
+@dataclass(slots=True)
 class Company:
     """
     Entidad principal de Dominio.
     Representa una empresa analizada.
+    Con slots: un escaneo masivo mantiene cientos de miles en memoria.
     """
     url: str
     name: Optional[str] = None
@@ -23,12 +24,28 @@ class Company:
     
     last_scanned_at: Optional[datetime] = None
 
+    # Metadatos del escaneo
+    cache_status: Optional[str] = None  # 'hit' | 'stale' | 'miss' (None sin caché)
+    scan_error: Optional[str] = None  # motivo si no se pudo descargar la página
+    error_class: Optional[str] = None  # categoría del error ('timeout', 'dns', 'http_503'...)
+    attempts: int = 0  # intentos de descarga realizados
+    pages_scanned: int = 0  # portada + páginas legales/contacto rastreadas
+    truncated: bool = False  # alguna página se analizó recortada (detección parcial)
+    ip_addresses: List[str] = field(default_factory=list)  # IPs resueltas del host (agrupar por hosting)
+    timings: Dict[str, float] = field(default_factory=dict)  # segundos por etapa ('ttfb', 'parse'...)
+    matched_rules: List[str] = field(default_factory=list)  # ids de las huellas que coincidieron
+    changes: List[str] = field(default_factory=list)  # diferencias con el escaneo anterior (ver domain.changes)
+
     def add_stack(self, stack: BackendStack):
         self.detected_stacks.add(stack)
 
     def add_framework(self, framework: Framework):
         self.detected_frameworks.add(framework)
     
+    def add_timing(self, stage: str, seconds: float):
+        # Acumula: el rastreo secundario y los reintentos suman a la misma etapa
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
     def mark_compliant(self, postal_code: str, details: str):
         self.compliance_status = ComplianceStatus.COMPLIANT
         self.postal_code = postal_code
@@ -1,4 +1,7 @@
 from enum import Enum, auto
+from typing import Iterable, List, Set, Type, TypeVar
+
+E = TypeVar('E', bound=Enum)
 
 class BackendStack(Enum):
     PYTHON = "Python"
@@ -30,3 +33,20 @@ class ComplianceStatus(Enum):
     COMPLIANT = "Compliant"       # Sede en Baleares
     NON_COMPLIANT = "Non-Compliant" # Sede fuera
     UNKNOWN = "Unknown"           # No se pudo determinar
+
+# Conjuntos de enums como máscaras de bits (columnas enteras en los reportes).
+# El bit de cada miembro es su posición: los miembros nuevos se añaden al final.
+
+def to_mask(members: Iterable[Enum]) -> int:
+    mask = 0
+    for member in members:
+        mask |= 1 << list(type(member)).index(member)
+    return mask
+
+def from_mask(enum_cls: Type[E], mask: int) -> Set[E]:
+    return {member for i, member in enumerate(enum_cls) if mask >> i & 1}
+
+def ordered(members: Iterable[E]) -> List[E]:
+    """Miembros en orden de definición (texto estable para columnas categóricas)."""
+    members = set(members)
+    return [m for m in type(next(iter(members))) if m in members] if members else []
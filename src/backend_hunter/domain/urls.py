@@ -0,0 +1,30 @@
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+def normalize_url(url: str) -> str:
+    """
+    Forma canónica de una URL para usarla como clave (caché, deduplicación).
+    Esquema y host en minúsculas, sin puerto por defecto, sin fragmento
+    y sin barra final en la ruta.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    netloc = host
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((scheme, netloc, path, parts.query, ""))
+
+def site_key(url: str) -> str:
+    """
+    Clave de sitio para deduplicar entradas: como `normalize_url` pero sin esquema
+    (http y https cuentan igual) y sin el prefijo `www.`. Acepta URLs sin esquema.
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = f"http://{url}"
+    parts = urlsplit(normalize_url(url))
+    netloc = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    return f"{netloc}{parts.path}" + (f"?{parts.query}" if parts.query else "")
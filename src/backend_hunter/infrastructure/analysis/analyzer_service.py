@@ -1,22 +1,99 @@
-from typing import Dict
+import time
+from typing import Dict, List, Optional, Tuple
 from ...application.ports import IAnalyzer
 from ...domain.entities import Company
+from .document import ParsedDocument
+from .fingerprint_db import FingerprintDatabase, FingerprintStore
 from .tech_detector import TechDetector
 from .location_detector import LocationDetector
+from .signature import ContentSignature
+
+# Página mínima con la que se calienta el analizador (parser, reglas y ubicación)
+_WARM_UP_PAGE = (
+    '<html><head><meta name="generator" content="WordPress"><script src="/app.js"></script></head>'
+    '<body><footer>Carrer de Sant Miquel 1, 07002 Palma</footer></body></html>'
+)
 
 class AnalyzerService(IAnalyzer):
     """
     Implementación concreta de IAnalyzer.
     Coordina los detectores especializados.
+
+    Los detectores se construyen a partir de la base de huellas del `FingerprintStore`;
+    si la base se recarga, el siguiente análisis usa la nueva versión.
     """
-    def __init__(self):
-        self.tech_detector = TechDetector()
-        self.location_detector = LocationDetector()
+    def __init__(self, parser: str = "lxml", fingerprints: Optional[FingerprintStore] = None):
+        self.parser = parser
+        self.fingerprints = fingerprints or FingerprintStore()
+        self._database: Optional[FingerprintDatabase] = None
+        # Último documento analizado, para extraer enlaces sin volver a parsear
+        self._last: Optional[Tuple[str, ParsedDocument]] = None
+        self._detectors()
+
+    def _detectors(self) -> Tuple[TechDetector, LocationDetector]:
+        database = self.fingerprints.current
+        if database is not self._database:
+            self.tech_detector = TechDetector(database.engine)
+            self.location_detector = LocationDetector(database.postal_code_regex, database.keywords)
+            self.content_signature = ContentSignature(database)
+            self._database = database
+        return self.tech_detector, self.location_detector
+
+    def parse(self, html_content: str) -> ParsedDocument:
+        return ParsedDocument(html_content, parser=self.parser)
+
+    def _parse_timed(self, html_content: str, company: Company) -> ParsedDocument:
+        start = time.perf_counter()
+        document = self.parse(html_content)
+        company.add_timing('parse', time.perf_counter() - start)
+        return document
+
+    def analyze(self, html_content: str, headers: Dict[str, str], company: Company) -> Company:
+        # Un solo parseo por escaneo (la ubicación no lo necesita: va sobre el HTML crudo)
+        tech_detector, location_detector = self._detectors()
+        document = self._parse_timed(html_content, company)
+        start = time.perf_counter()
+        tech_detector.detect(html_content, headers, company, document)
+        detected = time.perf_counter()
+        location_detector.detect(html_content, company)
+        company.add_timing('tech', detected - start)
+        company.add_timing('location', time.perf_counter() - detected)
+        self._last = (html_content, document)
+        return company
+
+    def warm_up(self) -> None:
+        """Un análisis de muestra: el primer escaneo real no paga la inicialización de lxml ni de las reglas."""
+        self.analyze(_WARM_UP_PAGE, {'server': 'nginx'}, Company(url='http://warm-up.invalid/'))
+        self.signature(_WARM_UP_PAGE, {'server': 'nginx'})
+        self._last = None
 
     def analyze_stack(self, html_content: str, headers: Dict[str, str], company: Company) -> Company:
-        self.tech_detector.detect(html_content, headers, company)
+        tech_detector, _ = self._detectors()
+        document = self._parse_timed(html_content, company)
+        start = time.perf_counter()
+        tech_detector.detect(html_content, headers, company, document)
+        company.add_timing('tech', time.perf_counter() - start)
         return company
 
     def analyze_compliance(self, html_content: str, company: Company) -> Company:
-        self.location_detector.detect(html_content, company)
+        # Páginas legales/contacto: sin parseo
+        _, location_detector = self._detectors()
+        start = time.perf_counter()
+        location_detector.detect(html_content, company)
+        company.add_timing('location', time.perf_counter() - start)
         return company
+
+    def signature(self, html_content: str, headers: Dict[str, str]) -> str:
+        self._detectors()
+        return self.content_signature.compute(html_content, headers)
+
+    def legal_links(self, html_content: str, base_url: str, limit: int = 3) -> List[str]:
+        if self._last is not None and self._last[0] is html_content:
+            document = self._last[1]
+        else:
+            document = self.parse(html_content)
+        _, location_detector = self._detectors()
+        return location_detector.find_legal_links(document, base_url, limit)
+
+    async def find_legal_links(self, html_content: str, base_url: str, limit: int = 3) -> List[str]:
+        return self.legal_links(html_content, base_url, limit)
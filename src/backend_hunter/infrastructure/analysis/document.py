@@ -0,0 +1,123 @@
+from functools import cached_property
+from typing import Callable, Dict, List, Set, Tuple
+
+# (tag, atributos) en orden de documento
+Element = Tuple[str, Dict[str, str]]
+
+# Contenido que BeautifulSoup.get_text() tampoco considera visible
+INVISIBLE_TAGS = {"script", "style", "template"}
+
+def _parse_lxml(html: str) -> Tuple[List[Element], List[str]]:
+    from lxml import etree
+    from lxml import html as lxml_html
+
+    root = lxml_html.document_fromstring(html)
+    elements: List[Element] = []
+    strings: List[str] = []
+    hidden = 0
+
+    # iterwalk en lugar de recursión: algunos HTML anidan miles de niveles
+    for event, el in etree.iterwalk(root, events=("start", "end")):
+        is_tag = isinstance(el.tag, str)
+        if event == "start":
+            if not is_tag:
+                continue
+            elements.append((el.tag, dict(el.attrib)))
+            if el.tag in INVISIBLE_TAGS:
+                hidden += 1
+            elif not hidden and el.text:
+                strings.append(el.text)
+        else:
+            if is_tag and el.tag in INVISIBLE_TAGS:
+                hidden -= 1
+            if not hidden and el.tail:
+                strings.append(el.tail)
+    return elements, strings
+
+def _parse_html_parser(html: str) -> Tuple[List[Element], List[str]]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    elements = [
+        (tag.name, {k: " ".join(v) if isinstance(v, list) else v for k, v in tag.attrs.items()})
+        for tag in soup.find_all(True)
+    ]
+    return elements, list(soup.stripped_strings)
+
+def _parse_selectolax(html: str) -> Tuple[List[Element], List[str]]:
+    try:
+        from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    except ImportError:
+        from selectolax.parser import HTMLParser
+
+    tree = HTMLParser(html)
+    if tree.root is None:
+        return [], []
+    # Nodos de texto ('-text') y comentarios ('_comment') no son etiquetas
+    elements = [
+        (node.tag, {k: v or "" for k, v in node.attributes.items()})
+        for node in tree.root.traverse()
+        if not node.tag.startswith(("-", "_", "!"))
+    ]
+    tree.strip_tags(list(INVISIBLE_TAGS))
+    return elements, [tree.root.text(separator=" ")]
+
+PARSERS: Dict[str, Callable[[str], Tuple[List[Element], List[str]]]] = {
+    "lxml": _parse_lxml,
+    "html.parser": _parse_html_parser,
+    "selectolax": _parse_selectolax,
+}
+
+class ParsedDocument:
+    """
+    Documento HTML parseado una única vez por escaneo y compartido entre detectores.
+    Cachea el texto visible en minúsculas y un índice de atributos por etiqueta.
+
+    Backends: 'lxml' (por defecto), 'html.parser' y 'selectolax' (opcional).
+    Si el backend pedido no está instalado o falla, se usa 'html.parser'.
+    """
+    def __init__(self, html: str, parser: str = "lxml"):
+        if parser not in PARSERS:
+            raise ValueError(f"Unsupported parser: {parser}. Available: {list(PARSERS)}")
+        self.html = html
+        self.parser = parser
+        try:
+            self.elements, self._strings = PARSERS[parser](html)
+        except Exception:
+            # ImportError (dependencia opcional) o documento que el backend no acepta
+            self.parser = "html.parser"
+            self.elements, self._strings = _parse_html_parser(html)
+
+    @cached_property
+    def text(self) -> str:
+        """Texto visible en minúsculas, normalizado a un espacio entre fragmentos."""
+        return " ".join(s.strip() for s in self._strings if s.strip()).lower()
+
+    @cached_property
+    def tag_index(self) -> Dict[str, List[Dict[str, str]]]:
+        index: Dict[str, List[Dict[str, str]]] = {}
+        for tag, attrs in self.elements:
+            index.setdefault(tag, []).append(attrs)
+        return index
+
+    @cached_property
+    def attribute_index(self) -> Dict[Tuple[str, str], Set[str]]:
+        index: Dict[Tuple[str, str], Set[str]] = {}
+        for tag, attrs in self.elements:
+            for name, value in attrs.items():
+                index.setdefault((tag, name), set()).add(value)
+        return index
+
+    def tags(self, tag: str) -> List[Dict[str, str]]:
+        return self.tag_index.get(tag, [])
+
+    def attribute_values(self, tag: str, attribute: str) -> Set[str]:
+        return self.attribute_index.get((tag, attribute), set())
+
+    @property
+    def scripts(self) -> List[Dict[str, str]]:
+        return self.tags("script")
+
+    @property
+    def links(self) -> List[Dict[str, str]]:
+        return self.tags("link")
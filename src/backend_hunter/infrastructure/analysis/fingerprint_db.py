@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Pattern
+from ...domain.enums import BackendStack, Framework
+from .fingerprints import ELEMENT_SIGNALS, SIGNALS, Fingerprint, FingerprintEngine
+
+DEFAULT_DATABASE_PATH = Path(__file__).parent / "data" / "fingerprints.json"
+
+# Cambiar si cambia la forma de FingerprintDatabase / FingerprintEngine (invalida la caché)
+CACHE_FORMAT = 2
+
+RULE_FIELDS = {
+    'id', 'signal', 'key', 'contains', 'regex', 'case_sensitive',
+    'stack', 'framework', 'requires', 'excludes',
+}
+
+@dataclass
+class FingerprintDatabase:
+    """Base de huellas ya validada y compilada, lista para los detectores."""
+    engine: FingerprintEngine
+    postal_code_regex: Pattern
+    keywords: List[str]
+    digest: str
+    source: str
+
+    @property
+    def fingerprints(self) -> List[Fingerprint]:
+        return self.engine.fingerprints
+
+def _read_raw(path: Path, content: bytes) -> Dict[str, Any]:
+    if path.suffix in ('.yml', '.yaml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError(f"{path}: YAML fingerprint files require PyYAML (poetry install -E yaml)")
+        try:
+            return yaml.safe_load(content)
+        except yaml.YAMLError as e:
+            raise ValueError(f"{path}: {e}")
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{path}: {e}")
+
+def _parse_rule(raw: Any, index: int, seen: Dict[str, Fingerprint]) -> Fingerprint:
+    where = f"fingerprints[{index}]"
+    if not isinstance(raw, dict):
+        raise ValueError(f"{where}: expected an object")
+    unknown = set(raw) - RULE_FIELDS
+    if unknown:
+        raise ValueError(f"{where}: unknown fields {sorted(unknown)}")
+
+    rule_id = raw.get('id')
+    signal = raw.get('signal')
+    if not rule_id or not isinstance(rule_id, str):
+        raise ValueError(f"{where}: missing 'id'")
+    where = f"rule '{rule_id}'"
+    if rule_id in seen:
+        raise ValueError(f"{where}: duplicated id")
+    if signal not in SIGNALS:
+        raise ValueError(f"{where}: unknown signal '{signal}'. Available: {sorted(SIGNALS)}")
+
+    key, contains, regex = raw.get('key'), raw.get('contains'), raw.get('regex')
+    if signal in ELEMENT_SIGNALS or signal in ('header', 'meta'):
+        if not key:
+            raise ValueError(f"{where}: signal '{signal}' requires 'key'")
+    elif key is not None:
+        raise ValueError(f"{where}: signal '{signal}' does not use 'key'")
+    if contains is not None and regex is not None:
+        raise ValueError(f"{where}: use either 'contains' or 'regex', not both")
+    if signal in ELEMENT_SIGNALS or signal == 'derived':
+        if contains is not None or regex is not None:
+            raise ValueError(f"{where}: signal '{signal}' does not take a pattern")
+    elif signal != 'meta' and contains is None and regex is None:
+        raise ValueError(f"{where}: signal '{signal}' requires 'contains' or 'regex'")
+    if contains == '':
+        raise ValueError(f"{where}: 'contains' cannot be empty")
+    if regex is not None:
+        try:
+            re.compile(regex)
+        except re.error as e:
+            raise ValueError(f"{where}: invalid regex {regex!r}: {e}")
+
+    try:
+        stack = BackendStack(raw['stack']) if raw.get('stack') else None
+        framework = Framework(raw['framework']) if raw.get('framework') else None
+    except ValueError as e:
+        raise ValueError(f"{where}: {e}")
+
+    requires, excludes = raw.get('requires', []), raw.get('excludes', [])
+    if not isinstance(requires, list) or not isinstance(excludes, list):
+        raise ValueError(f"{where}: 'requires' and 'excludes' must be lists of rule ids")
+    requires, excludes = tuple(requires), tuple(excludes)
+    for ref in requires + excludes:
+        if ref not in seen:
+            raise ValueError(f"{where}: '{ref}' must be declared before it is referenced")
+    if signal == 'derived' and not requires:
+        raise ValueError(f"{where}: derived rules require 'requires'")
+
+    return Fingerprint(
+        id=rule_id,
+        signal=signal,
+        key=key,
+        contains=contains,
+        regex=regex,
+        case_sensitive=bool(raw.get('case_sensitive', False)),
+        stack=stack,
+        framework=framework,
+        requires=requires,
+        excludes=excludes,
+    )
+
+def parse_database(raw: Any, digest: str = "", source: str = "") -> FingerprintDatabase:
+    """Valida el contenido de un fichero de huellas y lo compila."""
+    if not isinstance(raw, dict) or not isinstance(raw.get('fingerprints'), list):
+        raise ValueError(f"{source}: expected an object with a 'fingerprints' list")
+
+    seen: Dict[str, Fingerprint] = {}
+    for index, item in enumerate(raw['fingerprints']):
+        rule = _parse_rule(item, index, seen)
+        seen[rule.id] = rule
+
+    location = raw.get('location', {})
+    try:
+        postal_code_regex = re.compile(location.get('postal_code_regex', r'\b07\d{3}\b'))
+    except re.error as e:
+        raise ValueError(f"{source}: invalid location.postal_code_regex: {e}")
+    keywords = [k.lower() for k in location.get('keywords', [])]
+
+    return FingerprintDatabase(
+        engine=FingerprintEngine(seen.values()),
+        postal_code_regex=postal_code_regex,
+        keywords=keywords,
+        digest=digest,
+        source=source,
+    )
+
+def default_cache_dir() -> Path:
+    return Path(os.environ.get('HUNTER_CACHE_DIR', Path.home() / '.cache' / 'backend-hunter'))
+
+def load_database(path: Optional[Path] = None, cache_dir: Optional[Path] = None) -> FingerprintDatabase:
+    """
+    Carga y compila un fichero de huellas (JSON o YAML).
+    La forma compilada se guarda en disco indexada por el hash del fichero,
+    así los arranques siguientes se saltan el parseo y la validación.
+    """
+    path = Path(path or DEFAULT_DATABASE_PATH)
+    content = path.read_bytes()
+    digest = hashlib.sha256(content).hexdigest()
+
+    cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+    cache_file = cache_dir / f"fingerprints-v{CACHE_FORMAT}-{digest[:32]}.pickle"
+    try:
+        with cache_file.open('rb') as f:
+            database = pickle.load(f)
+        if isinstance(database, FingerprintDatabase) and database.digest == digest:
+            database.source = str(path)
+            return database
+    except Exception:
+        # Caché ausente, corrupta o de otra versión: se recompila
+        pass
+
+    database = parse_database(_read_raw(path, content), digest=digest, source=str(path))
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with tmp.open('wb') as f:
+            pickle.dump(database, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(cache_file)
+    except OSError:
+        # Sistema de ficheros de solo lectura (p.ej. contenedor): seguimos sin caché
+        pass
+    return database
+
+class FingerprintStore:
+    """
+    Mantiene la base de huellas activa y permite recargarla en caliente.
+    Los escaneos en curso conservan la referencia a la base con la que empezaron;
+    los nuevos ven la versión recargada.
+    """
+    def __init__(self, path: Optional[Path] = None, cache_dir: Optional[Path] = None):
+        self.path = Path(path or os.environ.get('HUNTER_FINGERPRINTS', DEFAULT_DATABASE_PATH))
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self.current = load_database(self.path, cache_dir)
+
+    def reload(self) -> bool:
+        """
+        Vuelve a leer el fichero; si es inválido se mantiene la base actual y se lanza ValueError.
+        Devuelve True si el contenido cambió.
+        """
+        with self._lock:
+            database = load_database(self.path, self.cache_dir)
+            if database.digest == self.current.digest:
+                return False
+            self.current = database
+            return True
@@ -0,0 +1,231 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Pattern, Set, Tuple
+from ...domain.enums import BackendStack, Framework
+from .document import ParsedDocument
+
+# Señales que se comparan por valor exacto de un atributo: signal -> (tag, atributo)
+ELEMENT_SIGNALS = {
+    'input': ('input', 'name'),
+    'script_id': ('script', 'id'),
+}
+
+# Señales que buscan `contains`/`regex` dentro de un texto
+TEXT_SIGNALS = {'header', 'cookie', 'meta', 'link', 'script', 'url'}
+
+SIGNALS = set(ELEMENT_SIGNALS) | TEXT_SIGNALS | {'derived'}
+
+@dataclass(frozen=True)
+class Fingerprint:
+    """
+    Regla de detección declarativa.
+
+    - header:    `key` = nombre de cabecera, busca en su valor
+    - cookie:    busca en Set-Cookie
+    - meta:      `key` = <meta name>, busca en `content` (sin patrón basta con que exista)
+    - input:     `key` = <input name> exacto
+    - script_id: `key` = <script id> exacto
+    - link:      busca en los href de <link>
+    - script:    busca en los src de <script>
+    - url:       busca en el HTML crudo
+    - derived:   sin patrón, solo depende de `requires`/`excludes`
+
+    `contains` es una subcadena (siempre sin distinguir mayúsculas); `regex` una
+    expresión regular (sin distinguir mayúsculas salvo `case_sensitive`).
+    `requires` (alguna) y `excludes` (ninguna) referencian ids de reglas anteriores.
+    """
+    id: str
+    signal: str
+    key: Optional[str] = None
+    contains: Optional[str] = None
+    regex: Optional[str] = None
+    case_sensitive: bool = False
+    stack: Optional[BackendStack] = None
+    framework: Optional[Framework] = None
+    requires: Tuple[str, ...] = ()
+    excludes: Tuple[str, ...] = ()
+
+def _trie_pattern(node: Dict) -> str:
+    """Regex equivalente a un trie de literales (factoriza prefijos comunes)."""
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if '' in node:
+        # El literal termina aquí pero puede seguir otro más largo: preferimos el largo
+        return '(?:' + body + ')?'
+    return body
+
+class LiteralMatcher:
+    """
+    Busca muchas subcadenas a la vez con una única regex en forma de trie
+    (el motor `re` la recorre como un autómata, el coste no crece con el número de literales).
+    """
+    def __init__(self, literals: Mapping[str, List[str]]):
+        # literal (minúsculas) -> ids de regla
+        self._ids: Dict[str, List[str]] = {}
+        for literal, ids in literals.items():
+            self._ids.setdefault(literal.lower(), []).extend(ids)
+
+        trie: Dict = {}
+        for literal in self._ids:
+            node = trie
+            for ch in literal:
+                node = node.setdefault(ch, {})
+            node[''] = {}
+        self._regex = re.compile(_trie_pattern(trie), re.IGNORECASE)
+
+        # El trie devuelve el literal más largo en cada posición; los que son prefijo
+        # suyo también coinciden ahí
+        self._covered: Dict[str, Set[str]] = {
+            literal: {
+                rule_id
+                for end in range(1, len(literal) + 1)
+                for rule_id in self._ids.get(literal[:end], ())
+            }
+            for literal in self._ids
+        }
+        self._total = sum(len(ids) for ids in self._ids.values())
+
+    def hits(self, text: str) -> Set[str]:
+        found: Set[str] = set()
+        search = self._regex.search
+        pos = 0
+        # Avanzamos de posición en posición de coincidencia (no de match.end())
+        # para no perder literales que se solapan
+        while len(found) < self._total:
+            match = search(text, pos)
+            if match is None:
+                break
+            found |= self._covered.get(match.group().lower(), set())
+            pos = match.start() + 1
+        return found
+
+class TextMatcher:
+    """Todas las reglas `contains` y `regex` de un mismo canal de texto."""
+    def __init__(self, rules: Iterable[Fingerprint]):
+        literals: Dict[str, List[str]] = {}
+        self._regexes: List[Tuple[str, Pattern]] = []
+        self._always: List[str] = []
+        for rule in rules:
+            if rule.contains is not None:
+                literals.setdefault(rule.contains, []).append(rule.id)
+            elif rule.regex is not None:
+                flags = 0 if rule.case_sensitive else re.IGNORECASE
+                self._regexes.append((rule.id, re.compile(rule.regex, flags)))
+            else:
+                self._always.append(rule.id)
+        self._literals = LiteralMatcher(literals) if literals else None
+
+    @property
+    def reads_text(self) -> bool:
+        """False si todas las reglas del canal coinciden solo por existir (sin patrón)."""
+        return self._literals is not None or bool(self._regexes)
+
+    def hits(self, text: str) -> Set[str]:
+        found = set(self._always)
+        if self._literals is not None:
+            found |= self._literals.hits(text)
+        for rule_id, regex in self._regexes:
+            if regex.search(text):
+                found.add(rule_id)
+        return found
+
+class FingerprintEngine:
+    """
+    Compila las reglas en índices por señal y las evalúa en una sola pasada
+    sobre cabeceras, elementos del documento y HTML crudo.
+    """
+    def __init__(self, fingerprints: Iterable[Fingerprint]):
+        self.fingerprints: List[Fingerprint] = list(fingerprints)
+
+        by_channel: Dict[Tuple[str, Optional[str]], List[Fingerprint]] = {}
+        self._exact: Dict[Tuple[str, str, str], List[str]] = {}
+        self._conditional: List[Fingerprint] = []
+        for fp in self.fingerprints:
+            if fp.signal not in SIGNALS:
+                raise ValueError(f"Unknown signal '{fp.signal}' in rule '{fp.id}'")
+            if fp.requires or fp.excludes:
+                self._conditional.append(fp)
+            if fp.signal in ELEMENT_SIGNALS:
+                tag, attribute = ELEMENT_SIGNALS[fp.signal]
+                self._exact.setdefault((tag, attribute, fp.key), []).append(fp.id)
+            elif fp.signal in TEXT_SIGNALS:
+                key = fp.key.lower() if fp.signal == 'header' else fp.key
+                by_channel.setdefault((fp.signal, key), []).append(fp)
+
+        self._headers = {key: TextMatcher(rules) for (signal, key), rules in by_channel.items() if signal == 'header'}
+        self._meta = {key: TextMatcher(rules) for (signal, key), rules in by_channel.items() if signal == 'meta'}
+        self._cookie = self._channel(by_channel, 'cookie')
+        self._link = self._channel(by_channel, 'link')
+        self._script = self._channel(by_channel, 'script')
+        self._url = self._channel(by_channel, 'url')
+        self._unkeyed = {'cookie': self._cookie, 'link': self._link, 'script': self._script}
+
+    @property
+    def header_names(self) -> Dict[str, bool]:
+        """Cabeceras (minúsculas) con alguna regla -> si alguna mira su valor."""
+        return {name: matcher.reads_text for name, matcher in sorted(self._headers.items())}
+
+    @property
+    def meta_names(self) -> Dict[str, bool]:
+        """Valores de <meta name> con alguna regla -> si alguna mira su `content`."""
+        return {name: matcher.reads_text for name, matcher in self._meta.items()}
+
+    def text_hits(self, signal: str, text: str) -> Set[str]:
+        """Reglas de un canal sin clave ('cookie', 'link', 'script') que coinciden en `text`."""
+        matcher = self._unkeyed.get(signal)
+        return matcher.hits(text) if matcher is not None else set()
+
+    def url_hits(self, html: str) -> Set[str]:
+        """Reglas `url` que coinciden en el HTML crudo (sin condiciones entre reglas)."""
+        return self._url.hits(html) if self._url is not None else set()
+
+    @staticmethod
+    def _channel(by_channel: Dict, signal: str) -> Optional[TextMatcher]:
+        rules = by_channel.get((signal, None))
+        return TextMatcher(rules) if rules else None
+
+    def match(self, document: ParsedDocument, headers: Mapping[str, str]) -> List[Fingerprint]:
+        """Reglas que coinciden, en el orden en que fueron declaradas."""
+        hits: Set[str] = set()
+
+        # 1. Cabeceras y cookies
+        lowered = {name.lower(): value for name, value in headers.items()}
+        for name, matcher in self._headers.items():
+            if name in lowered:
+                hits |= matcher.hits(lowered[name])
+        if self._cookie is not None:
+            hits |= self._cookie.hits(lowered.get('set-cookie', ''))
+
+        # 2. Una pasada por los elementos del documento
+        for tag, attrs in document.elements:
+            for attribute, value in attrs.items():
+                rule_ids = self._exact.get((tag, attribute, value))
+                if rule_ids:
+                    hits.update(rule_ids)
+            if tag == 'meta':
+                matcher = self._meta.get(attrs.get('name'))
+                if matcher is not None:
+                    hits |= matcher.hits(attrs.get('content', ''))
+            elif tag == 'link' and self._link is not None and 'href' in attrs:
+                hits |= self._link.hits(attrs['href'])
+            elif tag == 'script' and self._script is not None and 'src' in attrs:
+                hits |= self._script.hits(attrs['src'])
+
+        # 3. HTML crudo
+        hits |= self.url_hits(document.html)
+
+        # 4. Condiciones entre reglas, en orden de declaración
+        for fp in self._conditional:
+            satisfied = (
+                (fp.signal == 'derived' or fp.id in hits)
+                and (not fp.requires or any(r in hits for r in fp.requires))
+                and not any(e in hits for e in fp.excludes)
+            )
+            if satisfied:
+                hits.add(fp.id)
+            else:
+                hits.discard(fp.id)
+
+        return [fp for fp in self.fingerprints if fp.id in hits]
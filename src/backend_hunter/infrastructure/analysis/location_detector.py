@@ -1,41 +1,213 @@
+import html as html_entities
+import json
 import re
-from typing import Optional, Tuple
-from bs4 import BeautifulSoup
+from typing import Iterator, List, Match, Optional, Pattern, Tuple
+from urllib.parse import unquote, urljoin, urlsplit
 from ...domain.entities import Company
+from .document import ParsedDocument
+from .fingerprint_db import load_database
+
+# Fragmentos de enlace a páginas donde suele estar la dirección, por prioridad
+# (el aviso legal es obligatorio por la LSSI y debe incluir el domicilio)
+LEGAL_LINK_HINTS = [
+    ('aviso-legal', 'aviso_legal', 'avisolegal', 'nota-legal', 'legal-notice', 'legal', 'impressum'),
+    ('contacto', 'contact', 'donde-estamos', 'localizacion', 'ubicacion'),
+    ('privacidad', 'privacy', 'proteccion-de-datos'),
+    ('quienes-somos', 'sobre-nosotros', 'empresa', 'about'),
+]
+
+# Marcado dentro de una ventana de texto (solo se limpia alrededor de cada candidato)
+_MARKUP = re.compile(r'<(script|style|template)\b.*?</\1\s*>|<!--.*?-->|<[^>]*>', re.S | re.I)
+
+# Fuentes estructuradas de la dirección (nivel 2)
+_JSON_LD = re.compile(r'<script[^>]*application/ld\+json[^>]*>(.*?)</script\s*>', re.S | re.I)
+_MICRODATA = re.compile(r'''<[^>]*itemprop\s*=\s*["']?postalCode\b[^>]*>([^<]*)''', re.I)
+_CONTENT_ATTRIBUTE = re.compile(r'''content\s*=\s*["']([^"']*)''', re.I)
+_ADDRESS = re.compile(r'<address\b.*?</address\s*>', re.S | re.I)
+_FOOTER = re.compile(r'<footer\b.*?</footer\s*>', re.S | re.I)
+
+# Contextos en los que un 07xxx es otra cosa: teléfono, precio o referencia
+_PHONE_BEFORE = re.compile(r'(?:\+\d{1,3}|tel[eéf.]*|tlf|fax|m[oó]vil)[\s.:()-]*(?:\d[\s.-]*){0,6}$')
+_DIGITS_BEFORE = re.compile(r'\d[\s.-]?$')
+_DIGITS_AFTER = re.compile(r'^[\s.-]?\d')
+_PRICE_BEFORE = re.compile(r'(?:€|\$|\beur)\s*$')
+_PRICE_AFTER = re.compile(r'^\s*(?:€|\$|eur\b|euros?\b|[.,]\d{2}\b)')
+_REFERENCE_BEFORE = re.compile(r'(?:\bref|\bid|\bn[º°o]|\bn[uú]m|pedido|factura|expediente|sku|#)[\s.:#-]*$')
+
+# Indicios de dirección postal justo antes del CP
+_ADDRESS_CUES = re.compile(
+    r'c/|\b(?:calle|carrer|avda|avenida|avinguda|plaza|pla[cç]a|paseo|passeig|cam[ií]|camino|'
+    r'ctra|carretera|pol[ií]gono|cp|c\.p|c[oó]digo postal|codi postal)\b'
+)
+
+# Caracteres de contexto a cada lado de un candidato
+CONTEXT_CHARS = 120
 
 class LocationDetector:
     """
-    Detector de conformidad legal (FCT) basado en ubicación.
-    Busca códigos postales 07xxx y menciones a Baleares.
+    Detector de conformidad legal (FCT) basado en ubicación: busca el CP de
+    Baleares (07xxx) en dos niveles, sin parsear el documento.
+
+    1. Candidatos: una búsqueda sobre el HTML crudo con el prefijo literal del
+       patrón (sin el `\\b` inicial, que impide al motor saltar directamente a
+       "07"). Sin candidatos termina aquí; es el caso de casi todas las páginas.
+    2. Confirmación, solo con candidatos. Primero se miran las fuentes
+       estructuradas: `postalCode` de schema.org en JSON-LD o microdatos, luego
+       <address> y el pie. Si no, vale un candidato del texto visible que no
+       parezca un teléfono, un precio o una referencia, y que tenga una dirección
+       delante (calle, C/, CP...) o una mención a Baleares en la página.
     """
     
-    # Regex para CP de Baleares: 07 seguida de 3 dígitos
-    BALEARES_CP_REGEX = re.compile(r'\b07\d{3}\b')
-    
-    KEYWORDS = ["illes balears", "baleares", "mallorca", "menorca", "ibiza", "eivissa", "palma"]
-
-    def detect(self, html: str, company: Company):
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        # Estrategia 1: Buscar en el footer o páginas de contacto (simplificado a todo el texto)
-        # Convertimos a minúsculas para búsqueda case-insensitive
-        text = soup.get_text(" ", strip=True).lower()
-        
-        cp_match = self.BALEARES_CP_REGEX.search(text)
-        keyword_match = any(k in text for k in self.KEYWORDS)
-        
-        if cp_match:
-            # Encontrado CP explícito
-            cp_found = cp_match.group()
-            details = f"Encontrado CP {cp_found} en el contenido."
-            company.mark_compliant(postal_code=cp_found, details=details)
-            
-        elif keyword_match:
-            # Heurística debil: Menciona Baleares pero no vemos CP
-            # No marcamos compliant automáticamente, pero lo anotamos (o decidimos marcarlo)
-            # Para este ejercicio, requerimos CP o mención explícita fuerte.
-            # Vamos a asumir que si menciona Baleares es un candidato fuerte.
-            pass 
-            # Si queremos ser estrictos con el requisito "07xxx", solo el if anterior vale.
-            # Si queremos ser flexibles, podríamos marcarlo aquí.
-            # Dejaremos que '07xxx' sea la prueba definitiva de conformidad fiscal.
+    def __init__(self, postal_code_regex: Optional[Pattern] = None, keywords: Optional[List[str]] = None):
+        # Por defecto, de la sección `location` de la base de huellas:
+        # CP de Baleares (07 seguida de 3 dígitos) y menciones a las islas
+        if postal_code_regex is None or keywords is None:
+            database = load_database()
+            postal_code_regex = postal_code_regex or database.postal_code_regex
+            keywords = keywords if keywords is not None else database.keywords
+        self.postal_code_regex = postal_code_regex
+        self.keywords = keywords
+        # El texto se busca sin distinguir mayúsculas
+        flags = postal_code_regex.flags | re.IGNORECASE
+        self._postal = re.compile(postal_code_regex.pattern, flags)
+        source = postal_code_regex.pattern
+        self._prefilter = re.compile(source[2:], flags) if source.startswith(r'\b') else self._postal
+
+    def detect(self, html: str, company: Company, document: Optional[ParsedDocument] = None):
+        # `document` se acepta por compatibilidad: el detector trabaja sobre el HTML crudo
+        found = self.locate(html)
+        if found is not None:
+            postal_code, details = found
+            company.mark_compliant(postal_code=postal_code, details=details)
+
+    def locate(self, html: str) -> Optional[Tuple[str, str]]:
+        """(CP, detalle) de la dirección en Baleares del documento, o None."""
+        # Nivel 1: candidatos en el HTML crudo
+        candidates = self.postal_codes(html)
+        if not candidates:
+            return None
+
+        # Nivel 2: fuentes estructuradas, en orden de fiabilidad
+        for source, texts in self._structured_sources(html):
+            for text in texts:
+                match = self._plausible(text)
+                if match is not None:
+                    return match, f"Encontrado CP {match} en {source}."
+
+        # Texto visible con indicios de dirección
+        lowered = html.lower()
+        mentions_islands = any(k in lowered for k in self.keywords)
+        for candidate in candidates:
+            if self._in_markup(html, candidate.start()):
+                continue
+            before, after = self._context(html, candidate.start(), candidate.end())
+            if self._other_number(before, after):
+                continue
+            if mentions_islands or _ADDRESS_CUES.search(before[-60:]):
+                return candidate.group(), f"Encontrado CP {candidate.group()} en el contenido."
+        return None
+
+    def postal_codes(self, html: str) -> List[Match]:
+        """Coincidencias del patrón de CP en el HTML crudo (nivel 1)."""
+        matches = []
+        for candidate in self._prefilter.finditer(html):
+            match = self._postal.match(html, candidate.start())
+            if match is not None:
+                matches.append(match)
+        return matches
+
+    def _structured_sources(self, html: str) -> Iterator[Tuple[str, Iterator[str]]]:
+        yield "datos schema.org (JSON-LD)", self._json_ld_codes(html)
+        yield "microdatos schema.org", (
+            (_CONTENT_ATTRIBUTE.search(m.group()) or m).group(1) for m in _MICRODATA.finditer(html)
+        )
+        yield "<address>", (self._visible(m.group()) for m in _ADDRESS.finditer(html))
+        yield "el pie de página", (self._visible(m.group()) for m in _FOOTER.finditer(html))
+
+    @staticmethod
+    def _json_ld_codes(html: str) -> Iterator[str]:
+        for block in _JSON_LD.finditer(html):
+            try:
+                pending = [json.loads(block.group(1))]
+            except ValueError:
+                continue
+            # PostalAddress suele ir anidada (Organization.address, @graph...)
+            while pending:
+                item = pending.pop(0)
+                if isinstance(item, dict):
+                    code = item.get('postalCode')
+                    if isinstance(code, (str, int)):
+                        yield str(code)
+                    pending.extend(item.values())
+                elif isinstance(item, list):
+                    pending.extend(item)
+
+    def _plausible(self, text: str) -> Optional[str]:
+        """Primer CP de un texto ya acotado que no parezca otro tipo de número."""
+        text = text.lower()
+        for match in self._postal.finditer(text):
+            if not self._other_number(text[:match.start()][-CONTEXT_CHARS:], text[match.end():][:CONTEXT_CHARS]):
+                return match.group()
+        return None
+
+    @staticmethod
+    def _visible(fragment: str) -> str:
+        return html_entities.unescape(_MARKUP.sub(' ', fragment))
+
+    @staticmethod
+    def _in_markup(html: str, pos: int) -> bool:
+        # Dentro de una etiqueta (valor de atributo) o del código de un <script>/<style>
+        if html.rfind('<', 0, pos) > html.rfind('>', 0, pos):
+            return True
+        for tag in ('script', 'style', 'SCRIPT', 'STYLE'):
+            if html.rfind(f'<{tag}', 0, pos) > html.rfind(f'</{tag}', 0, pos):
+                return True
+        return False
+
+    def _context(self, html: str, start: int, end: int) -> Tuple[str, str]:
+        """Texto visible (minúsculas) a cada lado de un candidato."""
+        left = html[max(0, start - CONTEXT_CHARS):start]
+        cut = left.find('>')
+        if cut != -1 and '<' not in left[:cut]:
+            left = left[cut + 1:]  # la ventana empezaba a mitad de una etiqueta
+        right = html[end:end + CONTEXT_CHARS]
+        cut = right.rfind('<')
+        if cut != -1 and '>' not in right[cut:]:
+            right = right[:cut]
+        return self._visible(left).lower(), self._visible(right).lower()
+
+    @staticmethod
+    def _other_number(before: str, after: str) -> bool:
+        """Teléfono, precio o referencia según el contexto."""
+        return bool(
+            _PHONE_BEFORE.search(before)
+            or (_DIGITS_BEFORE.search(before) and _DIGITS_AFTER.search(after))
+            or _PRICE_BEFORE.search(before) or _PRICE_AFTER.search(after)
+            or _REFERENCE_BEFORE.search(before)
+        )
+
+    def find_legal_links(self, document: ParsedDocument, base_url: str, limit: int = 3) -> List[str]:
+        """
+        Enlaces del mismo sitio a aviso legal, contacto, privacidad o "quiénes somos",
+        ordenados por la probabilidad de contener el CP.
+        """
+        base_host = urlsplit(base_url).hostname or ''
+        site = base_host[4:] if base_host.startswith('www.') else base_host
+        ranked = {}
+        for anchor in document.tags('a'):
+            href = anchor.get('href', '').strip()
+            if not href or href.startswith(('#', 'mailto:', 'tel:', 'javascript:')):
+                continue
+            url = urljoin(base_url, href).split('#')[0]
+            parts = urlsplit(url)
+            host = parts.hostname or ''
+            if parts.scheme not in ('http', 'https') or (host != site and host != f"www.{site}"):
+                continue
+            path = unquote(parts.path).lower()
+            if path.rstrip('/') == urlsplit(base_url).path.rstrip('/'):
+                continue
+            for priority, hints in enumerate(LEGAL_LINK_HINTS):
+                if any(hint in path for hint in hints):
+                    ranked.setdefault(url, priority)
+                    break
+        return sorted(ranked, key=ranked.get)[:limit]
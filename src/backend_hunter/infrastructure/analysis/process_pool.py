@@ -0,0 +1,126 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from ...application.ports import AnalysisResult, IAnalyzer
+from ...domain.entities import Company
+from .analyzer_service import AnalyzerService
+from .fingerprint_db import FingerprintStore
+
+# Analizador "caliente" de cada proceso worker (base de huellas ya cargada)
+_worker_analyzer: Optional[AnalyzerService] = None
+
+def _init_worker(parser: str, fingerprints_path: str, cache_dir: Optional[str]) -> None:
+    global _worker_analyzer
+    _worker_analyzer = AnalyzerService(parser, FingerprintStore(fingerprints_path, cache_dir))
+
+def _ready() -> int:
+    _worker_analyzer.warm_up()
+    return os.getpid()
+
+def _analyze_in_worker(html_content: str, headers: Dict[str, str], digest: str) -> AnalysisResult:
+    analyzer = _worker_analyzer
+    # El proceso principal recargó la base: el worker se pone al día antes de analizar
+    if analyzer.fingerprints.current.digest != digest:
+        analyzer.fingerprints.reload()
+    company = Company(url="")
+    analyzer.analyze(html_content, headers, company)
+    return AnalysisResult.from_company(company)
+
+def _compliance_in_worker(html_content: str, digest: str) -> AnalysisResult:
+    analyzer = _worker_analyzer
+    if analyzer.fingerprints.current.digest != digest:
+        analyzer.fingerprints.reload()
+    company = Company(url="")
+    analyzer.analyze_compliance(html_content, company)
+    return AnalysisResult.from_company(company)
+
+def _legal_links_in_worker(html_content: str, base_url: str, limit: int) -> List[str]:
+    return _worker_analyzer.legal_links(html_content, base_url, limit)
+
+class ProcessPoolAnalyzer(IAnalyzer):
+    """
+    IAnalyzer que ejecuta el parseo y la detección en un pool de procesos,
+    para no bloquear el event loop que mueve las descargas y aprovechar todos los núcleos.
+
+    Cada worker mantiene su propio AnalyzerService; solo viajan el HTML y las
+    cabeceras de ida y un AnalysisResult compacto de vuelta. Como mucho `max_pending`
+    documentos esperan análisis: si el pool no da abasto, las descargas se frenan.
+    """
+    def __init__(self, workers: Optional[int] = None, parser: str = "lxml",
+                 fingerprints: Optional[FingerprintStore] = None, max_pending: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.parser = parser
+        self.fingerprints = fingerprints or FingerprintStore()
+        self.max_pending = max_pending or self.workers * 2
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._local: Optional[AnalyzerService] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            cache_dir = self.fingerprints.cache_dir
+            # spawn: los workers no heredan el event loop ni los hilos del proceso principal
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.parser, str(self.fingerprints.path), str(cache_dir) if cache_dir else None),
+            )
+        return self._pool
+
+    def warm_up(self) -> None:
+        """Arranca todos los workers por adelantado (evita la latencia del primer análisis)."""
+        pool = self._get_pool()
+        for future in [pool.submit(_ready) for _ in range(self.workers)]:
+            future.result()
+
+    async def _submit(self, fn, *args):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self._get_pool(), fn, *args)
+
+    async def analyze_async(self, html_content: str, headers: Dict[str, str], company: Company) -> Company:
+        result = await self._submit(
+            _analyze_in_worker, html_content, dict(headers), self.fingerprints.current.digest
+        )
+        return result.apply(company)
+
+    async def analyze_compliance_async(self, html_content: str, company: Company) -> Company:
+        result = await self._submit(_compliance_in_worker, html_content, self.fingerprints.current.digest)
+        return result.apply(company)
+
+    async def find_legal_links(self, html_content: str, base_url: str, limit: int = 3) -> List[str]:
+        return await self._submit(_legal_links_in_worker, html_content, base_url, limit)
+
+    def _analyzer(self) -> AnalyzerService:
+        # Para llamadas síncronas: análisis en el propio proceso con la misma base
+        if self._local is None:
+            self._local = AnalyzerService(self.parser, self.fingerprints)
+        return self._local
+
+    def analyze(self, html_content: str, headers: Dict[str, str], company: Company) -> Company:
+        return self._analyzer().analyze(html_content, headers, company)
+
+    def analyze_stack(self, html_content: str, headers: Dict[str, str], company: Company) -> Company:
+        return self._analyzer().analyze_stack(html_content, headers, company)
+
+    def analyze_compliance(self, html_content: str, company: Company) -> Company:
+        return self._analyzer().analyze_compliance(html_content, company)
+
+    def signature(self, html_content: str, headers: Dict[str, str]) -> str:
+        # En el propio proceso: una pasada de regex cuesta menos que el viaje al pool
+        return self._analyzer().signature(html_content, headers)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self) -> "ProcessPoolAnalyzer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,89 @@
+import hashlib
+import re
+from typing import Iterator, Mapping
+from .fingerprint_db import FingerprintDatabase
+from .fingerprints import ELEMENT_SIGNALS
+from .location_detector import LocationDetector
+
+# Etiquetas cuyos atributos leen las huellas; se extraen sin parsear el documento
+# (un `>` dentro de un valor entre comillas no cierra la etiqueta)
+_TAG = re.compile(r'''<(meta|link|script|input)\b((?:[^>"']|"[^"]*"|'[^']*')*)>''', re.IGNORECASE)
+_ATTRIBUTE = re.compile(r'''([\w:.-]+)\s*=\s*("[^"]*"|'[^']*'|[^\s"'>]+)''')
+
+# Atributos de cookie que cambian en cada respuesta
+_VOLATILE_COOKIE_ATTRIBUTES = ('expires', 'max-age')
+
+class ContentSignature:
+    """
+    Firma compacta de lo que miran los detectores en un documento. Si no cambia
+    entre dos escaneos, el análisis daría lo mismo y se reutiliza sin parsear.
+
+    Se calcula con expresiones regulares en una pasada (mucho más barata que el
+    parseo) a partir de:
+    - cabeceras con reglas (su valor normalizado, si alguna regla lo mira) y
+      cookies sin su valor
+    - src/id de <script>, href de <link> (sin query: suele ser un cache-buster),
+      name de <input> y los <meta> con reglas (el `content`, si alguna lo mira;
+      así un token CSRF no cambia la firma)
+    - las reglas `cookie`/`link`/`script` que coinciden con el valor completo:
+      lo que se descarta arriba sigue contando si alguna regla lo lee (p.ej. un
+      `?ver=` o el contenido de una cookie)
+    - reglas `url` que coinciden en el HTML crudo
+    - la ubicación que daría LocationDetector (casi siempre se resuelve en su
+      primer nivel, sin candidatos)
+
+    Lo volátil (nonces, tokens CSRF, fechas, texto editorial) no entra. Incluye el
+    digest de la base de huellas: con reglas nuevas cambian todas las firmas.
+    """
+    def __init__(self, database: FingerprintDatabase):
+        self.database = database
+        self._engine = database.engine
+        self._header_names = database.engine.header_names
+        self._meta_names = database.engine.meta_names
+        self._elements = {(tag, attribute) for tag, attribute in ELEMENT_SIGNALS.values()}
+        self._location = LocationDetector(database.postal_code_regex, database.keywords)
+
+    def _parts(self, html: str, headers: Mapping[str, str]) -> Iterator[str]:
+        yield self.database.digest
+        lowered = {name.lower(): value for name, value in headers.items()}
+        for name, reads_value in self._header_names.items():
+            if name in lowered:
+                value = ' '.join(lowered[name].lower().split()) if reads_value else ''
+                yield f"header:{name}={value}"
+        cookies = lowered.get('set-cookie', '')
+        yield "cookie-rules:" + ','.join(sorted(self._engine.text_hits('cookie', cookies)))
+        for cookie in cookies.splitlines():
+            name, _, rest = cookie.partition('=')
+            attributes = [
+                a.strip().lower() for a in rest.split(';')[1:]
+                if not a.strip().lower().startswith(_VOLATILE_COOKIE_ATTRIBUTES)
+            ]
+            yield f"cookie:{name.strip()};{';'.join(sorted(attributes))}"
+
+        elements = set()
+        for match in _TAG.finditer(html):
+            tag = match.group(1).lower()
+            attrs = {k.lower(): v.strip('"\'') for k, v in _ATTRIBUTE.findall(match.group(2))}
+            if tag == 'meta':
+                reads_content = self._meta_names.get(attrs.get('name'))
+                if reads_content is not None:
+                    elements.add(f"meta:{attrs['name']}={attrs.get('content', '') if reads_content else ''}")
+            elif tag in ('link', 'script'):
+                reference = attrs.get('href' if tag == 'link' else 'src')
+                if reference:
+                    rules = ','.join(sorted(self._engine.text_hits(tag, reference)))
+                    elements.add(f"{tag}:{reference.split('?')[0]}:{rules}")
+            for attribute, value in attrs.items():
+                if (tag, attribute) in self._elements:
+                    elements.add(f"{tag}.{attribute}={value}")
+        yield from sorted(elements)
+
+        yield "url:" + ','.join(sorted(self._engine.url_hits(html)))
+        yield f"location:{self._location.locate(html)}"
+
+    def compute(self, html: str, headers: Mapping[str, str]) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        for part in self._parts(html, headers):
+            digest.update(part.encode('utf-8', 'replace'))
+            digest.update(b'\n')
+        return digest.hexdigest()
@@ -0,0 +1,134 @@
+import os
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from typing import Mapping, Optional
+from ...application.jobs import ScanJobRunner
+from ...application.metrics import ScanMetrics
+from ...application.ports import IAnalyzer
+from ...application.single_flight import SingleFlight
+from ...application.use_cases import CrawlBudget, ScanCompanyUseCase
+from ..analysis.analyzer_service import AnalyzerService
+from ..analysis.fingerprint_db import FingerprintStore
+from ..analysis.process_pool import ProcessPoolAnalyzer
+from ..cache.scan_cache import DEFAULT_TTL, SQLiteScanCache
+from ..jobs.sqlite_job_store import SQLiteJobStore
+from ..scraping.dns import DnsCache
+from ..scraping.scheduler import RequestScheduler
+from ..scraping.scraper import AsyncWebScraper
+
+@dataclass
+class ServiceSettings:
+    """Configuración de la API (variables de entorno HUNTER_*)."""
+    scan_cache: Optional[str] = None  # caché de resultados SQLite
+    scan_cache_ttl: float = DEFAULT_TTL
+    analysis_workers: int = 0  # procesos para el análisis HTML (0 = en el proceso de la API)
+    job_store: str = '.hunter-jobs.sqlite'
+    job_concurrency: int = 20
+    job_workers: int = 2
+    max_connections: int = 100
+    # Conexiones abiertas que se conservan entre peticiones. Más keep-alive ahorra
+    # handshakes (TLS) al volver a un sitio, pero httpcore recorre el pool entero en
+    # cada asignación: con 100 el CPU por petición sube ~50% frente a 20 (api_load_bench)
+    max_keepalive: int = 20
+    max_per_host: int = 6
+    # Caché DNS compartida por todas las peticiones. Opcional: ahorra consultas con
+    # dominios reales; con IPs (api_load_bench) solo añade una capa por conexión
+    dns_cache: bool = False
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> "ServiceSettings":
+        env = os.environ if environ is None else environ
+        return cls(
+            scan_cache=env.get('HUNTER_SCAN_CACHE') or None,
+            scan_cache_ttl=float(env.get('HUNTER_SCAN_CACHE_TTL', DEFAULT_TTL)),
+            analysis_workers=int(env.get('HUNTER_ANALYSIS_WORKERS', 0)),
+            job_store=env.get('HUNTER_JOB_STORE', cls.job_store),
+            job_concurrency=int(env.get('HUNTER_JOB_CONCURRENCY', cls.job_concurrency)),
+            job_workers=int(env.get('HUNTER_JOB_WORKERS', cls.job_workers)),
+            max_connections=int(env.get('HUNTER_MAX_CONNECTIONS', cls.max_connections)),
+            max_keepalive=int(env.get('HUNTER_MAX_KEEPALIVE', cls.max_keepalive)),
+            max_per_host=int(env.get('HUNTER_MAX_PER_HOST', cls.max_per_host)),
+            dns_cache=env.get('HUNTER_DNS_CACHE', '0').lower() not in ('0', 'false', 'no', ''),
+        )
+
+class AppContainer:
+    """
+    Dependencias de larga vida de la API. Se crean y se calientan una sola vez
+    (lifespan), y los endpoints las reciben con `Depends(get_container)`.
+
+    - base de huellas recargable en caliente y analizador con las reglas ya
+      compiladas y un análisis de muestra hecho (o pool de procesos arrancado)
+    - un único scraper: su pool de conexiones (y la caché DNS, si se activa) duran lo
+      que el proceso
+    - casos de uso de /scan (con y sin rastreo) construidos de antemano
+    - coalescencia, métricas, caché de resultados y trabajos por lotes compartidos
+      entre /scan y /scans
+
+    Uso: `async with AppContainer(settings) as container: ...`
+    """
+    def __init__(self, settings: Optional[ServiceSettings] = None):
+        self.settings = settings or ServiceSettings.from_env()
+        self._stack = AsyncExitStack()
+
+    async def __aenter__(self) -> "AppContainer":
+        try:
+            await self._start()
+        except BaseException:
+            await self._stack.aclose()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        # En orden inverso: trabajos, almacén, scraper, analizador, caché
+        await self._stack.aclose()
+
+    async def _start(self) -> None:
+        settings = self.settings
+        self.fingerprints = FingerprintStore()
+        self.cache: Optional[SQLiteScanCache] = None
+        if settings.scan_cache:
+            self.cache = SQLiteScanCache(settings.scan_cache, ttl=settings.scan_cache_ttl)
+            self._stack.callback(self.cache.close)
+
+        self.analyzer: IAnalyzer
+        if settings.analysis_workers:
+            self.analyzer = ProcessPoolAnalyzer(settings.analysis_workers, fingerprints=self.fingerprints)
+            self._stack.callback(self.analyzer.close)
+        else:
+            self.analyzer = AnalyzerService(fingerprints=self.fingerprints)
+        self.analyzer.warm_up()
+
+        # Escaneos simultáneos del mismo sitio (desde /scan o desde trabajos) se comparten
+        self.flights = SingleFlight()
+        # Tiempos por etapa y coincidencias por regla de todos los escaneos (GET /metrics)
+        self.metrics = ScanMetrics()
+        self.resolver = DnsCache() if settings.dns_cache else None
+        self.scraper = await self._stack.enter_async_context(AsyncWebScraper(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive,
+            scheduler=RequestScheduler(max_per_host=settings.max_per_host, resolver=self.resolver),
+            resolver=self.resolver,
+        ))
+        self._scan = self._use_case(crawl=None)
+        self._crawl_scan = self._use_case(crawl=CrawlBudget())
+
+        # Trabajos por lotes (POST /scans), persistidos para sobrevivir a reinicios
+        store = SQLiteJobStore(settings.job_store)
+        self._stack.callback(store.close)
+        self.jobs = ScanJobRunner(
+            store, self.scraper, self.analyzer, cache=self.cache,
+            concurrency=settings.job_concurrency, max_jobs=settings.job_workers,
+            flights=self.flights, metrics=self.metrics,
+        )
+        await self.jobs.start()
+        self._stack.push_async_callback(self.jobs.stop)
+
+    def _use_case(self, crawl: Optional[CrawlBudget]) -> ScanCompanyUseCase:
+        return ScanCompanyUseCase(
+            self.scraper, self.analyzer, cache=self.cache, crawl=crawl,
+            flights=self.flights, resolver=self.resolver, metrics=self.metrics,
+        )
+
+    def scan_use_case(self, crawl: bool = False) -> ScanCompanyUseCase:
+        """Caso de uso compartido de /scan (no guarda estado por petición)."""
+        return self._crawl_scan if crawl else self._scan
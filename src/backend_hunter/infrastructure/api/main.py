@@ -1,28 +1,65 @@
-from fastapi import FastAPI, HTTPException
-from ...application.use_cases import ScanCompanyUseCase
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from ...application.jobs import FINISHED, ScanJobRunner
+from ...application.metrics import ScanMetrics
+from ...application.ports import ScanJob
 from ...infrastructure.scraping.scraper import AsyncWebScraper
-from ...infrastructure.analysis.analyzer_service import AnalyzerService
-from .schemas import ScanRequest, ScanResponse
+from ...infrastructure.analysis.fingerprint_db import FingerprintStore
+from ...infrastructure.cache.scan_cache import SQLiteScanCache
+from . import prometheus
+from .container import AppContainer
+from .schemas import FingerprintsResponse, ScanJobRequest, ScanJobResponse, ScanRequest, ScanResponse
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Todo lo de larga vida se crea y se calienta aquí, una vez (ver AppContainer)
+    async with AppContainer() as container:
+        app.state.container = container
+        yield
 
 app = FastAPI(
     title="The Backend Hunter Intelligence API",
     version="0.1.0",
-    description="API para detectar Stack Tecnológico y conformidad fiscal de empresas."
+    description="API para detectar Stack Tecnológico y conformidad fiscal de empresas.",
+    lifespan=lifespan
 )
 
+# Dependencias `async def`: FastAPI ejecuta las síncronas en el threadpool,
+# un salto de hilo por dependencia y petición para leer un atributo
+
+async def get_container(request: Request) -> AppContainer:
+    return request.app.state.container
+
+async def get_scraper(container: AppContainer = Depends(get_container)) -> AsyncWebScraper:
+    return container.scraper
+
+async def get_fingerprints(container: AppContainer = Depends(get_container)) -> FingerprintStore:
+    return container.fingerprints
+
+async def get_cache(container: AppContainer = Depends(get_container)) -> Optional[SQLiteScanCache]:
+    return container.cache
+
+async def get_jobs(container: AppContainer = Depends(get_container)) -> ScanJobRunner:
+    return container.jobs
+
+async def get_metrics(container: AppContainer = Depends(get_container)) -> ScanMetrics:
+    return container.metrics
+
 @app.post("/scan", response_model=ScanResponse)
-async def scan_company(request: ScanRequest):
+async def scan_company(request: ScanRequest, container: AppContainer = Depends(get_container)):
     """
     Escanea una URL y devuelve la inteligencia detectada.
     """
-    # Inyección de Dependencias
-    scraper = AsyncWebScraper()
-    analyzer = AnalyzerService()
-    use_case = ScanCompanyUseCase(scraper, analyzer)
-    
+    # Caso de uso ya construido sobre las dependencias compartidas del contenedor
+    use_case = container.scan_use_case(crawl=request.crawl)
+
     try:
         company = await use_case.execute(request.url)
-        
+
         # Mapeo manual simple de Entidad -> DTO (Schema)
         return ScanResponse(
             url=company.url,
@@ -30,11 +67,131 @@ async def scan_company(request: ScanRequest):
             detected_frameworks=[f.value for f in company.detected_frameworks],
             compliance_status=company.compliance_status.value,
             postal_code=company.postal_code,
-            location_details=company.location_details
+            location_details=company.location_details,
+            cache_status=company.cache_status,
+            error=company.scan_error,
+            error_class=company.error_class,
+            attempts=company.attempts,
+            pages_scanned=company.pages_scanned,
+            truncated=company.truncated,
+            timings_ms={stage: round(seconds * 1000, 2) for stage, seconds in company.timings.items()}
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/health")
-def health_check():
-    return {"status": "ok"}
+def health_check(
+    scraper: AsyncWebScraper = Depends(get_scraper),
+    cache: Optional[SQLiteScanCache] = Depends(get_cache),
+):
+    health = {"status": "ok", "connection_pool": scraper.stats.as_dict()}
+    if cache:
+        health["scan_cache"] = cache.stats.as_dict()
+    return health
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint(
+    metrics: ScanMetrics = Depends(get_metrics),
+    scraper: AsyncWebScraper = Depends(get_scraper),
+    cache: Optional[SQLiteScanCache] = Depends(get_cache),
+):
+    """
+    Métricas en formato Prometheus: histogramas por etapa, escaneos y reglas.
+    """
+    body = prometheus.render(metrics, scraper.stats, cache.stats if cache else None)
+    return PlainTextResponse(body, media_type=prometheus.CONTENT_TYPE)
+
+@app.post("/fingerprints/reload", response_model=FingerprintsResponse)
+def reload_fingerprints(fingerprints: FingerprintStore = Depends(get_fingerprints)):
+    """
+    Recarga la base de huellas desde disco sin reiniciar el proceso.
+    Los escaneos en curso terminan con la versión anterior.
+    """
+    try:
+        changed = fingerprints.reload()
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    database = fingerprints.current
+    return FingerprintsResponse(
+        source=database.source,
+        digest=database.digest,
+        rules=len(database.fingerprints),
+        reloaded=changed
+    )
+
+def _job_response(job: ScanJob, results: Optional[List[Dict[str, Any]]] = None,
+                  offset: int = 0, limit: int = 0) -> ScanJobResponse:
+    as_datetime = lambda ts: datetime.fromtimestamp(ts) if ts else None
+    return ScanJobResponse(
+        id=job.id,
+        status=job.status,
+        total=job.total,
+        completed=job.completed,
+        errors=job.errors,
+        progress=round(job.completed / job.total, 4) if job.total else 1.0,
+        crawl=job.crawl,
+        created_at=as_datetime(job.created_at),
+        started_at=as_datetime(job.started_at),
+        finished_at=as_datetime(job.finished_at),
+        error=job.error,
+        offset=offset,
+        limit=limit,
+        results=results or []
+    )
+
+@app.post("/scans", response_model=ScanJobResponse, status_code=202)
+async def create_scan_job(request: ScanJobRequest, jobs: ScanJobRunner = Depends(get_jobs)):
+    """
+    Encola un lote de URLs y devuelve el ID del trabajo al instante.
+    """
+    return _job_response(jobs.submit(request.urls, crawl=request.crawl))
+
+@app.get("/scans/{job_id}", response_model=ScanJobResponse)
+async def get_scan_job(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    jobs: ScanJobRunner = Depends(get_jobs),
+):
+    """
+    Progreso del trabajo y una página de resultados (en orden de entrada).
+    """
+    job = jobs.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return _job_response(job, jobs.store.results(job_id, offset, limit), offset, limit)
+
+@app.get("/scans/{job_id}/results")
+async def stream_scan_results(
+    job_id: str,
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    jobs: ScanJobRunner = Depends(get_jobs),
+):
+    """
+    Resultados en streaming según terminan (NDJSON o Server-Sent Events).
+    Empieza por los ya terminados y se cierra cuando el trabajo acaba.
+    """
+    if jobs.store.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    def encode(row: Dict[str, Any]) -> str:
+        data = json.dumps(row, ensure_ascii=False, default=str)
+        return f"data: {data}\n\n" if format == "sse" else data + "\n"
+
+    async def results():
+        cursor = 0
+        while True:
+            job = jobs.store.get(job_id)
+            rows, cursor = jobs.store.results_since(job_id, cursor)
+            for row in rows:
+                yield encode(row)
+            # El estado se lee antes que las filas: si ya había terminado, no quedan filas por emitir
+            if job.status in FINISHED:
+                if format == "sse":
+                    yield f"event: done\ndata: {_job_response(job).model_dump_json()}\n\n"
+                return
+            await jobs.wait_for_update(job_id)
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(results(), media_type=media_type)
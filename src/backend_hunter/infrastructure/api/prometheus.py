@@ -0,0 +1,60 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from ...application.metrics import ScanMetrics
+from ...application.ports import CacheStats
+from ..scraping.scraper import PoolStats
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+def _metric(lines: List[str], name: str, kind: str, help: str,
+            samples: Iterable[Tuple[str, Dict[str, str], float]]) -> None:
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} {kind}")
+    for suffix, labels, value in samples:
+        # Enteros tal cual: `:g` perdería precisión en contadores grandes
+        number = str(value) if isinstance(value, int) else repr(float(value))
+        lines.append(f"{name}{suffix}{_labels(labels)} {number}")
+
+def render(metrics: ScanMetrics, pool: Optional[PoolStats] = None, cache: Optional[CacheStats] = None) -> str:
+    """Formato de texto de exposición de Prometheus."""
+    lines: List[str] = []
+
+    def stage_samples():
+        for stage, histogram in metrics.stages.items():
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                yield "_bucket", {"stage": stage, "le": f"{bound:g}"}, cumulative
+            yield "_bucket", {"stage": stage, "le": "+Inf"}, histogram.count
+            yield "_sum", {"stage": stage}, histogram.sum
+            yield "_count", {"stage": stage}, histogram.count
+
+    _metric(lines, "hunter_stage_seconds", "histogram",
+            "Duración de cada etapa del escaneo (red, parseo, detección).", stage_samples())
+    _metric(lines, "hunter_scans_total", "counter", "Escaneos terminados por resultado y clase de error.", (
+        ("", {"outcome": outcome, "error_class": error_class}, count)
+        for (outcome, error_class), count in sorted(metrics.scans.items())
+    ))
+    _metric(lines, "hunter_rule_hits_total", "counter", "Coincidencias de cada regla de huellas.", (
+        ("", {"rule": rule}, count) for rule, count in sorted(metrics.rule_hits.items())
+    ))
+    if pool is not None:
+        _metric(lines, "hunter_http_requests_total", "counter",
+                "Peticiones HTTP por reutilización de conexión.", (
+                    ("", {"connection": "reused"}, pool.hits),
+                    ("", {"connection": "new"}, pool.misses),
+                ))
+    if cache is not None:
+        _metric(lines, "hunter_scan_cache_total", "counter", "Consultas a la caché de escaneos por resultado.", (
+            ("", {"result": "hit"}, cache.hits),
+            ("", {"result": "stale"}, cache.stale),
+            ("", {"result": "miss"}, cache.misses),
+        ))
+    return "\n".join(lines) + "\n"
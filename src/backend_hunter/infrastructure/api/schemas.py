@@ -1,9 +1,11 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
 from ...domain.enums import BackendStack, Framework, ComplianceStatus
 
 class ScanRequest(BaseModel):
     url: str
+    crawl: bool = False  # rastrear aviso legal / contacto si la portada no tiene CP
 
 class ScanResponse(BaseModel):
     url: str
@@ -12,6 +14,40 @@ class ScanResponse(BaseModel):
     compliance_status: str
     postal_code: Optional[str]
     location_details: str
+    cache_status: Optional[str] = None
+    error: Optional[str] = None
+    error_class: Optional[str] = None
+    attempts: int = 0
+    pages_scanned: int = 0
+    truncated: bool = False
+    timings_ms: Dict[str, float] = {}  # duración de cada etapa del escaneo
 
     class Config:
         from_attributes = True
+
+class FingerprintsResponse(BaseModel):
+    source: str
+    digest: str
+    rules: int
+    reloaded: bool
+
+class ScanJobRequest(BaseModel):
+    urls: List[str] = Field(min_length=1)
+    crawl: bool = False
+
+class ScanJobResponse(BaseModel):
+    id: str
+    status: str
+    total: int
+    completed: int
+    errors: int
+    progress: float
+    crawl: bool
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    # Página de resultados en orden de entrada (solo en GET /scans/{id})
+    offset: int = 0
+    limit: int = 0
+    results: List[Dict[str, Any]] = []
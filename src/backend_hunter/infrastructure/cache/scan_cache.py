@@ -0,0 +1,118 @@
+import json
+import sqlite3
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+from ...application.ports import CachedScan, CacheStats, IScanCache
+from ...domain.entities import Company
+from ...domain.enums import BackendStack, ComplianceStatus, Framework
+
+DEFAULT_TTL = 7 * 24 * 3600  # una semana: coincide con el ciclo de re-escaneo
+
+def company_to_dict(company: Company) -> Dict[str, Any]:
+    return {
+        'url': company.url,
+        'name': company.name,
+        'detected_stacks': sorted(s.value for s in company.detected_stacks),
+        'detected_frameworks': sorted(f.value for f in company.detected_frameworks),
+        'compliance_status': company.compliance_status.value,
+        'postal_code': company.postal_code,
+        'location_details': company.location_details,
+        'last_scanned_at': company.last_scanned_at.isoformat() if company.last_scanned_at else None,
+        'pages_scanned': company.pages_scanned,
+        'truncated': company.truncated,
+        'ip_addresses': list(company.ip_addresses),
+    }
+
+def company_from_dict(data: Dict[str, Any]) -> Company:
+    return Company(
+        url=data['url'],
+        name=data.get('name'),
+        detected_stacks={BackendStack(s) for s in data.get('detected_stacks', [])},
+        detected_frameworks={Framework(f) for f in data.get('detected_frameworks', [])},
+        compliance_status=ComplianceStatus(data.get('compliance_status', ComplianceStatus.UNKNOWN.value)),
+        postal_code=data.get('postal_code'),
+        location_details=data.get('location_details', ''),
+        last_scanned_at=datetime.fromisoformat(data['last_scanned_at']) if data.get('last_scanned_at') else None,
+        # Entradas anteriores a estos campos se leen con los valores por defecto
+        pages_scanned=data.get('pages_scanned', 0),
+        truncated=data.get('truncated', False),
+        ip_addresses=data.get('ip_addresses', []),
+    )
+
+class SQLiteScanCache(IScanCache):
+    """
+    Caché persistente de escaneos en SQLite con una LRU en memoria delante.
+    Las operaciones son locales y cortas, se ejecutan directamente en el event loop.
+    """
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL, memory_items: int = 10_000):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.memory_items = memory_items
+        self.stats = CacheStats()
+        self._memory: "OrderedDict[str, CachedScan]" = OrderedDict()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scan_cache (
+                key TEXT PRIMARY KEY,
+                company TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                signature TEXT
+            )
+            """
+        )
+        # Cachés creadas antes de las firmas
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(scan_cache)")}
+        if 'signature' not in columns:
+            self._db.execute("ALTER TABLE scan_cache ADD COLUMN signature TEXT")
+        self._db.commit()
+
+    def _remember(self, key: str, entry: CachedScan) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[CachedScan]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry
+
+        row = self._db.execute(
+            "SELECT company, content_hash, stored_at, etag, last_modified, signature FROM scan_cache WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        entry = CachedScan(
+            company=company_from_dict(json.loads(row[0])),
+            content_hash=row[1],
+            stored_at=row[2],
+            etag=row[3],
+            last_modified=row[4],
+            signature=row[5],
+        )
+        self._remember(key, entry)
+        return entry
+
+    async def put(self, key: str, entry: CachedScan) -> None:
+        self._remember(key, entry)
+        self._db.execute(
+            "INSERT OR REPLACE INTO scan_cache (key, company, content_hash, stored_at, etag, last_modified, signature) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, json.dumps(company_to_dict(entry.company)), entry.content_hash,
+             entry.stored_at, entry.etag, entry.last_modified, entry.signature),
+        )
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
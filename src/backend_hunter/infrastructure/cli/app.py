@@ -1,21 +1,28 @@
 import typer
-import asyncio
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from pathlib import Path
 from rich.console import Console
-from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from ...application.use_cases import ScanCompanyUseCase
-from ...application.bulk_scan import BulkScanUseCase, export_report
-from ...infrastructure.scraping.scraper import AsyncWebScraper
-from ...infrastructure.analysis.analyzer_service import AnalyzerService
+from ...application.report_writers import EXPORT_FORMATS, STREAM_FORMATS
 from ...domain.entities import Company
 from ...domain.enums import ComplianceStatus
+from .distribute import distribute_app
+
+# Lo pesado (pandas/pyarrow, httpx, lxml, asyncio, el pool de procesos) se importa dentro de
+# cada comando: `hunter --help` no carga nada y `hunter scan` no carga pandas
+if TYPE_CHECKING:
+    from ...application.metrics import ScanMetrics
+    from ...application.use_cases import CrawlBudget
+    from ...infrastructure.cache.scan_cache import SQLiteScanCache
 
 app = typer.Typer(help="The Backend Hunter Intelligence CLI")
+app.add_typer(distribute_app, name="distribute")
 console = Console()
+# Mensajes de `hunter stream`: stdout queda solo para los resultados
+err_console = Console(stderr=True)
 
 def print_company_report(company: Company):
+    from rich.table import Table
+
     table = Table(title=f"Reporte: {company.url}")
     
     table.add_column("Aspecto", style="cyan", no_wrap=True)
@@ -37,72 +44,335 @@ def print_company_report(company: Company):
     table.add_row("Conformidad FCT (Baleares)", f"[{compliant_style}]{compliance_text}[/{compliant_style}]")
     if company.location_details:
         table.add_row("Detalles Ubicación", company.location_details)
+    if company.cache_status:
+        table.add_row("Caché", company.cache_status)
+    if company.truncated:
+        table.add_row("Aviso", "[yellow]Página recortada por tamaño: detección parcial[/yellow]")
+    if company.scan_error:
+        table.add_row("Error", f"[red]{company.error_class}[/red] tras {company.attempts} intento(s): {company.scan_error}")
 
     console.print(table)
 
+def crawl_budget(enabled: bool, pages: int, max_kb: int) -> Optional["CrawlBudget"]:
+    from ...application.use_cases import CrawlBudget
+
+    return CrawlBudget(max_pages=pages, max_bytes=max_kb * 1024) if enabled else None
+
+def open_cache(path: Optional[str], ttl_hours: float) -> Optional["SQLiteScanCache"]:
+    from ...infrastructure.cache.scan_cache import SQLiteScanCache
+
+    return SQLiteScanCache(path, ttl=ttl_hours * 3600) if path else None
+
 @app.command()
-def scan(url: str):
+def scan(
+    url: str,
+    cache: Optional[str] = typer.Option(None, "--cache", help="Caché SQLite de resultados (p.ej. .hunter-cache.sqlite)"),
+    cache_ttl: float = typer.Option(168, "--cache-ttl", help="Horas durante las que un resultado en caché es válido"),
+    crawl: bool = typer.Option(False, "--crawl", help="Si la portada no tiene CP, rastrea aviso legal / contacto"),
+    crawl_pages: int = typer.Option(3, "--crawl-pages", help="Páginas secundarias máximas por sitio"),
+    crawl_kb: int = typer.Option(2048, "--crawl-kb", help="KB máximos descargados en páginas secundarias por sitio")
+):
     """
     Escanea una URL individual en busca de stack tecnológico y conformidad fiscal.
     """
+    import asyncio
+    from ...application.use_cases import ScanCompanyUseCase
+    from ...infrastructure.analysis.analyzer_service import AnalyzerService
+    from ...infrastructure.scraping.scraper import AsyncWebScraper
+
     async def _run():
         console.print(f"[bold blue]Escaneando:[/bold blue] {url} ...")
         
-        scraper = AsyncWebScraper()
         analyzer = AnalyzerService()
-        use_case = ScanCompanyUseCase(scraper, analyzer)
-        
-        company = await use_case.execute(url)
+        async with AsyncWebScraper() as scraper:
+            use_case = ScanCompanyUseCase(
+                scraper, analyzer, cache=open_cache(cache, cache_ttl),
+                crawl=crawl_budget(crawl, crawl_pages, crawl_kb)
+            )
+            company = await use_case.execute(url)
         print_company_report(company)
 
     asyncio.run(_run())
 
+def print_timings(metrics: "ScanMetrics"):
+    from rich.table import Table
+
+    table = Table(title="Tiempo por etapa (ms)")
+    for column in ("Etapa", "n", "media", "p50", "p95"):
+        table.add_column(column, justify="left" if column == "Etapa" else "right")
+    for row in metrics.summary():
+        table.add_row(
+            row['stage'], str(row['count']),
+            f"{row['mean_ms']:.1f}", f"{row['p50_ms']:.1f}", f"{row['p95_ms']:.1f}",
+        )
+    console.print(table)
+    if metrics.rule_hits:
+        console.print("[bold]Reglas con más coincidencias:[/bold]")
+        for rule, count in metrics.rule_hits.most_common(10):
+            console.print(f"  • {rule}: {count}")
+
 @app.command()
 def bulk(
     csv_file: str = typer.Argument(..., help="Ruta al archivo CSV con las URLs"),
     url_column: str = typer.Option("url", "--column", "-c", help="Nombre de la columna con las URLs"),
     output: str = typer.Option("report.csv", "--output", "-o", help="Archivo de salida"),
-    format: str = typer.Option("csv", "--format", "-f", help="Formato de salida: csv, json, excel"),
-    concurrency: int = typer.Option(5, "--concurrency", "-n", help="Número de escaneos simultáneos")
+    format: str = typer.Option("csv", "--format", "-f", help="Formato de salida: csv, json, ndjson, excel, parquet, arrow (con --stream: csv, ndjson, parquet, arrow)"),
+    concurrency: int = typer.Option(5, "--concurrency", "-n", help="Número de escaneos simultáneos"),
+    max_connections: int = typer.Option(100, "--max-connections", help="Conexiones HTTP máximas en el pool"),
+    max_per_host: int = typer.Option(6, "--max-per-host", help="Conexiones HTTP máximas por host"),
+    per_host_rate: Optional[float] = typer.Option(None, "--per-host-rate", help="Peticiones por segundo máximas a un mismo host"),
+    group_by_ip: bool = typer.Option(False, "--group-by-ip", help="Aplica los límites por host a la IP resuelta (hostings compartidos)"),
+    adaptive: bool = typer.Option(False, "--adaptive", help="Ajusta la concurrencia (AIMD) según latencia y 429/503/timeouts; -n pasa a ser el máximo"),
+    min_concurrency: int = typer.Option(4, "--min-concurrency", help="Concurrencia mínima en modo --adaptive"),
+    retries: int = typer.Option(2, "--retries", help="Reintentos ante timeouts, errores de conexión y 429/5xx"),
+    breaker_threshold: int = typer.Option(3, "--breaker-threshold", help="Fallos seguidos que cortocircuitan un host durante 5 minutos"),
+    max_kb: int = typer.Option(5120, "--max-kb", help="KB máximos leídos por página (el resto se descarta)"),
+    head_kb: Optional[int] = typer.Option(None, "--head-kb", help="Corta la descarga tras el </head> y estos KB (solo stack)"),
+    dns_cache: bool = typer.Option(True, "--dns-cache/--no-dns-cache", help="Caché DNS con TTL y pre-resolución de hosts por delante de los escaneos"),
+    dns_timeout: float = typer.Option(5.0, "--dns-timeout", help="Segundos máximos por resolución DNS"),
+    analysis_workers: int = typer.Option(0, "--analysis-workers", "-w", help="Procesos para el análisis HTML (0 = en el proceso principal)"),
+    cache: Optional[str] = typer.Option(None, "--cache", help="Caché SQLite de resultados (p.ej. .hunter-cache.sqlite)"),
+    cache_ttl: float = typer.Option(168, "--cache-ttl", help="Horas durante las que un resultado en caché es válido"),
+    crawl: bool = typer.Option(False, "--crawl", help="Si la portada no tiene CP, rastrea aviso legal / contacto"),
+    crawl_pages: int = typer.Option(3, "--crawl-pages", help="Páginas secundarias máximas por sitio"),
+    crawl_kb: int = typer.Option(2048, "--crawl-kb", help="KB máximos descargados en páginas secundarias por sitio"),
+    timings: bool = typer.Option(False, "--timings", help="Columnas *_ms por etapa en el reporte y resumen de tiempos y reglas"),
+    delta: bool = typer.Option(False, "--delta", help="Feed de cambios: revalida todo contra la caché y reporta solo los sitios que cambiaron (requiere --cache)"),
+    stream: bool = typer.Option(False, "--stream", help="Modo streaming: lee por bloques y escribe cada resultado al terminar (memoria constante)"),
+    chunk_size: int = typer.Option(10_000, "--chunk-size", help="Filas del CSV leídas por bloque en modo streaming"),
+    journal_path: Optional[str] = typer.Option(None, "--journal", help="Diario de checkpoints (SQLite) para poder reanudar"),
+    resume: bool = typer.Option(False, "--resume", help="Reanuda desde el diario: salta las filas ya completadas")
 ):
     """
     Escanea múltiples URLs desde un archivo CSV y genera un reporte.
     """
+    if resume and not journal_path:
+        journal_path = f"{output}.journal"
+    if stream and journal_path:
+        raise typer.BadParameter("--stream y --journal/--resume no se pueden combinar")
+    if delta and not cache:
+        raise typer.BadParameter("--delta necesita --cache con los resultados del escaneo anterior")
+    if output == "-":
+        raise typer.BadParameter("Para resultados por stdout usa `hunter stream`")
+    # Antes de escanear: un formato no soportado no debe descubrirse al exportar.
+    # En streaming `json` se escribe como NDJSON
+    formats = (*STREAM_FORMATS, 'json') if stream else EXPORT_FORMATS
+    if format not in formats:
+        raise typer.BadParameter(
+            f"'{format}' no disponible{' con --stream' if stream else ''}: {', '.join(formats)}",
+            param_hint="--format",
+        )
+
+    import asyncio
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from ...application.bulk_scan import BulkScanUseCase, BulkSummary, changed_rows, export_report, journal_to_dataframe
+    from ...application.metrics import ScanMetrics
+    from ...application.report_writers import ChangedRowsWriter, open_report_writer
+    from ...infrastructure.analysis.analyzer_service import AnalyzerService
+    from ...infrastructure.analysis.process_pool import ProcessPoolAnalyzer
+    from ...infrastructure.journal.sqlite_journal import SQLiteScanJournal
+    from ...infrastructure.scraping.dns import DnsCache
+    from ...infrastructure.scraping.retry import CircuitBreaker, RetryPolicy
+    from ...infrastructure.scraping.scheduler import AdaptiveLimiter, RequestScheduler
+    from ...infrastructure.scraping.scraper import AsyncWebScraper
+
     async def _run():
-        scraper = AsyncWebScraper()
-        analyzer = AnalyzerService()
-        use_case = BulkScanUseCase(scraper, analyzer, concurrency=concurrency)
-        
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console
-        ) as progress:
-            progress.add_task(description=f"Escaneando URLs desde {csv_file}...", total=None)
-            df = await use_case.execute_from_csv(csv_file, url_column)
+        if analysis_workers > 0:
+            analyzer = ProcessPoolAnalyzer(workers=analysis_workers)
+            analyzer.warm_up()
+        else:
+            analyzer = AnalyzerService()
+        limiter = AdaptiveLimiter(minimum=min(min_concurrency, concurrency), maximum=concurrency) if adaptive else None
+        resolver = DnsCache(timeout=dns_timeout) if dns_cache else None
+        metrics = ScanMetrics() if timings else None
+        scheduler = RequestScheduler(
+            max_per_host=max_per_host,
+            per_host_rate=per_host_rate,
+            group_by_ip=group_by_ip,
+            limiter=limiter,
+            resolver=resolver,
+        )
+        async with AsyncWebScraper(
+            max_connections=max_connections,
+            scheduler=scheduler,
+            retry=RetryPolicy(max_attempts=retries + 1),
+            breaker=CircuitBreaker(failure_threshold=breaker_threshold),
+            max_bytes=max_kb * 1024,
+            head_kb=head_kb,
+            resolver=resolver,
+        ) as scraper:
+            # En modo delta todo se revalida: la firma decide si hay que reanalizar
+            use_case = BulkScanUseCase(
+                scraper, analyzer, concurrency=concurrency, cache=open_cache(cache, 0 if delta else cache_ttl),
+                crawl=crawl_budget(crawl, crawl_pages, crawl_kb), resolver=resolver,
+                metrics=metrics, timings=timings, delta=delta,
+            )
+
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                console=console
+            ) as progress:
+                progress.add_task(description=f"Escaneando URLs desde {csv_file}...", total=None)
+                if stream:
+                    writer = open_report_writer(output, format, use_case.columns)
+                    if delta:
+                        writer = ChangedRowsWriter(writer)
+                    with writer:
+                        summary = await use_case.execute_stream_from_csv(
+                            csv_file, writer, url_column, chunk_size=chunk_size
+                        )
+                elif journal_path:
+                    # Cada resultado queda en el diario al terminar; el reporte se genera al final
+                    journal = SQLiteScanJournal(journal_path)
+                    run = await use_case.execute_stream_from_csv(
+                        csv_file, url_column=url_column, chunk_size=chunk_size,
+                        journal=journal, resume=resume
+                    )
+                    df = journal_to_dataframe(journal, use_case.columns)
+                    journal.close()
+                    summary = BulkSummary.from_dataframe(df)
+                    summary.resumed = run.resumed
+                else:
+                    df = await use_case.execute_from_csv(csv_file, url_column)
+                    summary = BulkSummary.from_dataframe(df)
+        if isinstance(analyzer, ProcessPoolAnalyzer):
+            analyzer.close()
         
         # Mostrar resumen
-        console.print(f"\n[bold green]✓ Escaneo completado:[/bold green] {len(df)} empresas")
+        console.print(f"\n[bold green]✓ Escaneo completado:[/bold green] {summary.total} empresas")
         
         # Estadísticas
-        success_count = len(df[df['status'] == 'success'])
-        error_count = len(df[df['status'] == 'error'])
-        console.print(f"  ├─ Exitosos: {success_count}")
-        console.print(f"  └─ Errores: {error_count}")
+        if summary.resumed:
+            console.print(f"  ├─ Reanudados (ya completados): {summary.resumed}")
+        if use_case.duplicates:
+            console.print(f"  ├─ Duplicados (escaneados una sola vez): {use_case.duplicates}")
+        console.print(f"  ├─ Exitosos: {summary.success}")
+        console.print(f"  ├─ Errores: {summary.errors}")
+        for error_class, count in summary.error_counts.most_common(5):
+            console.print(f"  │   • {error_class}: {count}")
+        console.print(f"  ├─ Reintentos: {scraper.retries} · hosts cortocircuitados: {scraper.breaker.open_hosts}")
+        pool = scraper.stats
+        console.print(f"  └─ Conexiones reutilizadas: {pool.hits}/{pool.requests} ({pool.hit_ratio:.0%})")
+        polite = scheduler.stats
+        if polite.congested or polite.retry_after_waits or polite.rate_waits:
+            console.print(
+                f"\n[bold]Cortesía:[/bold] {polite.congested} respuestas 429/503/timeout · "
+                f"{polite.retry_after_waits} esperas Retry-After · {polite.rate_waits} esperas por ritmo"
+            )
+        if resolver:
+            dns = resolver.stats
+            console.print(f"[bold]DNS:[/bold] {dns.misses} consultas · {dns.hits} aciertos de caché · {dns.failures} fallos")
+        if limiter:
+            console.print(f"[bold]Concurrencia adaptativa:[/bold] límite final {limiter.limit} ({limiter.minimum}-{limiter.maximum})")
+        if use_case.scan_use_case.cache:
+            stats = use_case.scan_use_case.cache.stats
+            console.print(f"\n[bold]Caché:[/bold] {stats.hits} hit · {stats.stale} stale · {stats.misses} miss")
+        if delta:
+            console.print(f"[bold]Cambios:[/bold] {summary.changed} sitios con diferencias frente al escaneo anterior")
         
+        if metrics:
+            print_timings(metrics)
+
         # Tech Stack breakdown
-        if success_count > 0:
+        if summary.success > 0:
             console.print("\n[bold]Tecnologías detectadas:[/bold]")
-            tech_counts = df['tech_stacks'].value_counts()
-            for tech, count in tech_counts.head(5).items():
+            for tech, count in summary.tech_counts.most_common(5):
                 if tech:
                     console.print(f"  • {tech}: {count}")
         
-        # Exportar
-        export_report(df, output, format)
+        # Exportar (en streaming el reporte ya se escribió fila a fila)
+        if not stream:
+            export_report(changed_rows(df) if delta else df, output, format)
         console.print(f"\n[bold blue]Reporte guardado:[/bold blue] {output}")
 
     asyncio.run(_run())
 
+@app.command()
+def stream(
+    concurrency: int = typer.Option(20, "--concurrency", "-n", help="Número de escaneos simultáneos"),
+    max_connections: int = typer.Option(100, "--max-connections", help="Conexiones HTTP máximas en el pool"),
+    max_per_host: int = typer.Option(6, "--max-per-host", help="Conexiones HTTP máximas por host"),
+    retries: int = typer.Option(2, "--retries", help="Reintentos ante timeouts, errores de conexión y 429/5xx"),
+    max_kb: int = typer.Option(5120, "--max-kb", help="KB máximos leídos por página (el resto se descarta)"),
+    dns_cache: bool = typer.Option(True, "--dns-cache/--no-dns-cache", help="Caché DNS con TTL y pre-resolución de hosts"),
+    analysis_workers: int = typer.Option(0, "--analysis-workers", "-w", help="Procesos para el análisis HTML (0 = en el proceso principal)"),
+    cache: Optional[str] = typer.Option(None, "--cache", help="Caché SQLite de resultados (p.ej. .hunter-cache.sqlite)"),
+    cache_ttl: float = typer.Option(168, "--cache-ttl", help="Horas durante las que un resultado en caché es válido"),
+    crawl: bool = typer.Option(False, "--crawl", help="Si la portada no tiene CP, rastrea aviso legal / contacto"),
+    crawl_pages: int = typer.Option(3, "--crawl-pages", help="Páginas secundarias máximas por sitio"),
+    crawl_kb: int = typer.Option(2048, "--crawl-kb", help="KB máximos descargados en páginas secundarias por sitio"),
+    timings: bool = typer.Option(False, "--timings", help="Campos *_ms por etapa en cada resultado"),
+    delta: bool = typer.Option(False, "--delta", help="Solo los sitios que cambiaron frente a la caché (requiere --cache)"),
+    buffer: int = typer.Option(1000, "--buffer", help="URLs leídas de stdin por delante de los escaneos"),
+    quiet: bool = typer.Option(False, "--quiet", "-q", help="Sin resumen final en stderr"),
+):
+    """
+    Lee URLs o dominios de stdin (uno por línea) y escribe en stdout un resultado
+    NDJSON por línea al terminar cada escaneo: `cat dominios.txt | hunter stream | jq`.
+    """
+    if delta and not cache:
+        raise typer.BadParameter("--delta necesita --cache con los resultados del escaneo anterior")
+
+    import asyncio
+    import os
+    import sys
+    import time
+    from ...application.bulk_scan import BulkScanUseCase, read_lines
+    from ...application.report_writers import ChangedRowsWriter, open_report_writer
+    from ...infrastructure.analysis.analyzer_service import AnalyzerService
+    from ...infrastructure.analysis.process_pool import ProcessPoolAnalyzer
+    from ...infrastructure.scraping.dns import DnsCache
+    from ...infrastructure.scraping.retry import RetryPolicy
+    from ...infrastructure.scraping.scheduler import RequestScheduler
+    from ...infrastructure.scraping.scraper import AsyncWebScraper
+
+    async def _run():
+        if analysis_workers > 0:
+            analyzer = ProcessPoolAnalyzer(workers=analysis_workers)
+            analyzer.warm_up()
+        else:
+            analyzer = AnalyzerService()
+        resolver = DnsCache() if dns_cache else None
+        scheduler = RequestScheduler(max_per_host=max_per_host, resolver=resolver)
+        started = time.perf_counter()
+        try:
+            async with AsyncWebScraper(
+                max_connections=max_connections, scheduler=scheduler,
+                retry=RetryPolicy(max_attempts=retries + 1), max_bytes=max_kb * 1024, resolver=resolver,
+            ) as scraper:
+                use_case = BulkScanUseCase(
+                    scraper, analyzer, concurrency=concurrency, cache=open_cache(cache, 0 if delta else cache_ttl),
+                    crawl=crawl_budget(crawl, crawl_pages, crawl_kb), resolver=resolver,
+                    timings=timings, delta=delta,
+                )
+                writer = open_report_writer("-", "ndjson", use_case.columns)
+                if delta:
+                    writer = ChangedRowsWriter(writer)
+                with writer:
+                    summary = await use_case.execute_stream(read_lines(sys.stdin, buffer), writer)
+        finally:
+            if isinstance(analyzer, ProcessPoolAnalyzer):
+                analyzer.close()
+        if not quiet:
+            elapsed = time.perf_counter() - started
+            err_console.print(
+                f"[bold green]✓[/bold green] {summary.total} URLs en {elapsed:.1f} s "
+                f"({summary.total / elapsed if elapsed else 0:.1f}/s) · {summary.success} exitosas · "
+                f"{summary.errors} errores · {use_case.duplicates} duplicados"
+            )
+
+    try:
+        asyncio.run(_run())
+    except BrokenPipeError:
+        # El consumidor cerró la tubería (p.ej. `| head`): se termina sin traza.
+        # stdout se redirige a /dev/null para que el flush final no vuelva a fallar.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        raise typer.Exit(1)
+    except UnicodeDecodeError as e:
+        # Los resultados ya escritos se conservan; se informa sin traza
+        err_console.print(f"[red]stdin no es texto válido ({e.encoding}):[/red] {e.reason} en el byte {e.start}")
+        raise typer.Exit(1)
+
 if __name__ == "__main__":
     app()
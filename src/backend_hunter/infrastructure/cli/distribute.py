@@ -0,0 +1,209 @@
+import subprocess
+import sys
+from typing import List, Optional
+import typer
+from rich.console import Console
+from ...application.ports import RunProgress
+from ...application.report_writers import STREAM_FORMATS
+from ...infrastructure.jobs.sqlite_work_queue import SQLiteWorkQueue
+
+distribute_app = typer.Typer(help="Escaneo masivo repartido entre varios workers (cola SQLite compartida)")
+console = Console()
+
+QUEUE_OPTION = typer.Option(".hunter-queue.sqlite", "--queue", "-q", help="Fichero de la cola compartida")
+LEASE_OPTION = typer.Option(300.0, "--lease", help="Segundos de arrendamiento de un bloque (vence si el worker muere)")
+WAL_OPTION = typer.Option(True, "--wal/--no-wal", help="WAL (un solo host); --no-wal si la cola está en un disco compartido por red")
+
+def _progress_line(progress: RunProgress) -> str:
+    return (
+        f"{progress.done}/{progress.units} bloques · {progress.leased} en curso · "
+        f"{progress.pending} pendientes · {progress.failed} abandonados"
+    )
+
+@distribute_app.command()
+def submit(
+    csv_file: str = typer.Argument(..., help="CSV con las URLs"),
+    url_column: str = typer.Option("url", "--column", "-c"),
+    queue: str = QUEUE_OPTION,
+    chunk_size: int = typer.Option(500, "--chunk-size", help="URLs por bloque de trabajo"),
+    crawl: bool = typer.Option(False, "--crawl", help="Rastrea aviso legal / contacto si la portada no tiene CP"),
+    wal: bool = WAL_OPTION,
+):
+    """
+    Reparte un CSV en bloques de la cola e imprime el ID del escaneo.
+    """
+    from ...application.bulk_scan import read_csv_urls
+    from ...application.distributed import DistributedBulkScan
+
+    work_queue = SQLiteWorkQueue(queue, wal=wal)
+    run_id = DistributedBulkScan(work_queue).submit(read_csv_urls(csv_file, url_column), chunk_size, crawl)
+    progress = work_queue.progress(run_id)
+    console.print(f"Escaneo [bold]{run_id}[/bold]: {progress.total} URLs en {progress.units} bloques")
+    work_queue.close()
+
+@distribute_app.command()
+def worker(
+    queue: str = QUEUE_OPTION,
+    run_id: Optional[str] = typer.Option(None, "--run", help="Solo bloques de este escaneo"),
+    concurrency: int = typer.Option(20, "--concurrency", "-n", help="Escaneos simultáneos del worker"),
+    max_connections: int = typer.Option(100, "--max-connections"),
+    max_per_host: int = typer.Option(6, "--max-per-host"),
+    retries: int = typer.Option(2, "--retries"),
+    analysis_workers: int = typer.Option(0, "--analysis-workers", "-w", help="Procesos para el análisis HTML"),
+    cache: Optional[str] = typer.Option(None, "--cache", help="Caché SQLite local de resultados"),
+    dns_cache: bool = typer.Option(True, "--dns-cache/--no-dns-cache"),
+    lease: float = LEASE_OPTION,
+    wal: bool = WAL_OPTION,
+    wait: bool = typer.Option(False, "--wait", help="Sigue esperando trabajo nuevo en lugar de salir al vaciarse la cola"),
+):
+    """
+    Arrienda bloques de la cola y los escanea hasta que no queda trabajo.
+    """
+    import asyncio
+    from ...application.distributed import ScanWorker
+    from ...infrastructure.analysis.analyzer_service import AnalyzerService
+    from ...infrastructure.analysis.process_pool import ProcessPoolAnalyzer
+    from ...infrastructure.cache.scan_cache import SQLiteScanCache
+    from ...infrastructure.scraping.dns import DnsCache
+    from ...infrastructure.scraping.retry import RetryPolicy
+    from ...infrastructure.scraping.scheduler import RequestScheduler
+    from ...infrastructure.scraping.scraper import AsyncWebScraper
+
+    async def _run():
+        work_queue = SQLiteWorkQueue(queue, lease_seconds=lease, wal=wal)
+        if analysis_workers > 0:
+            analyzer = ProcessPoolAnalyzer(workers=analysis_workers)
+            analyzer.warm_up()
+        else:
+            analyzer = AnalyzerService()
+        resolver = DnsCache() if dns_cache else None
+        scheduler = RequestScheduler(max_per_host=max_per_host, resolver=resolver)
+        async with AsyncWebScraper(
+            max_connections=max_connections, scheduler=scheduler,
+            retry=RetryPolicy(max_attempts=retries + 1), resolver=resolver,
+        ) as scraper:
+            scan_worker = ScanWorker(
+                work_queue, scraper, analyzer, concurrency=concurrency,
+                cache=SQLiteScanCache(cache) if cache else None, resolver=resolver,
+                renew_every=lease / 3,
+            )
+            console.print(f"Worker [bold]{scan_worker.worker_id}[/bold] esperando bloques de {queue}")
+            await scan_worker.run(run_id, exit_when_idle=not wait)
+        if isinstance(analyzer, ProcessPoolAnalyzer):
+            analyzer.close()
+        work_queue.close()
+        console.print(
+            f"Worker {scan_worker.worker_id}: {scan_worker.units} bloques, "
+            f"{scan_worker.scanned} URLs ({scan_worker.errors} errores)"
+            + (f", {scan_worker.lost} bloques perdidos por arrendamiento vencido" if scan_worker.lost else "")
+        )
+
+    asyncio.run(_run())
+
+@distribute_app.command()
+def status(run_id: str = typer.Argument(...), queue: str = QUEUE_OPTION):
+    """
+    Progreso de un escaneo distribuido.
+    """
+    # Solo lectura: no se cambia el modo de diario de la cola (WAL o no)
+    work_queue = SQLiteWorkQueue(queue, wal=None)
+    progress = work_queue.progress(run_id)
+    work_queue.close()
+    if not progress.units:
+        raise typer.BadParameter(f"Escaneo {run_id} no encontrado en {queue}")
+    state = "terminado" if progress.finished else "en curso"
+    console.print(f"Escaneo {run_id} ({state}): {_progress_line(progress)} · {progress.total} URLs")
+
+def _merge(work_queue: SQLiteWorkQueue, run_id: str, output: str, format: str) -> None:
+    from ...application.distributed import DistributedBulkScan
+    from ...application.report_writers import open_report_writer
+
+    with open_report_writer(output, format) as writer:
+        summary = DistributedBulkScan(work_queue).merge(run_id, writer)
+    console.print(
+        f"[bold green]✓ Reporte combinado:[/bold green] {output} · {summary.total} filas "
+        f"({summary.success} exitosas, {summary.errors} errores)"
+    )
+
+@distribute_app.command()
+def merge(
+    run_id: str = typer.Argument(...),
+    queue: str = QUEUE_OPTION,
+    output: str = typer.Option("report.csv", "--output", "-o"),
+    format: str = typer.Option("csv", "--format", "-f", help=f"Formato: {', '.join(STREAM_FORMATS)}"),
+):
+    """
+    Combina las filas entregadas por los workers en un único reporte (en orden de entrada).
+    """
+    work_queue = SQLiteWorkQueue(queue, wal=None)
+    progress = work_queue.progress(run_id)
+    if not progress.finished:
+        console.print(f"[yellow]Aviso:[/yellow] el escaneo no ha terminado ({_progress_line(progress)})")
+    _merge(work_queue, run_id, output, format)
+    work_queue.close()
+
+@distribute_app.command()
+def coordinate(
+    csv_file: str = typer.Argument(..., help="CSV con las URLs"),
+    url_column: str = typer.Option("url", "--column", "-c"),
+    queue: str = QUEUE_OPTION,
+    output: str = typer.Option("report.csv", "--output", "-o"),
+    format: str = typer.Option("csv", "--format", "-f", help=f"Formato: {', '.join(STREAM_FORMATS)}"),
+    chunk_size: int = typer.Option(500, "--chunk-size"),
+    crawl: bool = typer.Option(False, "--crawl"),
+    local_workers: int = typer.Option(0, "--local-workers", "-l", help="Workers a lanzar en esta máquina"),
+    concurrency: int = typer.Option(20, "--concurrency", "-n", help="Escaneos simultáneos por worker local"),
+    lease: float = LEASE_OPTION,
+    wal: bool = WAL_OPTION,
+):
+    """
+    Reparte el CSV, espera a los workers (locales o de otras máquinas) y combina el reporte.
+    """
+    import asyncio
+    from ...application.bulk_scan import read_csv_urls
+    from ...application.distributed import DistributedBulkScan
+
+    async def _run():
+        work_queue = SQLiteWorkQueue(queue, lease_seconds=lease, wal=wal)
+        coordinator = DistributedBulkScan(work_queue)
+        run_id = coordinator.submit(read_csv_urls(csv_file, url_column), chunk_size, crawl)
+        progress = work_queue.progress(run_id)
+        console.print(f"Escaneo [bold]{run_id}[/bold]: {progress.total} URLs en {progress.units} bloques")
+        if not local_workers:
+            console.print(f"Lanza workers con: hunter distribute worker --queue {queue} --run {run_id}")
+
+        command = [
+            sys.executable, "-m", "backend_hunter.main", "distribute", "worker",
+            "--queue", queue, "--run", run_id, "-n", str(concurrency), "--lease", str(lease),
+            "--wal" if wal else "--no-wal",
+        ]
+        workers: List[subprocess.Popen] = [
+            subprocess.Popen(command, stdout=subprocess.DEVNULL) for _ in range(local_workers)
+        ]
+        last_line = ""
+
+        def report(progress: RunProgress) -> None:
+            nonlocal last_line
+            line = _progress_line(progress)
+            if line != last_line:
+                console.print(f"  {line}")
+                last_line = line
+
+        # Solo con workers locales: si todos han salido sin terminar, no tiene sentido esperar
+        all_exited = lambda: bool(workers) and all(w.poll() is not None for w in workers)
+        progress = await coordinator.wait(run_id, on_progress=report, should_stop=all_exited)
+        for w in workers:
+            w.wait()
+        if coordinator.requeued:
+            console.print(f"  Bloques devueltos a la cola por arrendamiento vencido: {coordinator.requeued}")
+        if not progress.finished:
+            work_queue.close()
+            console.print(
+                f"[red]Los workers locales terminaron con bloques pendientes.[/red] "
+                f"Lanza más workers y combina con: hunter distribute merge {run_id} --queue {queue}"
+            )
+            raise typer.Exit(1)
+        _merge(work_queue, run_id, output, format)
+        work_queue.close()
+
+    asyncio.run(_run())
@@ -0,0 +1,159 @@
+import json
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from ...application.ports import IJobStore, IScanJournal, ScanJob
+
+class _JobJournal(IScanJournal):
+    """Diario de checkpoints de un trabajo, sobre la base del almacén."""
+    def __init__(self, db: sqlite3.Connection, job_id: str):
+        self._db = db
+        self.job_id = job_id
+
+    def completed(self) -> Dict[int, str]:
+        return dict(self._db.execute(
+            "SELECT idx, url FROM job_results WHERE job_id = ? AND status = 'success'", (self.job_id,)
+        ))
+
+    def record(self, index: int, url: str, row: Dict[str, Any]) -> None:
+        # REPLACE asigna un `seq` nuevo: un reintento aparece como resultado reciente
+        self._db.execute(
+            "INSERT OR REPLACE INTO job_results (job_id, idx, url, status, row, finished_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (self.job_id, index, url, row['status'], json.dumps(row, ensure_ascii=False, default=str), time.time()),
+        )
+        self._db.commit()
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        for (row,) in self._db.execute(
+            "SELECT row FROM job_results WHERE job_id = ? ORDER BY idx", (self.job_id,)
+        ):
+            yield json.loads(row)
+
+    def reset(self) -> None:
+        self._db.execute("DELETE FROM job_results WHERE job_id = ?", (self.job_id,))
+        self._db.commit()
+
+class SQLiteJobStore(IJobStore):
+    """
+    Almacén de trabajos por lotes en SQLite (WAL): entrada, estado y resultados.
+    Un trabajo interrumpido por un reinicio se reanuda desde sus resultados ya guardados.
+    Usar desde el hilo del event loop (la conexión no se comparte entre hilos).
+    """
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                total INTEGER NOT NULL,
+                crawl INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                error TEXT
+            );
+            CREATE TABLE IF NOT EXISTS job_urls (
+                job_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                PRIMARY KEY (job_id, idx)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS job_results (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                status TEXT NOT NULL,
+                row TEXT NOT NULL,
+                finished_at REAL NOT NULL,
+                UNIQUE (job_id, idx)
+            );
+            """
+        )
+        self._db.commit()
+
+    def create(self, urls: List[str], crawl: bool = False) -> ScanJob:
+        job = ScanJob(id=uuid.uuid4().hex, status='queued', total=len(urls), created_at=time.time(), crawl=crawl)
+        with self._db:
+            self._db.execute(
+                "INSERT INTO jobs (id, status, total, crawl, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job.id, job.status, job.total, int(crawl), job.created_at),
+            )
+            self._db.executemany(
+                "INSERT INTO job_urls (job_id, idx, url) VALUES (?, ?, ?)",
+                ((job.id, index, url) for index, url in enumerate(urls)),
+            )
+        return job
+
+    def _job(self, row: Tuple) -> ScanJob:
+        job_id, status, total, crawl, created_at, started_at, finished_at, error = row
+        completed, errors = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(status != 'success'), 0) FROM job_results WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        return ScanJob(
+            id=job_id, status=status, total=total, created_at=created_at, crawl=bool(crawl),
+            completed=completed, errors=errors,
+            started_at=started_at, finished_at=finished_at, error=error,
+        )
+
+    def get(self, job_id: str) -> Optional[ScanJob]:
+        row = self._db.execute(
+            "SELECT id, status, total, crawl, created_at, started_at, finished_at, error FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        return self._job(row) if row else None
+
+    def unfinished(self) -> List[ScanJob]:
+        rows = self._db.execute(
+            "SELECT id, status, total, crawl, created_at, started_at, finished_at, error FROM jobs "
+            "WHERE status IN ('queued', 'running') ORDER BY created_at"
+        ).fetchall()
+        return [self._job(row) for row in rows]
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        now = time.time()
+        self._db.execute(
+            """
+            UPDATE jobs SET status = ?, error = ?,
+                started_at = CASE WHEN ? = 'running' THEN COALESCE(started_at, ?) ELSE started_at END,
+                finished_at = CASE WHEN ? IN ('done', 'failed') THEN ? ELSE NULL END
+            WHERE id = ?
+            """,
+            (status, error, status, now, status, now, job_id),
+        )
+        self._db.commit()
+
+    def urls(self, job_id: str) -> Iterator[str]:
+        # Lectura completa: el cursor no puede quedar abierto mientras se escriben resultados
+        rows = self._db.execute("SELECT url FROM job_urls WHERE job_id = ? ORDER BY idx", (job_id,)).fetchall()
+        for (url,) in rows:
+            yield url
+
+    def journal(self, job_id: str) -> IScanJournal:
+        return _JobJournal(self._db, job_id)
+
+    def results(self, job_id: str, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        rows = self._db.execute(
+            "SELECT row FROM job_results WHERE job_id = ? ORDER BY idx LIMIT ? OFFSET ?",
+            (job_id, limit, offset),
+        )
+        return [json.loads(row) for (row,) in rows]
+
+    def results_since(self, job_id: str, cursor: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        rows = self._db.execute(
+            "SELECT seq, row FROM job_results WHERE job_id = ? AND seq > ? ORDER BY seq", (job_id, cursor)
+        ).fetchall()
+        if not rows:
+            return [], cursor
+        return [json.loads(row) for _, row in rows], rows[-1][0]
+
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,188 @@
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from ...application.ports import IWorkQueue, RunProgress, WorkUnit
+
+class SQLiteWorkQueue(IWorkQueue):
+    """
+    Cola de trabajo de escaneos distribuidos sobre un fichero SQLite compartido.
+
+    Cada proceso (coordinador o worker) abre su propia conexión. Arrendar un bloque
+    es una transacción `BEGIN IMMEDIATE`: dos workers nunca se llevan el mismo.
+    Un bloque arrendado `max_attempts` veces sin terminar (p.ej. una URL que tumba
+    al worker) se abandona y sus URLs se reportan como error al combinar.
+
+    En una sola máquina se usa WAL. Para workers en varias máquinas el fichero debe
+    estar en un sistema de ficheros con bloqueos fiables, con `wal=False` (WAL
+    necesita memoria compartida entre procesos del mismo host). Con `wal=None` se
+    respeta el modo que ya tenga el fichero (SQLite lo guarda en él): así lo abren
+    los comandos que solo consultan la cola.
+    """
+    def __init__(self, path: str, lease_seconds: float = 300.0, max_attempts: int = 3,
+                 wal: Optional[bool] = True):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # Autocommit: las transacciones se abren explícitamente en `_transaction`
+        self._db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        if wal is not None:
+            self._db.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                id TEXT PRIMARY KEY,
+                total INTEGER NOT NULL DEFAULT 0,
+                crawl INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS units (
+                run_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                start INTEGER NOT NULL,
+                urls TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (run_id, idx)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS units_status ON units (status, lease_expires);
+            CREATE TABLE IF NOT EXISTS results (
+                run_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                row TEXT NOT NULL,
+                PRIMARY KEY (run_id, idx)
+            ) WITHOUT ROWID;
+            """
+        )
+
+    @contextmanager
+    def _transaction(self):
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def create_run(self, urls: Iterable[str], chunk_size: int = 500, crawl: bool = False) -> str:
+        run_id = uuid.uuid4().hex[:12]
+        urls = iter(urls)
+        total = 0
+        with self._transaction():
+            self._db.execute(
+                "INSERT INTO runs (id, crawl, created_at) VALUES (?, ?, ?)", (run_id, int(crawl), time.time())
+            )
+            index = 0
+            while True:
+                chunk = list(islice(urls, chunk_size))
+                if not chunk:
+                    break
+                self._db.execute(
+                    "INSERT INTO units (run_id, idx, start, urls) VALUES (?, ?, ?, ?)",
+                    (run_id, index, total, json.dumps(chunk)),
+                )
+                index += 1
+                total += len(chunk)
+            self._db.execute("UPDATE runs SET total = ? WHERE id = ?", (total, run_id))
+        return run_id
+
+    def _requeue_expired(self, now: float) -> int:
+        abandoned = self._db.execute(
+            "UPDATE units SET status = 'failed', worker = NULL "
+            "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+            (now, self.max_attempts),
+        ).rowcount
+        requeued = self._db.execute(
+            "UPDATE units SET status = 'pending', worker = NULL WHERE status = 'leased' AND lease_expires < ?",
+            (now,),
+        ).rowcount
+        return abandoned + requeued
+
+    def lease(self, worker_id: str, run_id: Optional[str] = None) -> Optional[WorkUnit]:
+        now = time.time()
+        with self._transaction():
+            self._requeue_expired(now)
+            query = (
+                "SELECT u.run_id, u.idx, u.start, u.urls, r.crawl, u.attempts "
+                "FROM units u JOIN runs r ON r.id = u.run_id WHERE u.status = 'pending'"
+            )
+            params: Tuple = ()
+            if run_id is not None:
+                query += " AND u.run_id = ?"
+                params = (run_id,)
+            row = self._db.execute(query + " ORDER BY r.created_at, u.idx LIMIT 1", params).fetchone()
+            if row is None:
+                return None
+            unit_run, index, start, urls, crawl, attempts = row
+            self._db.execute(
+                "UPDATE units SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE run_id = ? AND idx = ?",
+                (worker_id, now + self.lease_seconds, unit_run, index),
+            )
+        return WorkUnit(unit_run, index, start, json.loads(urls), bool(crawl), attempts + 1)
+
+    def renew(self, unit: WorkUnit, worker_id: str) -> bool:
+        with self._transaction():
+            return self._db.execute(
+                "UPDATE units SET lease_expires = ? WHERE run_id = ? AND idx = ? AND status = 'leased' AND worker = ?",
+                (time.time() + self.lease_seconds, unit.run_id, unit.index, worker_id),
+            ).rowcount == 1
+
+    def complete(self, unit: WorkUnit, worker_id: str, rows: List[Tuple[int, Dict[str, Any]]]) -> bool:
+        # Solo quien tiene el arrendamiento entrega: si el bloque volvió a la cola o
+        # ya es de otro worker, estas filas se descartan y cuentan las del nuevo dueño
+        with self._transaction():
+            owned = self._db.execute(
+                "UPDATE units SET status = 'done', lease_expires = NULL "
+                "WHERE run_id = ? AND idx = ? AND status = 'leased' AND worker = ?",
+                (unit.run_id, unit.index, worker_id),
+            ).rowcount == 1
+            if owned:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO results (run_id, idx, row) VALUES (?, ?, ?)",
+                    ((unit.run_id, index, json.dumps(row, ensure_ascii=False, default=str)) for index, row in rows),
+                )
+        return owned
+
+    def requeue_expired(self) -> int:
+        with self._transaction():
+            return self._requeue_expired(time.time())
+
+    def progress(self, run_id: Optional[str] = None) -> RunProgress:
+        where, params = ("WHERE run_id = ?", (run_id,)) if run_id else ("", ())
+        progress = RunProgress()
+        for status, count in self._db.execute(
+            f"SELECT status, COUNT(*) FROM units {where} GROUP BY status", params
+        ):
+            setattr(progress, status, count)
+            progress.units += count
+        total = self._db.execute(
+            f"SELECT COALESCE(SUM(total), 0) FROM runs {where.replace('run_id', 'id')}", params
+        ).fetchone()[0]
+        progress.total = total
+        return progress
+
+    def rows(self, run_id: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        cursor = self._db.execute("SELECT idx, row FROM results WHERE run_id = ? ORDER BY idx", (run_id,))
+        for index, row in cursor:
+            yield index, json.loads(row)
+
+    def failed_urls(self, run_id: str) -> Iterator[Tuple[int, str]]:
+        units = self._db.execute(
+            "SELECT start, urls FROM units WHERE run_id = ? AND status = 'failed' ORDER BY idx", (run_id,)
+        ).fetchall()
+        for start, urls in units:
+            for offset, url in enumerate(json.loads(urls)):
+                yield start + offset, url
+
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,52 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator
+from ...application.ports import IScanJournal
+
+class SQLiteScanJournal(IScanJournal):
+    """
+    Diario de checkpoints en SQLite (WAL).
+    Cada fila se confirma al registrarse: sobrevive a la caída del proceso
+    (OOM, Ctrl-C, despliegue) sin pagar un fsync por fila.
+    """
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS journal (
+                idx INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,
+                status TEXT NOT NULL,
+                row TEXT NOT NULL,
+                finished_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.commit()
+
+    def completed(self) -> Dict[int, str]:
+        return dict(self._db.execute("SELECT idx, url FROM journal WHERE status = 'success'"))
+
+    def record(self, index: int, url: str, row: Dict[str, Any]) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO journal (idx, url, status, row, finished_at) VALUES (?, ?, ?, ?, ?)",
+            (index, url, row['status'], json.dumps(row, ensure_ascii=False), time.time()),
+        )
+        self._db.commit()
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        for (row,) in self._db.execute("SELECT row FROM journal ORDER BY idx"):
+            yield json.loads(row)
+
+    def reset(self) -> None:
+        self._db.execute("DELETE FROM journal")
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,173 @@
+import asyncio
+import ipaddress
+import socket
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+import httpcore
+from ...application.ports import FetchError, IResolver
+from ...application.single_flight import SingleFlight
+
+@dataclass
+class DnsStats:
+    hits: int = 0
+    misses: int = 0
+    failures: int = 0  # NXDOMAIN, sin registros A/AAAA o resolutor caído
+
+    def as_dict(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'failures': self.failures}
+
+@dataclass
+class _Entry:
+    addresses: List[str]
+    expires_at: float
+    error: Optional[str] = None
+
+class DnsCache(IResolver):
+    """
+    Resolutor asíncrono con caché que respeta el TTL.
+
+    Con el extra `dns` (aiodns) consulta A/AAAA y usa el TTL de los registros,
+    acotado a [min_ttl, max_ttl]; sin él usa getaddrinfo con `default_ttl`.
+    Los fallos (NXDOMAIN, sin registros) se cachean `negative_ttl` segundos,
+    así un dominio muerto repetido no vuelve a esperar al resolutor.
+    """
+    def __init__(self, default_ttl: float = 300.0, negative_ttl: float = 60.0,
+                 min_ttl: float = 30.0, max_ttl: float = 3600.0, timeout: float = 5.0,
+                 max_concurrency: int = 256, max_entries: int = 100_000):
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_entries = max_entries
+        self.stats = DnsStats()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._flights = SingleFlight()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._resolver = None
+        try:
+            import aiodns
+            self._aiodns = aiodns
+        except ImportError:
+            self._aiodns = None
+
+    def cached(self, host: str) -> Optional[List[str]]:
+        """IPs en caché y vigentes (sin resolver)."""
+        entry = self._entries.get(host)
+        if entry is None or entry.error or entry.expires_at < time.monotonic():
+            return None
+        return entry.addresses
+
+    async def resolve(self, host: str) -> List[str]:
+        if _is_ip(host):
+            return [host]
+        entry = self._entries.get(host)
+        if entry is not None and entry.expires_at >= time.monotonic():
+            self.stats.hits += 1
+            self._entries.move_to_end(host)
+        else:
+            entry, shared = await self._flights.run(host, lambda: self._lookup(host))
+            # Quien se sumó a una consulta en curso no generó tráfico DNS
+            if shared:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+        if entry.error:
+            raise FetchError(f"DNS resolution failed for {host}: {entry.error}", 'dns', 0)
+        return entry.addresses
+
+    async def resolve_many(self, hosts: Iterable[str]) -> None:
+        """Pre-resuelve en paralelo (los fallos quedan en caché para fallar rápido después)."""
+        await asyncio.gather(*(self.resolve(h) for h in set(hosts)), return_exceptions=True)
+
+    async def _lookup(self, host: str) -> _Entry:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        async with self._slots:
+            try:
+                lookup = self._query if self._aiodns else self._getaddrinfo
+                addresses, ttl = await asyncio.wait_for(lookup(host), self.timeout)
+                entry = _Entry(addresses, time.monotonic() + min(max(ttl, self.min_ttl), self.max_ttl))
+            except asyncio.TimeoutError:
+                entry = _Entry([], time.monotonic() + self.negative_ttl, 'timeout')
+            except LookupError as e:
+                entry = _Entry([], time.monotonic() + self.negative_ttl, str(e))
+        if entry.error:
+            self.stats.failures += 1
+        self._entries[host] = entry
+        self._entries.move_to_end(host)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    async def _getaddrinfo(self, host: str):
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            if e.errno == socket.EAI_NONAME:
+                raise LookupError('NXDOMAIN')
+            if e.errno == getattr(socket, 'EAI_NODATA', None):
+                raise LookupError('no A/AAAA records')
+            raise LookupError(e.strerror or str(e))
+        return _ordered(info[4][0] for info in infos), self.default_ttl
+
+    async def _query(self, host: str):
+        if self._resolver is None:
+            self._resolver = self._aiodns.DNSResolver()
+        results = await asyncio.gather(
+            self._resolver.query(host, 'A'), self._resolver.query(host, 'AAAA'), return_exceptions=True
+        )
+        records = [r for result in results if isinstance(result, list) for r in result]
+        if not records:
+            codes = [r.args[0] for r in results if isinstance(r, self._aiodns.error.DNSError) and r.args]
+            if self._aiodns.error.ARES_ENOTFOUND in codes:
+                raise LookupError('NXDOMAIN')
+            if codes and all(code == self._aiodns.error.ARES_ENODATA for code in codes):
+                raise LookupError('no A/AAAA records')
+            raise LookupError(str(results[0]))
+        return _ordered(r.host for r in records), min(r.ttl for r in records)
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+def _ordered(addresses: Iterable[str]) -> List[str]:
+    # IPv4 primero (muchos entornos no tienen salida IPv6), sin duplicados
+    unique = list(dict.fromkeys(addresses))
+    return sorted(unique, key=lambda ip: ':' in ip)
+
+class CachedDnsBackend(httpcore.AsyncNetworkBackend):
+    """
+    Backend de red de httpcore que resuelve con DnsCache y conecta a la IP.
+    SNI y la verificación TLS siguen usando el nombre del host.
+    """
+    def __init__(self, resolver: DnsCache, backend: Optional[httpcore.AsyncNetworkBackend] = None):
+        self.resolver = resolver
+        self.backend = backend or httpcore.AnyIOBackend()
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        try:
+            addresses = await self.resolver.resolve(host)
+        except FetchError as e:
+            raise httpcore.ConnectError(str(e))
+        error: Optional[Exception] = None
+        for address in addresses[:2]:
+            try:
+                return await self.backend.connect_tcp(
+                    address, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        raise error
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self.backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self.backend.sleep(seconds)
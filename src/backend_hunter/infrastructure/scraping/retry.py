@@ -0,0 +1,109 @@
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+import httpx
+
+# Métodos que se pueden repetir sin efectos secundarios
+IDEMPOTENT_METHODS = {"GET", "HEAD"}
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Mensajes de getaddrinfo para dominios que no existen (no tiene sentido reintentar)
+_DNS_ERRORS = (
+    "name or service not known",
+    "nodename nor servname",
+    "no address associated",
+    "getaddrinfo failed",
+    "temporary failure in name resolution",
+    "dns resolution failed",  # DnsCache
+)
+
+def classify_error(error: Exception) -> str:
+    """Categoría estable de un fallo de red para reportes y decisiones de reintento."""
+    if isinstance(error, httpx.TimeoutException):
+        return 'timeout'
+    if isinstance(error, httpx.ConnectError):
+        message = str(error).lower()
+        return 'dns' if any(m in message for m in _DNS_ERRORS) else 'connect'
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"http_{error.response.status_code}"
+    if isinstance(error, (httpx.RemoteProtocolError, httpx.ReadError, httpx.WriteError)):
+        return 'protocol'
+    return type(error).__name__
+
+@dataclass
+class RetryPolicy:
+    """
+    Reintentos con backoff exponencial y jitter completo:
+    la espera antes del intento n+1 es uniforme en [0, min(max_delay, base_delay * 2**(n-1))].
+    Solo se reintentan métodos idempotentes y fallos transitorios.
+    """
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    retry_status: frozenset = frozenset(RETRYABLE_STATUS)
+
+    def is_retryable(self, method: str, error_class: str) -> bool:
+        if method not in IDEMPOTENT_METHODS:
+            return False
+        if error_class in ('timeout', 'connect', 'protocol'):
+            return True
+        return error_class.startswith('http_') and int(error_class[5:]) in self.retry_status
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+@dataclass
+class _Circuit:
+    failures: int = 0
+    opened_at: Optional[float] = None
+    probing: bool = False
+
+@dataclass
+class CircuitBreaker:
+    """
+    Cortocircuito por host: tras `failure_threshold` fallos seguidos de red o 5xx
+    el host queda abierto durante `reset_timeout` segundos y sus peticiones fallan
+    al instante. Pasado ese tiempo se deja pasar una única petición de prueba
+    (semiabierto): si va bien se cierra, si falla vuelve a abrirse.
+    """
+    failure_threshold: int = 3
+    reset_timeout: float = 300.0
+    _circuits: Dict[str, _Circuit] = field(default_factory=dict)
+
+    def allow(self, host: str) -> bool:
+        circuit = self._circuits.get(host)
+        if circuit is None or circuit.opened_at is None:
+            return True
+        if time.monotonic() - circuit.opened_at < self.reset_timeout or circuit.probing:
+            return False
+        circuit.probing = True
+        return True
+
+    def record_success(self, host: str) -> None:
+        # Solo se guardan hosts con fallos: la memoria no crece con la lista
+        self._circuits.pop(host, None)
+
+    def release(self, host: str) -> None:
+        """Petición terminada sin veredicto (cancelada, error ajeno al host): libera la prueba."""
+        circuit = self._circuits.get(host)
+        if circuit is not None:
+            circuit.probing = False
+
+    def record_failure(self, host: str) -> None:
+        circuit = self._circuits.setdefault(host, _Circuit())
+        circuit.failures += 1
+        if circuit.probing or circuit.failures >= self.failure_threshold:
+            circuit.opened_at = time.monotonic()
+            circuit.probing = False
+
+    @property
+    def open_hosts(self) -> int:
+        return sum(1 for c in self._circuits.values() if c.opened_at is not None)
+
+def counts_against_host(error_class: str) -> bool:
+    """Fallos que indican que el host está caído (un 4xx o un 429 no lo indican)."""
+    if error_class in ('timeout', 'connect', 'dns', 'protocol'):
+        return True
+    return error_class.startswith('http_5')
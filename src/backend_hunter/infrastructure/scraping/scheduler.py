@@ -0,0 +1,227 @@
+import asyncio
+import socket
+import statistics
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, List, Optional
+import httpx
+from ...application.ports import IResolver
+
+# Respuestas que indican que estamos saturando al servidor (no fallos propios del sitio)
+CONGESTION_STATUS = {429, 503}
+# Cada cuánto (s) se descartan los hosts inactivos sin ritmo ni bloqueo pendiente
+PRUNE_INTERVAL = 30.0
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Segundos a esperar según Retry-After (entero o fecha HTTP)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class AdaptiveLimiter:
+    """
+    Límite global de peticiones en vuelo ajustado con AIMD.
+
+    Cada ventana de `limit` peticiones completadas se evalúa: si hubo congestión
+    (429/503/timeouts por encima de `error_threshold`) o la latencia mediana supera
+    `latency_factor` veces la mejor observada, el límite se multiplica por `decrease`;
+    si no, sube `increase`.
+    """
+    def __init__(self, minimum: int = 4, maximum: int = 200, initial: Optional[int] = None,
+                 increase: int = 4, decrease: float = 0.7,
+                 error_threshold: float = 0.05, latency_factor: float = 2.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = initial or min(maximum, max(minimum, 16))
+        self.increase = increase
+        self.decrease = decrease
+        self.error_threshold = error_threshold
+        self.latency_factor = latency_factor
+        self.in_flight = 0
+        self.adjustments = 0
+        self._baseline: Optional[float] = None
+        self._latencies: List[float] = []
+        self._completed = 0
+        self._congested = 0
+        self._cond: Optional[asyncio.Condition] = None
+
+    def _condition(self) -> asyncio.Condition:
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    async def acquire(self) -> None:
+        cond = self._condition()
+        async with cond:
+            await cond.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self, latency: Optional[float], congested: bool) -> None:
+        cond = self._condition()
+        async with cond:
+            self.in_flight -= 1
+            self._completed += 1
+            if latency is not None:
+                self._latencies.append(latency)
+            self._congested += congested
+            if self._completed >= self.limit:
+                self._adjust()
+            cond.notify_all()
+
+    def _adjust(self) -> None:
+        error_rate = self._congested / self._completed
+        median = statistics.median(self._latencies) if self._latencies else None
+        if median is not None:
+            self._baseline = median if self._baseline is None else min(self._baseline, median)
+
+        slow = median is not None and median > self._baseline * self.latency_factor
+        if error_rate > self.error_threshold or slow:
+            self.limit = max(self.minimum, int(self.limit * self.decrease))
+        else:
+            self.limit = min(self.maximum, self.limit + self.increase)
+        self.adjustments += 1
+        self._latencies = []
+        self._completed = 0
+        self._congested = 0
+
+@dataclass
+class _HostState:
+    semaphore: asyncio.Semaphore
+    next_slot_at: float = 0.0
+    blocked_until: float = 0.0
+    users: int = 0
+
+@dataclass
+class SchedulerStats:
+    requests: int = 0
+    congested: int = 0
+    retry_after_waits: int = 0
+    rate_waits: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            'requests': self.requests,
+            'congested': self.congested,
+            'retry_after_waits': self.retry_after_waits,
+            'rate_waits': self.rate_waits,
+        }
+
+@dataclass
+class RequestSlot:
+    """Resultado de una petición, para que el planificador aprenda de ella."""
+    response: Optional[httpx.Response] = None
+
+    def observe(self, response: httpx.Response) -> None:
+        self.response = response
+
+class RequestScheduler:
+    """
+    Planificador de cortesía para las peticiones del scraper.
+
+    - Concurrencia máxima y ritmo mínimo entre peticiones por host
+      (o por IP resuelta con `group_by_ip`, para hostings compartidos y CDNs).
+    - Respeta Retry-After en 429/503 bloqueando el host afectado.
+    - Límite global opcional, fijo o adaptativo (AIMD).
+    """
+    def __init__(self, max_per_host: int = 6, per_host_rate: Optional[float] = None,
+                 group_by_ip: bool = False, limiter: Optional[AdaptiveLimiter] = None,
+                 max_retry_after: float = 300.0, resolver: Optional[IResolver] = None):
+        self.max_per_host = max_per_host
+        self.min_interval = 1.0 / per_host_rate if per_host_rate else 0.0
+        self.group_by_ip = group_by_ip
+        self.limiter = limiter
+        self.max_retry_after = max_retry_after
+        # Con `resolver` (caché DNS compartida) la agrupación por IP no repite consultas
+        self.resolver = resolver
+        self.stats = SchedulerStats()
+        self._hosts: Dict[str, _HostState] = {}
+        self._ips: Dict[str, str] = {}
+        self._next_prune = 0.0
+
+    async def _key(self, host: str) -> str:
+        if not self.group_by_ip:
+            return host
+        if self.resolver is not None:
+            try:
+                return (await self.resolver.resolve(host))[0]
+            except Exception:
+                return host
+        if host not in self._ips:
+            try:
+                infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+                self._ips[host] = infos[0][4][0]
+            except OSError:
+                # La conexión fallará igualmente; agrupamos por nombre
+                self._ips[host] = host
+        return self._ips[host]
+
+    async def _wait_turn(self, state: _HostState) -> None:
+        while True:
+            now = time.monotonic()
+            wait = max(state.blocked_until, state.next_slot_at) - now
+            if wait <= 0:
+                state.next_slot_at = now + self.min_interval
+                return
+            if state.blocked_until > now:
+                self.stats.retry_after_waits += 1
+            else:
+                self.stats.rate_waits += 1
+            await asyncio.sleep(wait)
+
+    def _prune(self, now: float) -> None:
+        # Un host sin peticiones conserva su estado mientras el ritmo o el Retry-After
+        # sigan vigentes; después se descarta aquí, de vez en cuando
+        if now < self._next_prune:
+            return
+        self._next_prune = now + PRUNE_INTERVAL
+        idle = [key for key, state in self._hosts.items()
+                if state.users == 0 and max(state.next_slot_at, state.blocked_until) <= now]
+        for key in idle:
+            del self._hosts[key]
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[RequestSlot]:
+        key = await self._key(httpx.URL(url).host)
+        self._prune(time.monotonic())
+        state = self._hosts.get(key)
+        if state is None:
+            state = _HostState(asyncio.Semaphore(self.max_per_host))
+            self._hosts[key] = state
+        state.users += 1
+
+        slot = RequestSlot()
+        congested = False
+        latency: Optional[float] = None
+        try:
+            async with state.semaphore:
+                await self._wait_turn(state)
+                if self.limiter is not None:
+                    await self.limiter.acquire()
+                start = time.monotonic()
+                try:
+                    yield slot
+                    latency = time.monotonic() - start
+                except httpx.TimeoutException:
+                    congested = True
+                    raise
+                finally:
+                    response = slot.response
+                    if response is not None and response.status_code in CONGESTION_STATUS:
+                        congested = True
+                        delay = parse_retry_after(response.headers.get('retry-after'))
+                        if delay is not None:
+                            state.blocked_until = time.monotonic() + min(delay, self.max_retry_after)
+                    self.stats.requests += 1
+                    self.stats.congested += congested
+                    if self.limiter is not None:
+                        await self.limiter.release(latency, congested)
+        finally:
+            state.users -= 1
@@ -1,34 +1,318 @@
+import asyncio
+import time
 import httpx
-from typing import Dict, Optional
-from ...application.ports import IScraper
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from ...application.ports import FetchError, FetchResult, IScraper
+from .dns import CachedDnsBackend, DnsCache
+from .retry import CircuitBreaker, RetryPolicy, classify_error, counts_against_host
+from .scheduler import RequestScheduler
+
+@dataclass
+class PoolStats:
+    """
+    Contadores de reutilización del pool de conexiones.
+    Un 'hit' es una petición servida por una conexión ya abierta (keep-alive / HTTP/2),
+    un 'miss' es una petición que tuvo que abrir conexión nueva (DNS + TCP + TLS).
+    """
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def requests(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.hits / self.requests if self.requests else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'requests': self.requests,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hit_ratio, 4),
+        }
+
+# Tipos de contenido que se analizan; el resto se rechaza sin descargar el cuerpo
+HTML_CONTENT_TYPES = {'text/html', 'application/xhtml+xml'}
+
+@dataclass
+class _Download:
+    """Respuesta con el cuerpo ya leído (posiblemente recortado)."""
+    response: httpx.Response
+    body: bytes = b""
+    truncated: bool = False
+
+    @property
+    def is_html(self) -> bool:
+        content_type = self.response.headers.get('content-type', '').split(';')[0].strip().lower()
+        # Sin Content-Type damos el beneficio de la duda
+        return not content_type or content_type in HTML_CONTENT_TYPES
+
+    @property
+    def text(self) -> str:
+        try:
+            return self.body.decode(self.response.charset_encoding or 'utf-8', errors='replace')
+        except LookupError:
+            return self.body.decode('utf-8', errors='replace')
 
 class AsyncWebScraper(IScraper):
     """
     Implementación concreta de IScraper usando httpx.
     Simula ser un navegador real.
+
+    Mantiene un único AsyncClient de larga duración con pool de conexiones
+    (HTTP/2 cuando el servidor lo soporta). Usar como context manager
+    o llamar a `aclose()` al terminar.
+
+    Las peticiones pasan por un RequestScheduler (límites por host, Retry-After,
+    concurrencia global adaptativa); por defecto solo limita por host.
+    Los fallos transitorios se reintentan según `retry` y los hosts caídos
+    se cortocircuitan con `breaker`.
+
+    Los cuerpos se leen en streaming: solo HTML, como mucho `max_bytes`
+    (descomprimidos) y, con `head_kb`, se corta en cuanto se ha visto el `</head>`
+    y al menos esos KB (suficiente para el stack). El recorte se marca en `truncated`.
+
+    Con `resolver`, las conexiones se abren con la caché DNS compartida
+    (la misma que usa la pre-resolución de los escaneos masivos).
     """
-    def __init__(self, timeout: int = 10):
+    def __init__(
+        self,
+        timeout: int = 10,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        max_connections_per_host: int = 6,
+        http2: bool = True,
+        scheduler: Optional[RequestScheduler] = None,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        max_bytes: int = 5 * 1024 * 1024,
+        head_kb: Optional[int] = None,
+        resolver: Optional[DnsCache] = None,
+    ):
         self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.http2 = http2
+        self.max_bytes = max_bytes
+        self.head_kb = head_kb
+        self.resolver = resolver
         # Headers por defecto para parecer un navegador moderno
         self.default_headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
             "Accept-Language": "es-ES,es;q=0.9,en;q=0.8",
         }
+        self.stats = PoolStats()
+        self.scheduler = scheduler or RequestScheduler(max_per_host=max_connections_per_host)
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.retries = 0
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> "AsyncWebScraper":
+        self._get_client()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Creación perezosa: permite usar el scraper sin context manager
+        if self._client is None:
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+            )
+            transport = httpx.AsyncHTTPTransport(limits=limits, http2=self.http2)
+            if self.resolver is not None:
+                # httpx no expone el backend de red de httpcore: se sustituye en su pool
+                transport._pool._network_backend = CachedDnsBackend(self.resolver)
+            self._client = httpx.AsyncClient(
+                headers=self.default_headers,
+                follow_redirects=True,
+                timeout=self.timeout,
+                transport=transport,
+            )
+        return self._client
+
+    def _trace_extensions(self, timings: Optional[Dict[str, float]] = None) -> Dict:
+        """
+        Hook de trazas de httpcore para contar reutilización de conexiones.
+        Si antes de enviar las cabeceras hubo `connect_tcp`, la petición abrió conexión nueva.
+        Con `timings` acumula además la duración de connect, tls y ttfb
+        (de enviar las cabeceras a recibir las de la respuesta), redirecciones incluidas.
+        """
+        opened = False
+        started: Dict[str, float] = {}
+
+        def add(stage: str, start_key: str) -> None:
+            start = started.pop(start_key, None)
+            if timings is not None and start is not None:
+                timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+        async def trace(event_name: str, info: Dict) -> None:
+            nonlocal opened
+            if event_name == "connection.connect_tcp.started":
+                opened = True
+                started["connect"] = time.perf_counter()
+            elif event_name == "connection.connect_tcp.complete":
+                add("connect", "connect")
+            elif event_name == "connection.start_tls.started":
+                started["tls"] = time.perf_counter()
+            elif event_name == "connection.start_tls.complete":
+                add("tls", "tls")
+            elif event_name.endswith(".send_request_headers.started"):
+                started["ttfb"] = time.perf_counter()
+                if opened:
+                    self.stats.misses += 1
+                else:
+                    self.stats.hits += 1
+                opened = False
+            elif event_name.endswith(".receive_response_headers.complete"):
+                add("ttfb", "ttfb")
+
+        return {"trace": trace}
+
+    async def _read_body(self, download: _Download) -> None:
+        response = download.response
+        if response.request.method == "HEAD" or not download.is_html:
+            return
+        chunks: List[bytes] = []
+        size = 0
+        head_closed = False
+        tail = b""
+        async for chunk in response.aiter_bytes():
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > self.max_bytes:
+                download.body = b"".join(chunks)[:self.max_bytes]
+                download.truncated = True
+                return
+            if self.head_kb is not None:
+                # `tail` cubre un `</head>` partido entre dos trozos
+                head_closed = head_closed or b"</head" in (tail + chunk).lower()
+                tail = chunk[-6:]
+                if head_closed and size >= self.head_kb * 1024:
+                    download.body = b"".join(chunks)
+                    download.truncated = True
+                    return
+        download.body = b"".join(chunks)
+
+    async def _send(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                    timings: Optional[Dict[str, float]] = None) -> _Download:
+        client = self._get_client()
+        request = client.build_request(method, url, headers=headers, extensions=self._trace_extensions(timings))
+        queued = time.perf_counter()
+        async with self.scheduler.slot(url) as slot:
+            if timings is not None:
+                timings['queue'] = timings.get('queue', 0.0) + time.perf_counter() - queued
+            response = await client.send(request, stream=True)
+            slot.observe(response)
+            try:
+                download = _Download(response)
+                start = time.perf_counter()
+                await self._read_body(download)
+                if timings is not None:
+                    timings['download'] = timings.get('download', 0.0) + time.perf_counter() - start
+            finally:
+                # Cerrar sin leer el resto descarta la conexión en lugar de drenarla
+                await response.aclose()
+            return download
+
+    async def _request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                       timings: Optional[Dict[str, float]] = None) -> Tuple[_Download, int]:
+        """
+        Envía la petición aplicando reintentos y cortocircuito por host.
+        Devuelve la respuesta (también si es un 4xx/5xx definitivo) y los intentos usados;
+        los fallos de red definitivos se lanzan como FetchError.
+        """
+        host = httpx.URL(url).host
+        attempt = 0
+        while True:
+            attempt += 1
+            if not self.breaker.allow(host):
+                raise FetchError(f"Circuit open for {host}", 'circuit_open', attempt - 1)
+
+            download: Optional[_Download] = None
+            try:
+                download = await self._send(method, url, headers, timings)
+            except httpx.HTTPError as e:
+                error, error_class = e, classify_error(e)
+            except BaseException:
+                # Sin veredicto sobre el host: si era la prueba semiabierta, que otra pueda hacerla
+                self.breaker.release(host)
+                raise
+            else:
+                if download.response.status_code < 400:
+                    self.breaker.record_success(host)
+                    return download, attempt
+                error, error_class = None, f"http_{download.response.status_code}"
+
+            if counts_against_host(error_class):
+                self.breaker.record_failure(host)
+            else:
+                self.breaker.record_success(host)
+
+            if attempt < self.retry.max_attempts and self.retry.is_retryable(method, error_class):
+                self.retries += 1
+                await asyncio.sleep(self.retry.backoff(attempt))
+                continue
+            if download is not None:
+                return download, attempt
+            raise FetchError(str(error) or type(error).__name__, error_class, attempt) from error
 
     async def fetch_page(self, url: str) -> str:
-        async with httpx.AsyncClient(headers=self.default_headers, follow_redirects=True, timeout=self.timeout) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            return response.text
+        download, _ = await self._request("GET", url)
+        download.response.raise_for_status()
+        return download.text
 
     async def get_headers(self, url: str) -> Dict[str, str]:
-        async with httpx.AsyncClient(headers=self.default_headers, follow_redirects=True, timeout=self.timeout) as client:
-            response = await client.head(url)
-            # A veces HEAD falla o no devuelve todo, hacemos un GET parcial o completo si es necesario.
-            # Por simplicidad, aquí retornamos las headers del response.
-            # Si HEAD falla, intentamos GET stream
-            if response.status_code >= 400:
-                 response = await client.get(url)
-            
-            return dict(response.headers)
+        response = (await self._request("HEAD", url))[0].response
+        # A veces HEAD falla o no devuelve todo, hacemos un GET parcial o completo si es necesario.
+        # Por simplicidad, aquí retornamos las headers del response.
+        # Si HEAD falla, intentamos GET stream
+        if response.status_code >= 400:
+             response = (await self._request("GET", url))[0].response
+
+        return dict(response.headers)
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        download, attempts = await self._request("GET", url, headers, timings)
+        response = download.response
+        # 304 solo llega si pedimos revalidación: no es un error
+        if response.status_code != 304:
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                raise FetchError(str(e).splitlines()[0], classify_error(e), attempts) from e
+            if not download.is_html:
+                content_type = response.headers.get('content-type')
+                raise FetchError(f"Unsupported content type '{content_type}' for url '{url}'", 'content_type', attempts)
+        headers = dict(response.headers)
+        set_cookies = response.headers.get_list('set-cookie')
+        if set_cookies:
+            # Una cookie por línea: la coma de `Expires=...` hace ambiguo el join por defecto
+            headers['set-cookie'] = '\n'.join(set_cookies)
+        return FetchResult(
+            url=url,
+            final_url=str(response.url),
+            status_code=response.status_code,
+            headers=headers,
+            content=download.text,
+            set_cookies=set_cookies,
+            elapsed=time.perf_counter() - start,
+            attempts=attempts,
+            truncated=download.truncated,
+            timings=timings,
+        )
@@ -0,0 +1,61 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+class _Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1: conexiones keep-alive, como un servidor real
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self, send_body: bool) -> None:
+        site: LocalSite = self.server.site
+        site.requests.append((self.command, self.path, dict(self.headers)))
+        status, headers, body = site.pages.get(self.path, (404, {}, b"not found"))
+        self.send_response(status)
+        for name, value in {"Content-Type": "text/html; charset=utf-8", **headers}.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def log_message(self, *args):
+        pass
+
+class LocalSite:
+    """Servidor HTTP local con páginas fijas; registra las peticiones recibidas."""
+    def __init__(self):
+        self.pages: Dict[str, Tuple[int, Dict[str, str], bytes]] = {}
+        self.requests: List[Tuple[str, str, Dict[str, str]]] = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.site = self
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+
+    @property
+    def host(self) -> str:
+        return f"127.0.0.1:{self._server.server_address[1]}"
+
+    def url(self, path: str = "/") -> str:
+        return f"http://{self.host}{path}"
+
+    def add(self, path: str, body: str, status: int = 200, headers: Optional[Dict[str, str]] = None) -> str:
+        self.pages[path] = (status, headers or {}, body.encode("utf-8"))
+        return self.url(path)
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+@pytest.fixture
+def site():
+    server = LocalSite()
+    yield server
+    server.close()
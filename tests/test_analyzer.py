@@ -0,0 +1,57 @@
+import pytest
+
+from backend_hunter.domain.entities import Company
+from backend_hunter.domain.enums import BackendStack, ComplianceStatus, Framework
+from backend_hunter.infrastructure.analysis.analyzer_service import AnalyzerService
+from backend_hunter.infrastructure.analysis.document import PARSERS, ParsedDocument
+
+PAGE = (
+    '<html><head><meta name="generator" content="WordPress 6.4">'
+    '<link rel="stylesheet" href="/wp-content/style.css"><script src="/app.js?v=3"></script></head>'
+    '<body><a href="/aviso-legal">Aviso legal</a><a href="https://other.test/contacto">Contacto</a>'
+    '<footer>Carrer de Sant Miquel 1, 07002 Palma</footer></body></html>'
+)
+
+def test_analyze_detects_stack_and_location():
+    company = AnalyzerService().analyze(PAGE, {}, Company(url="https://example.test/"))
+    assert company.detected_stacks == {BackendStack.PHP}
+    assert company.compliance_status == ComplianceStatus.COMPLIANT
+    assert company.postal_code == "07002"
+    assert set(company.timings) >= {"parse", "tech", "location"}
+
+def test_headers_and_elements_are_detected_in_one_analysis():
+    page = '<html><head><script id="__NEXT_DATA__"></script></head></html>'
+    company = AnalyzerService().analyze(page, {"X-Powered-By": "Express"}, Company(url="https://example.test/"))
+    assert company.detected_stacks == {BackendStack.NODEJS}
+    assert Framework.EXPRESS in company.detected_frameworks
+
+def test_document_is_parsed_once_and_reused_for_legal_links(monkeypatch):
+    analyzer = AnalyzerService()
+    parses = []
+    original = analyzer.parse
+    monkeypatch.setattr(analyzer, "parse", lambda html: parses.append(html) or original(html))
+
+    analyzer.analyze(PAGE, {}, Company(url="https://example.test/"))
+    links = analyzer.legal_links(PAGE, "https://example.test/")
+
+    assert len(parses) == 1
+    # Solo enlaces del mismo sitio
+    assert links == ["https://example.test/aviso-legal"]
+
+def test_compliance_of_secondary_pages_does_not_parse(monkeypatch):
+    analyzer = AnalyzerService()
+    monkeypatch.setattr(analyzer, "parse", lambda html: pytest.fail("no debería parsear"))
+    company = analyzer.analyze_compliance("<p>07002 Palma</p>", Company(url="https://example.test/"))
+    assert company.postal_code == "07002"
+
+@pytest.mark.parametrize("parser", sorted(PARSERS))
+def test_parser_backends_extract_the_same_elements(parser):
+    reference = ParsedDocument(PAGE, parser="html.parser")
+    document = ParsedDocument(PAGE, parser=parser)
+    assert document.attribute_values("script", "src") == reference.attribute_values("script", "src") == {"/app.js?v=3"}
+    assert document.attribute_values("meta", "content") == {"WordPress 6.4"}
+    assert "07002 palma" in document.text
+
+def test_unknown_parser_is_rejected():
+    with pytest.raises(ValueError):
+        ParsedDocument(PAGE, parser="regex")
@@ -0,0 +1,78 @@
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend_hunter.infrastructure.api.main import app
+
+HOME = '<html><head><meta name="generator" content="WordPress 6.4"></head><body><p>Palma 07001</p></body></html>'
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("HUNTER_JOB_STORE", str(tmp_path / "jobs.sqlite"))
+    monkeypatch.setenv("HUNTER_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("HUNTER_SCAN_CACHE", raising=False)
+    monkeypatch.delenv("HUNTER_ANALYSIS_WORKERS", raising=False)
+    with TestClient(app) as client:
+        yield client
+
+def _wait_until_finished(client, job_id, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/scans/{job_id}").json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish: {job}")
+
+def test_job_is_accepted_at_once_and_reports_results_in_input_order(client, site):
+    urls = [site.add("/", HOME), site.add("/down", "error", status=500), site.url("/")]
+    response = client.post("/scans", json={"urls": urls})
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+
+    job = _wait_until_finished(client, job_id)
+    assert (job["status"], job["total"], job["completed"], job["errors"]) == ("done", 3, 3, 1)
+    assert job["progress"] == 1.0
+    assert [row["url"] for row in job["results"]] == urls
+    assert [row["status"] for row in job["results"]] == ["success", "error", "success"]
+    assert job["results"][0]["tech_stacks"] == "PHP"
+
+    page = client.get(f"/scans/{job_id}", params={"offset": 1, "limit": 1}).json()
+    assert [row["url"] for row in page["results"]] == urls[1:2]
+
+def test_results_stream_as_ndjson_and_sse(client, site):
+    urls = [site.add("/", HOME), site.add("/otra", HOME)]
+    job_id = client.post("/scans", json={"urls": urls}).json()["id"]
+
+    with client.stream("GET", f"/scans/{job_id}/results") as response:
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.iter_lines() if line]
+    assert sorted(row["url"] for row in rows) == sorted(urls)
+
+    body = client.get(f"/scans/{job_id}/results", params={"format": "sse"}).text
+    assert body.count("data: ") == 3
+    assert "event: done" in body
+
+def test_unknown_job_and_empty_batch_are_rejected(client):
+    assert client.get("/scans/missing").status_code == 404
+    assert client.get("/scans/missing/results").status_code == 404
+    assert client.post("/scans", json={"urls": []}).status_code == 422
+
+def test_metrics_endpoint_reports_scans_in_prometheus_format(client, site):
+    assert client.post("/scan", json={"url": site.add("/", HOME)}).status_code == 200
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    assert 'hunter_scans_total{outcome="success",error_class=""} 1' in lines
+    assert 'hunter_rule_hits_total{rule="wordpress-generator"} 1' in lines
+    assert 'hunter_stage_seconds_count{stage="total"} 1' in lines
+
+def test_scan_requests_reuse_the_pooled_connection(client, site):
+    url = site.add("/", HOME)
+    bodies = [client.post("/scan", json={"url": url}).json() for _ in range(3)]
+    assert [body["detected_stacks"] for body in bodies] == [["PHP"]] * 3
+    assert bodies[0]["compliance_status"] == "Compliant"
+    pool = client.get("/health").json()["connection_pool"]
+    assert (pool["misses"], pool["hits"]) == (1, 2)
@@ -0,0 +1,85 @@
+import asyncio
+import io
+import json
+from typing import Dict, Optional
+
+import pytest
+
+from backend_hunter.application.bulk_scan import BulkScanUseCase, read_lines
+from backend_hunter.application.ports import FetchError, FetchResult, IScraper
+from backend_hunter.application.report_writers import NdjsonReportWriter
+from backend_hunter.infrastructure.analysis.analyzer_service import AnalyzerService
+
+async def _collect(stream, buffer: int = 1_000):
+    return [url async for url in read_lines(stream, buffer)]
+
+async def test_read_lines_skips_blank_and_comments_and_adds_scheme():
+    stream = io.StringIO("example.com\n\n# comentario\nhttp://a.test/\n  b.test  \n")
+    urls = await asyncio.wait_for(_collect(stream, buffer=1), timeout=5)
+    assert urls == ["https://example.com", "http://a.test/", "https://b.test"]
+
+class _BrokenStream:
+    """Flujo que falla al decodificar tras la primera línea (stdin con bytes no UTF-8)."""
+    def __iter__(self):
+        yield "a.test\n"
+        raise UnicodeDecodeError("utf-8", b"\xff\xfe", 0, 1, "invalid start byte")
+
+async def test_read_lines_reraises_reader_errors_instead_of_hanging():
+    urls = []
+    with pytest.raises(UnicodeDecodeError):
+        async def consume():
+            async for url in read_lines(_BrokenStream()):
+                urls.append(url)
+        await asyncio.wait_for(consume(), timeout=5)
+    assert urls == ["https://a.test"]
+
+HTML = "<html><body><p>Palma 07001</p></body></html>"
+
+class SlowScraper(IScraper):
+    """Cada descarga tarda un poco; registra cuántas hay a la vez."""
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.done = 0
+
+    async def fetch_page(self, url: str) -> str:
+        return HTML
+
+    async def get_headers(self, url: str) -> Dict[str, str]:
+        return {}
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.001)
+            if "fail" in url:
+                raise FetchError("boom", "connect")
+            return FetchResult(url=url, final_url=url, status_code=200,
+                               headers={"x-powered-by": "PHP/8.2"}, content=HTML)
+        finally:
+            self.active -= 1
+            self.done += 1
+
+async def test_stream_writes_every_row_with_bounded_concurrency_and_read_ahead(tmp_path):
+    scraper = SlowScraper()
+    bulk = BulkScanUseCase(scraper, AnalyzerService(), concurrency=2)
+    urls = [f"https://site{i}.test/" for i in range(40)] + ["https://fail.test/"]
+    read_ahead = []
+
+    def source():
+        for url in urls:
+            read_ahead.append(len(read_ahead) - scraper.done)
+            yield url
+
+    path = tmp_path / "report.ndjson"
+    with NdjsonReportWriter(str(path)) as writer:
+        summary = await bulk.execute_stream(source(), writer)
+
+    rows = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert sorted(row["url"] for row in rows) == sorted(urls)
+    assert (summary.total, summary.success, summary.errors) == (41, 40, 1)
+    assert summary.error_counts == {"connect": 1}
+    assert scraper.peak == 2
+    # La entrada no se lee entera por delante: cola acotada + workers
+    assert max(read_ahead) <= 2 * 3 + 1
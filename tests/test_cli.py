@@ -0,0 +1,28 @@
+import json
+
+from typer.testing import CliRunner
+
+from backend_hunter.infrastructure.cli.app import app
+
+runner = CliRunner()
+
+def test_bulk_rejects_unknown_format_before_scanning(tmp_path):
+    # El CSV no existe: si el formato no se comprobara antes, fallaría al leerlo
+    result = runner.invoke(app, ["bulk", str(tmp_path / "missing.csv"), "-f", "xml"])
+    assert result.exit_code == 2
+    assert "xml" in result.output
+
+def test_bulk_rejects_excel_in_stream_mode(tmp_path):
+    result = runner.invoke(app, ["bulk", str(tmp_path / "missing.csv"), "--stream", "-f", "excel"])
+    assert result.exit_code == 2
+
+def test_bulk_writes_ndjson_without_stream(tmp_path):
+    csv_file = tmp_path / "companies.csv"
+    csv_file.write_text("url\nhttp://127.0.0.1:1/\n")
+    output = tmp_path / "report.ndjson"
+    result = runner.invoke(app, [
+        "bulk", str(csv_file), "-f", "ndjson", "-o", str(output), "--no-dns-cache", "--retries", "0",
+    ])
+    assert result.exit_code == 0, result.output
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [(row["url"], row["status"]) for row in rows] == [("http://127.0.0.1:1/", "error")]
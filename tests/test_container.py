@@ -0,0 +1,43 @@
+from backend_hunter.infrastructure.analysis.process_pool import ProcessPoolAnalyzer
+from backend_hunter.infrastructure.api.container import AppContainer, ServiceSettings
+from backend_hunter.infrastructure.cache.scan_cache import DEFAULT_TTL
+
+def test_settings_are_read_from_the_environment():
+    settings = ServiceSettings.from_env({
+        "HUNTER_SCAN_CACHE": "/tmp/cache.sqlite",
+        "HUNTER_SCAN_CACHE_TTL": "60",
+        "HUNTER_ANALYSIS_WORKERS": "2",
+        "HUNTER_MAX_KEEPALIVE": "50",
+        "HUNTER_DNS_CACHE": "yes",
+    })
+    assert settings.scan_cache == "/tmp/cache.sqlite"
+    assert settings.scan_cache_ttl == 60.0
+    assert settings.analysis_workers == 2
+    assert settings.max_keepalive == 50
+    assert settings.dns_cache is True
+
+def test_settings_defaults():
+    settings = ServiceSettings.from_env({"HUNTER_SCAN_CACHE": "", "HUNTER_DNS_CACHE": "0"})
+    assert settings == ServiceSettings()
+    assert settings.scan_cache is None and settings.scan_cache_ttl == DEFAULT_TTL
+
+async def test_container_builds_shared_dependencies_once_and_releases_them(tmp_path, monkeypatch):
+    monkeypatch.setenv("HUNTER_CACHE_DIR", str(tmp_path / "fingerprints"))
+    settings = ServiceSettings(
+        scan_cache=str(tmp_path / "cache.sqlite"), job_store=str(tmp_path / "jobs.sqlite"), analysis_workers=1,
+    )
+    async with AppContainer(settings) as container:
+        assert isinstance(container.analyzer, ProcessPoolAnalyzer)
+        assert container.analyzer._pool is not None  # workers arrancados en el lifespan
+        plain, crawl = container.scan_use_case(), container.scan_use_case(crawl=True)
+        assert plain is container.scan_use_case()
+        assert crawl.crawl is not None and plain.crawl is None
+        for use_case in (plain, crawl):
+            assert use_case.scraper is container.scraper
+            assert use_case.cache is container.cache
+            assert use_case.flights is container.flights
+        assert container.jobs.flights is container.flights
+        scraper, analyzer = container.scraper, container.analyzer
+
+    assert scraper._client is None
+    assert analyzer._pool is None
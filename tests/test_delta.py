@@ -0,0 +1,82 @@
+from typing import Dict, Optional
+
+import pytest
+
+from backend_hunter.application.bulk_scan import BulkScanUseCase, changed_rows
+from backend_hunter.application.ports import FetchResult, IScraper
+from backend_hunter.application.report_writers import ChangedRowsWriter, ReportWriter
+from backend_hunter.domain.changes import FIRST_SEEN, describe_changes
+from backend_hunter.domain.entities import Company
+from backend_hunter.domain.enums import BackendStack, ComplianceStatus
+from backend_hunter.infrastructure.analysis.analyzer_service import AnalyzerService
+from backend_hunter.infrastructure.cache.scan_cache import SQLiteScanCache
+
+PHP = '<html><head><meta name="generator" content="WordPress 6.4"></head><body><p>Palma 07001</p></body></html>'
+PLAIN = '<html><body><p>Madrid</p></body></html>'
+
+class PageScraper(IScraper):
+    def __init__(self, pages: Dict[str, str]):
+        self.pages = pages
+
+    async def fetch_page(self, url: str) -> str:
+        return self.pages[url]
+
+    async def get_headers(self, url: str) -> Dict[str, str]:
+        return {}
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        return FetchResult(url=url, final_url=url, status_code=200, headers={}, content=self.pages[url])
+
+class ListWriter(ReportWriter):
+    def __init__(self, columns=None):
+        super().__init__("-", columns)
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+
+    def close(self):
+        pass
+
+def _company(stacks=(), postal_code=None) -> Company:
+    return Company(
+        url="https://example.test/", detected_stacks=set(stacks), postal_code=postal_code,
+        compliance_status=ComplianceStatus.COMPLIANT if postal_code else ComplianceStatus.NON_COMPLIANT,
+    )
+
+@pytest.mark.parametrize("before, after, expected", [
+    (_company(), _company([BackendStack.PHP]), ["stack detected: PHP"]),
+    (_company([BackendStack.PHP]), _company([BackendStack.NODEJS]), ["stack changed from PHP to Node.js"]),
+    (_company([BackendStack.PHP]), _company(), ["stack no longer detected (was PHP)"]),
+    (_company(), _company(postal_code="07001"), ["became compliant (07001)"]),
+    (_company(postal_code="07001"), _company(), ["no longer compliant (was 07001)"]),
+    (_company(postal_code="07001"), _company(postal_code="07002"), ["postal code changed from 07001 to 07002"]),
+    (_company([BackendStack.PHP], "07001"), _company([BackendStack.PHP], "07001"), []),
+])
+def test_changes_are_described(before, after, expected):
+    assert describe_changes(before, after) == expected
+
+async def test_delta_feed_keeps_only_rows_that_changed(tmp_path):
+    pages = {"https://a.test/": PHP, "https://b.test/": PLAIN}
+    cache = SQLiteScanCache(str(tmp_path / "cache.sqlite"), ttl=0)
+    try:
+        bulk = BulkScanUseCase(PageScraper(pages), AnalyzerService(), cache=cache, delta=True)
+        first = await bulk.execute(list(pages))
+        assert first["changes"].tolist() == [FIRST_SEEN, FIRST_SEEN]
+
+        pages["https://b.test/"] = PHP
+        df = await bulk.execute(list(pages))
+        assert df["changes"].tolist() == ["", "stack detected: PHP; became compliant (07001)"]
+        assert changed_rows(df)["url"].tolist() == ["https://b.test/"]
+
+        pages["https://a.test/"] = PLAIN
+        feed = ListWriter(bulk.columns)
+        summary = await bulk.execute_stream(list(pages), ChangedRowsWriter(feed))
+        assert [row["url"] for row in feed.rows] == ["https://a.test/"]
+        assert (summary.total, summary.changed) == (2, 1)
+    finally:
+        cache.close()
+
+def test_delta_requires_a_scan_cache():
+    with pytest.raises(ValueError):
+        BulkScanUseCase(PageScraper({}), AnalyzerService(), delta=True)
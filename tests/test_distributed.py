@@ -0,0 +1,141 @@
+import asyncio
+import sqlite3
+from typing import Dict, Optional
+
+from typer.testing import CliRunner
+
+from backend_hunter.application.distributed import DistributedBulkScan, ScanWorker
+from backend_hunter.application.ports import FetchResult, IScraper, WorkUnit
+from backend_hunter.application.report_writers import ReportWriter
+from backend_hunter.infrastructure.analysis.analyzer_service import AnalyzerService
+from backend_hunter.infrastructure.cli.distribute import distribute_app
+from backend_hunter.infrastructure.jobs.sqlite_work_queue import SQLiteWorkQueue
+
+class SlowScraper(IScraper):
+    async def fetch_page(self, url: str) -> str:
+        return "<html></html>"
+
+    async def get_headers(self, url: str) -> Dict[str, str]:
+        return {}
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        await asyncio.sleep(10)
+        return FetchResult(url=url, final_url=url, status_code=200, headers={}, content="<html></html>")
+
+class LostLeaseQueue(SQLiteWorkQueue):
+    def renew(self, unit: WorkUnit, worker_id: str) -> bool:
+        return False
+
+def test_complete_is_rejected_after_the_unit_changed_hands(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.sqlite"), lease_seconds=-1)
+    try:
+        run_id = queue.create_run(["https://a.test/", "https://b.test/"], chunk_size=2)
+        stale = queue.lease("worker-a", run_id)
+        # El arrendamiento de A ya venció: B se lleva el bloque
+        current = queue.lease("worker-b", run_id)
+        assert current.index == stale.index
+
+        assert not queue.complete(stale, "worker-a", [(0, {"url": "from-a"})])
+        assert not list(queue.rows(run_id))
+        assert queue.complete(current, "worker-b", [(0, {"url": "from-b"})])
+        assert [row["url"] for _, row in queue.rows(run_id)] == ["from-b"]
+        assert queue.progress(run_id).done == 1
+    finally:
+        queue.close()
+
+async def test_worker_stops_scanning_when_renewal_fails(tmp_path):
+    queue = LostLeaseQueue(str(tmp_path / "queue.sqlite"))
+    try:
+        run_id = queue.create_run(["https://a.test/"])
+        worker = ScanWorker(queue, SlowScraper(), AnalyzerService(), renew_every=0.01)
+        unit = queue.lease(worker.worker_id, run_id)
+
+        await asyncio.wait_for(worker.process(unit), timeout=2)
+
+        assert (worker.lost, worker.units) == (1, 0)
+        assert queue.progress(run_id).done == 0
+        assert not list(queue.rows(run_id))
+    finally:
+        queue.close()
+
+def _journal_mode(path) -> str:
+    db = sqlite3.connect(path)
+    try:
+        return db.execute("PRAGMA journal_mode").fetchone()[0]
+    finally:
+        db.close()
+
+def test_read_only_commands_keep_the_queue_journal_mode(tmp_path):
+    path = str(tmp_path / "queue.sqlite")
+    queue = SQLiteWorkQueue(path, wal=False)
+    run_id = queue.create_run(["https://a.test/"])
+    queue.close()
+
+    runner = CliRunner()
+    assert runner.invoke(distribute_app, ["status", run_id, "-q", path]).exit_code == 0
+    result = runner.invoke(distribute_app, ["merge", run_id, "-q", path, "-o", str(tmp_path / "report.csv")])
+    assert result.exit_code == 0, result.output
+    assert _journal_mode(path) == "delete"
+
+class FastScraper(SlowScraper):
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        await asyncio.sleep(0)
+        return FetchResult(url=url, final_url=url, status_code=200, headers={"x-powered-by": "PHP/8.2"},
+                           content="<html></html>")
+
+class ListWriter(ReportWriter):
+    def __init__(self):
+        super().__init__("-")
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+
+    def close(self):
+        pass
+
+URLS = [f"https://site{i}.test/" for i in range(7)]
+
+async def test_workers_share_a_run_and_merge_restores_input_order(tmp_path):
+    path = str(tmp_path / "queue.sqlite")
+    coordinator_queue = SQLiteWorkQueue(path)
+    queues = [SQLiteWorkQueue(path) for _ in range(2)]
+    try:
+        coordinator = DistributedBulkScan(coordinator_queue)
+        run_id = coordinator.submit(URLS, chunk_size=3)
+        workers = [ScanWorker(queue, FastScraper(), AnalyzerService(), concurrency=2) for queue in queues]
+        await asyncio.gather(*(worker.run(run_id, poll=0.01) for worker in workers))
+        assert sum(worker.units for worker in workers) == 3
+
+        progress = await coordinator.wait(run_id, poll=0.01)
+        assert progress.finished and progress.done == 3 and progress.total == 7
+
+        writer = ListWriter()
+        summary = coordinator.merge(run_id, writer)
+        assert [row["url"] for row in writer.rows] == URLS
+        assert (summary.success, summary.errors) == (7, 0)
+        assert {row["tech_stacks"] for row in writer.rows} == {"PHP"}
+    finally:
+        for queue in [coordinator_queue, *queues]:
+            queue.close()
+
+async def test_abandoned_units_are_reported_as_errors_in_place(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.sqlite"), lease_seconds=-1, max_attempts=1)
+    try:
+        coordinator = DistributedBulkScan(queue)
+        run_id = coordinator.submit(URLS, chunk_size=3)
+        # Un worker arrienda los dos primeros bloques y muere sin entregarlos
+        queue.lease("dead-worker", run_id)
+        queue.lease("dead-worker", run_id)
+        queue.requeue_expired()
+        assert queue.progress(run_id).failed == 2
+
+        worker = ScanWorker(queue, FastScraper(), AnalyzerService())
+        await worker.run(run_id, poll=0.01)
+        writer = ListWriter()
+        summary = coordinator.merge(run_id, writer)
+        assert [row["url"] for row in writer.rows] == URLS
+        assert [row["error_class"] for row in writer.rows] == ["worker_failed"] * 6 + [""]
+        assert summary.errors == 6
+    finally:
+        queue.close()
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from backend_hunter.application.ports import FetchError
+from backend_hunter.infrastructure.scraping.dns import DnsCache
+from backend_hunter.infrastructure.scraping.scraper import AsyncWebScraper
+
+def _resolver(answers, **options) -> DnsCache:
+    """DnsCache sin red: `answers` da las IPs por host (o None para NXDOMAIN)."""
+    resolver = DnsCache(min_ttl=0, **options)
+    resolver._aiodns = None
+    resolver.lookups = []
+
+    async def getaddrinfo(host):
+        resolver.lookups.append(host)
+        await asyncio.sleep(0.01)
+        if answers.get(host) is None:
+            raise LookupError("NXDOMAIN")
+        return answers[host], resolver.default_ttl
+
+    resolver._getaddrinfo = getaddrinfo
+    return resolver
+
+async def test_answers_are_cached_until_the_ttl_expires():
+    resolver = _resolver({"a.test": ["192.0.2.1", "::1"]}, default_ttl=0.05)
+    assert await resolver.resolve("a.test") == ["192.0.2.1", "::1"]
+    assert await resolver.resolve("a.test") == ["192.0.2.1", "::1"]
+    assert resolver.cached("a.test") == ["192.0.2.1", "::1"]
+    assert (resolver.stats.hits, resolver.stats.misses) == (1, 1)
+
+    await asyncio.sleep(0.06)
+    assert resolver.cached("a.test") is None
+    await resolver.resolve("a.test")
+    assert resolver.lookups == ["a.test", "a.test"]
+
+async def test_failures_are_cached_for_the_negative_ttl():
+    resolver = _resolver({}, negative_ttl=60)
+    for _ in range(3):
+        with pytest.raises(FetchError) as error:
+            await resolver.resolve("dead.test")
+        assert error.value.error_class == "dns"
+    assert resolver.lookups == ["dead.test"]
+    assert resolver.stats.failures == 1
+
+async def test_concurrent_lookups_of_a_host_are_coalesced():
+    resolver = _resolver({"a.test": ["192.0.2.1"], "b.test": ["192.0.2.2"]})
+    await resolver.resolve_many(["a.test", "b.test", "a.test", "dead.test"])
+    await asyncio.gather(*(resolver.resolve("a.test") for _ in range(3)))
+    assert sorted(resolver.lookups) == ["a.test", "b.test", "dead.test"]
+
+async def test_ip_literals_are_not_resolved():
+    resolver = _resolver({})
+    assert await resolver.resolve("127.0.0.1") == ["127.0.0.1"]
+    assert await resolver.resolve("::1") == ["::1"]
+    assert resolver.lookups == []
+
+async def test_scraper_connects_through_the_cache(site):
+    site.add("/", "<html></html>")
+    port = site.host.rsplit(":", 1)[1]
+    resolver = _resolver({"shop.test": ["127.0.0.1"]})
+    async with AsyncWebScraper(http2=False, resolver=resolver) as scraper:
+        for _ in range(2):
+            result = await scraper.fetch(f"http://shop.test:{port}/")
+            assert result.status_code == 200
+        with pytest.raises(FetchError) as error:
+            await scraper.fetch(f"http://dead.test:{port}/")
+    assert error.value.error_class == "dns"
+    assert resolver.lookups == ["shop.test", "dead.test"]
+    # El Host original llega al servidor
+    assert site.requests[0][2]["Host"] == f"shop.test:{port}"
@@ -0,0 +1,68 @@
+import json
+import pickle
+
+import pytest
+
+from backend_hunter.infrastructure.analysis.fingerprint_db import (
+    CACHE_FORMAT, FingerprintStore, load_database, parse_database,
+)
+
+RULES = {"fingerprints": [
+    {"id": "php", "signal": "header", "key": "x-powered-by", "contains": "php", "stack": "PHP"},
+]}
+
+def _write(path, raw):
+    path.write_text(json.dumps(raw), encoding="utf-8")
+    return path
+
+@pytest.mark.parametrize("rule, message", [
+    ({"id": "x", "signal": "body", "contains": "a"}, "unknown signal"),
+    ({"id": "x", "signal": "header", "contains": "a"}, "requires 'key'"),
+    ({"id": "x", "signal": "cookie", "contains": "a", "regex": "a"}, "not both"),
+    ({"id": "x", "signal": "cookie", "regex": "("}, "invalid regex"),
+    ({"id": "x", "signal": "cookie", "contains": "a", "colour": "red"}, "unknown fields"),
+    ({"id": "x", "signal": "derived", "requires": ["later"]}, "must be declared before"),
+    ({"id": "x", "signal": "cookie", "contains": "a", "stack": "COBOL"}, "rule 'x'"),
+])
+def test_invalid_rules_are_rejected(rule, message):
+    with pytest.raises(ValueError, match=message):
+        parse_database({"fingerprints": [rule]})
+
+def test_duplicated_ids_are_rejected():
+    with pytest.raises(ValueError, match="duplicated id"):
+        parse_database({"fingerprints": RULES["fingerprints"] * 2})
+
+def test_default_database_is_valid(tmp_path):
+    database = load_database(cache_dir=tmp_path)
+    assert database.fingerprints
+    assert database.digest
+
+def test_compiled_database_is_cached_by_content(tmp_path):
+    source = _write(tmp_path / "rules.json", RULES)
+    cache = tmp_path / "cache"
+    first = load_database(source, cache)
+    cached = list(cache.glob(f"fingerprints-v{CACHE_FORMAT}-*.pickle"))
+    assert len(cached) == 1
+    with cached[0].open("rb") as f:
+        assert pickle.load(f).digest == first.digest
+
+    cached[0].write_bytes(b"not a pickle")
+    assert [r.id for r in load_database(source, cache).fingerprints] == ["php"]
+
+def test_store_reloads_only_on_change_and_keeps_current_on_error(tmp_path):
+    source = _write(tmp_path / "rules.json", RULES)
+    store = FingerprintStore(source, tmp_path / "cache")
+    before = store.current
+    assert store.reload() is False
+
+    extra = {"id": "asp", "signal": "header", "key": "x-aspnet-version", "contains": "."}
+    _write(source, {"fingerprints": RULES["fingerprints"] + [extra]})
+    assert store.reload() is True
+    assert [r.id for r in store.current.fingerprints] == ["php", "asp"]
+    assert [r.id for r in before.fingerprints] == ["php"]
+
+    source.write_text("{ broken", encoding="utf-8")
+    reloaded = store.current
+    with pytest.raises(ValueError):
+        store.reload()
+    assert store.current is reloaded
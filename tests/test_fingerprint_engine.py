@@ -0,0 +1,95 @@
+import random
+import re
+from typing import Dict, List, Set
+
+import pytest
+
+from backend_hunter.infrastructure.analysis.document import ParsedDocument
+from backend_hunter.infrastructure.analysis.fingerprint_db import load_database
+from backend_hunter.infrastructure.analysis.fingerprints import Fingerprint, FingerprintEngine, LiteralMatcher
+
+def _pattern_hits(rule: Fingerprint, text: str) -> bool:
+    if rule.contains is not None:
+        return rule.contains.lower() in text.lower()
+    if rule.regex is not None:
+        return re.search(rule.regex, text, 0 if rule.case_sensitive else re.IGNORECASE) is not None
+    return True
+
+def naive_match(rules: List[Fingerprint], document: ParsedDocument, headers: Dict[str, str]) -> List[str]:
+    """Evaluación regla a regla, sin índices: la referencia del motor compilado."""
+    lowered = {name.lower(): value for name, value in headers.items()}
+    hits: Set[str] = set()
+    for rule in rules:
+        if rule.signal == "header":
+            hit = rule.key.lower() in lowered and _pattern_hits(rule, lowered[rule.key.lower()])
+        elif rule.signal == "cookie":
+            hit = _pattern_hits(rule, lowered.get("set-cookie", ""))
+        elif rule.signal == "meta":
+            hit = any(_pattern_hits(rule, m.get("content", "")) for m in document.tags("meta") if m.get("name") == rule.key)
+        elif rule.signal == "input":
+            hit = rule.key in document.attribute_values("input", "name")
+        elif rule.signal == "script_id":
+            hit = rule.key in document.attribute_values("script", "id")
+        elif rule.signal == "link":
+            hit = any(_pattern_hits(rule, l["href"]) for l in document.links if "href" in l)
+        elif rule.signal == "script":
+            hit = any(_pattern_hits(rule, s["src"]) for s in document.scripts if "src" in s)
+        elif rule.signal == "url":
+            hit = _pattern_hits(rule, document.html)
+        else:
+            hit = True  # derived
+        if rule.requires or rule.excludes:
+            hit = (hit and (not rule.requires or any(r in hits for r in rule.requires))
+                   and not any(e in hits for e in rule.excludes))
+        if hit:
+            hits.add(rule.id)
+    return [rule.id for rule in rules if rule.id in hits]
+
+def test_literal_matcher_finds_overlapping_and_prefix_literals():
+    matcher = LiteralMatcher({"wp-": ["a"], "wp-content": ["b"], "content/": ["c"], "TENT": ["d"]})
+    assert matcher.hits("/WP-CONTENT/themes") == {"a", "b", "c", "d"}
+    assert matcher.hits("wp-json") == {"a"}
+    assert matcher.hits("nothing here") == set()
+
+def test_literal_matcher_matches_substring_search_on_random_inputs():
+    rng = random.Random(7)
+    alphabet = "abc-/."
+    for _ in range(200):
+        literals = {"".join(rng.choices(alphabet, k=rng.randint(1, 4))) for _ in range(rng.randint(1, 8))}
+        rule_ids = {literal: [f"r{i}"] for i, literal in enumerate(sorted(literals))}
+        text = "".join(rng.choices(alphabet + "xyz", k=rng.randint(0, 40)))
+        expected = {rule_ids[literal][0] for literal in literals if literal in text}
+        assert LiteralMatcher(rule_ids).hits(text) == expected, (literals, text)
+
+SAMPLES = [
+    ('<html><head><meta name="generator" content="WordPress 6.4"><link href="/wp-content/x.css"></head></html>', {}),
+    ('<html><head><script id="__NEXT_DATA__"></script><script src="/_next/app.js"></script></head></html>',
+     {"X-Powered-By": "Next.js, Express"}),
+    ('<html><form><input name="csrfmiddlewaretoken"></form></html>', {"Set-Cookie": "csrftoken=1\nsessionid=2"}),
+    ('<html><body>__VIEWSTATE<input name="__VIEWSTATE"></body></html>', {"X-AspNet-Version": "4.0", "Server": "IIS"}),
+    ('<html><body><script src="/static/js/main.js"></script></body></html>', {"Set-Cookie": "laravel_session=1; XSRF-TOKEN=2"}),
+    ('<html></html>', {"Server": "gunicorn", "X-Powered-By": "PHP/8.2"}),
+]
+
+@pytest.mark.parametrize("html, headers", SAMPLES)
+def test_compiled_engine_matches_rule_by_rule_evaluation(html, headers):
+    engine = load_database().engine
+    document = ParsedDocument(html)
+    compiled = [rule.id for rule in engine.match(document, headers)]
+    assert compiled == naive_match(engine.fingerprints, document, headers)
+
+def test_conditional_rules_follow_declaration_order():
+    rules = [
+        Fingerprint(id="php", signal="header", key="x-powered-by", contains="php"),
+        Fingerprint(id="laravel-cookie", signal="cookie", contains="laravel_session"),
+        Fingerprint(id="plain-php", signal="derived", requires=("php",), excludes=("laravel-cookie",)),
+    ]
+    engine = FingerprintEngine(rules)
+    document = ParsedDocument("<html></html>")
+    assert [r.id for r in engine.match(document, {"X-Powered-By": "PHP/8"})] == ["php", "plain-php"]
+    matched = engine.match(document, {"X-Powered-By": "PHP/8", "Set-Cookie": "laravel_session=1"})
+    assert [r.id for r in matched] == ["php", "laravel-cookie"]
+
+def test_unknown_signal_is_rejected():
+    with pytest.raises(ValueError):
+        FingerprintEngine([Fingerprint(id="x", signal="body")])
@@ -0,0 +1,78 @@
+from typing import Dict, List, Optional, Set
+
+from backend_hunter.application.bulk_scan import BulkScanUseCase, journal_to_dataframe
+from backend_hunter.application.ports import FetchError, FetchResult, IScraper
+from backend_hunter.infrastructure.analysis.analyzer_service import AnalyzerService
+from backend_hunter.infrastructure.journal.sqlite_journal import SQLiteScanJournal
+
+HTML = "<html><body><p>Palma 07001</p></body></html>"
+
+class FlakyScraper(IScraper):
+    def __init__(self, down: Set[str]):
+        self.down = down
+        self.fetched: List[str] = []
+
+    async def fetch_page(self, url: str) -> str:
+        return HTML
+
+    async def get_headers(self, url: str) -> Dict[str, str]:
+        return {}
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        self.fetched.append(url)
+        if url in self.down:
+            raise FetchError("connection refused", "connect")
+        return FetchResult(url=url, final_url=url, status_code=200, headers={}, content=HTML)
+
+URLS = [f"https://site{i}.test/" for i in range(6)]
+
+async def _run(scraper, path, urls, resume):
+    journal = SQLiteScanJournal(str(path))
+    try:
+        bulk = BulkScanUseCase(scraper, AnalyzerService(), concurrency=2)
+        return await bulk.execute_stream(urls, journal=journal, resume=resume)
+    finally:
+        journal.close()
+
+async def test_resume_only_rescans_failed_rows(tmp_path):
+    path = tmp_path / "journal.sqlite"
+    first = await _run(FlakyScraper({URLS[1], URLS[4]}), path, URLS, resume=False)
+    assert (first.success, first.errors) == (4, 2)
+
+    # Proceso nuevo: el diario se lee de disco
+    scraper = FlakyScraper(set())
+    second = await _run(scraper, path, URLS, resume=True)
+    assert sorted(scraper.fetched) == [URLS[1], URLS[4]]
+    assert (second.resumed, second.success, second.errors) == (4, 2, 0)
+
+    journal = SQLiteScanJournal(str(path))
+    try:
+        df = journal_to_dataframe(journal)
+    finally:
+        journal.close()
+    assert df["url"].tolist() == URLS
+    assert set(df["status"]) == {"success"}
+
+async def test_resume_rescans_rows_whose_input_changed(tmp_path):
+    path = tmp_path / "journal.sqlite"
+    await _run(FlakyScraper(set()), path, URLS, resume=False)
+
+    edited = URLS[:2] + ["https://other.test/"] + URLS[3:]
+    scraper = FlakyScraper(set())
+    summary = await _run(scraper, path, edited, resume=True)
+    assert scraper.fetched == ["https://other.test/"]
+    assert summary.resumed == 5
+
+async def test_run_without_resume_starts_a_new_journal(tmp_path):
+    path = tmp_path / "journal.sqlite"
+    await _run(FlakyScraper(set()), path, URLS, resume=False)
+    scraper = FlakyScraper(set())
+    summary = await _run(scraper, path, URLS[:2], resume=False)
+    assert summary.resumed == 0
+    assert len(scraper.fetched) == 2
+
+    journal = SQLiteScanJournal(str(path))
+    try:
+        assert [row["url"] for row in journal.rows()] == URLS[:2]
+    finally:
+        journal.close()
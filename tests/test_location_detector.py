@@ -0,0 +1,52 @@
+import pytest
+
+from backend_hunter.infrastructure.analysis.document import ParsedDocument
+from backend_hunter.infrastructure.analysis.location_detector import LocationDetector
+
+JSON_LD = ('<script type="application/ld+json">{"@graph": [{"@type": "Organization", '
+           '"address": {"@type": "PostalAddress", "postalCode": "07800"}}]}</script>')
+
+@pytest.mark.parametrize("html, expected", [
+    # Sin candidatos: termina en el nivel 1
+    ("<html><body><p>Calle Mayor 5, 28013 Madrid</p></body></html>", None),
+    # Fuentes estructuradas, por orden de fiabilidad
+    (f"<html><head>{JSON_LD}</head><body><p>Ref 07111</p></body></html>", ("07800", "JSON-LD")),
+    ('<html><body><span itemprop="postalCode">07002</span></body></html>', ("07002", "microdatos")),
+    ('<html><body><address>Carrer Major 3<br>07701 Maó</address></body></html>', ("07701", "<address>")),
+    ('<html><body><footer>Passeig 1 &middot; 07001</footer></body></html>', ("07001", "pie")),
+    # Texto visible con una dirección delante o una mención a las islas
+    ("<html><body><p>Oficinas: C/ Sant Miquel 12, 07002</p></body></html>", ("07002", "contenido")),
+    ("<html><body><p>Estamos en Mallorca. CP 07300.</p></body></html>", ("07300", "contenido")),
+    ("<html><body><p>Pedido 07123 enviado</p></body></html>", None),
+    # Otros números con forma de CP
+    ("<html><body><p>Mallorca. Tel. 971 07123</p></body></html>", None),
+    ("<html><body><p>Mallorca. Desde 07123 €</p></body></html>", None),
+    ("<html><body><p>Mallorca. Ref: 07123</p></body></html>", None),
+    ("<html><body><p>Mallorca. 1207123456</p></body></html>", None),
+    # Dentro de atributos o de scripts
+    ('<html><body><img src="/img/07123.png"><p>Mallorca</p></body></html>', None),
+    ('<html><body><script>var id = 07123;</script><p>Mallorca</p></body></html>', None),
+])
+def test_postal_code_tiers(html, expected):
+    found = LocationDetector().locate(html)
+    if expected is None:
+        assert found is None
+    else:
+        code, source = expected
+        assert found[0] == code
+        assert source in found[1]
+
+def test_legal_links_are_ranked_and_stay_on_site():
+    html = """<html><body>
+        <a href="/quienes-somos">Sobre</a>
+        <a href="https://www.example.test/contacto#form">Contacto</a>
+        <a href="https://other.test/aviso-legal">Externo</a>
+        <a href="/aviso-legal">Aviso legal</a>
+        <a href="mailto:info@example.test">Correo</a>
+    </body></html>"""
+    links = LocationDetector().find_legal_links(ParsedDocument(html), "https://example.test/")
+    assert links == [
+        "https://example.test/aviso-legal",
+        "https://www.example.test/contacto",
+        "https://example.test/quienes-somos",
+    ]
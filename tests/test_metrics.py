@@ -0,0 +1,62 @@
+import re
+
+import pytest
+
+from backend_hunter.application.metrics import Histogram, ScanMetrics
+from backend_hunter.application.ports import CacheStats
+from backend_hunter.domain.entities import Company
+from backend_hunter.infrastructure.api import prometheus
+
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_]\w*="(?:[^"\\]|\\.)*",?)*\})? \S+$')
+
+def _company(timings, rules=(), error=None, cache_status=None) -> Company:
+    company = Company(url="https://example.test/", scan_error=error,
+                      error_class="timeout" if error else None, cache_status=cache_status)
+    company.timings = dict(timings)
+    company.matched_rules = list(rules)
+    return company
+
+@pytest.fixture
+def metrics() -> ScanMetrics:
+    metrics = ScanMetrics(buckets=(0.01, 0.1, 1.0))
+    metrics.observe(_company({"fetch": 0.005, "tech": 0.002}, rules=["php-powered", "wordpress-generator"]))
+    metrics.observe(_company({"fetch": 0.5, "tech": 0.02}, rules=["php-powered"]))
+    metrics.observe(_company({"fetch": 2.0}, error="timed out"))
+    metrics.observe(_company({}, rules=["php-powered"], cache_status="hit"))
+    return metrics
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    histogram = Histogram((1.0, 2.0))
+    for value in (0.5, 1.5, 1.5, 3.0):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1]
+    assert histogram.quantile(0.5) == pytest.approx(1.5)
+    assert histogram.quantile(1.0) == 2.0
+    assert histogram.mean == pytest.approx(1.625)
+
+def test_scans_and_rule_hits_are_counted(metrics):
+    assert metrics.scans == {("success", ""): 2, ("error", "timeout"): 1, ("cached", ""): 1}
+    # Los resultados servidos de caché no cuentan coincidencias
+    assert metrics.rule_hits == {"php-powered": 2, "wordpress-generator": 1}
+    assert [row["stage"] for row in metrics.summary()] == ["fetch", "tech"]
+
+def test_exposition_format_is_valid_and_cumulative(metrics):
+    body = prometheus.render(metrics, cache=CacheStats(hits=3, stale=1, misses=2))
+    lines = body.splitlines()
+    assert body.endswith("\n")
+    for line in lines:
+        assert line.startswith("# HELP ") or line.startswith("# TYPE ") or SAMPLE.match(line), line
+
+    assert "# TYPE hunter_stage_seconds histogram" in lines
+    buckets = [line for line in lines if line.startswith('hunter_stage_seconds_bucket{stage="fetch"')]
+    assert [float(line.rsplit(" ", 1)[1]) for line in buckets] == [1, 1, 2, 3]
+    assert buckets[-1].startswith('hunter_stage_seconds_bucket{stage="fetch",le="+Inf"}')
+    assert 'hunter_stage_seconds_count{stage="fetch"} 3' in lines
+    assert 'hunter_scans_total{outcome="error",error_class="timeout"} 1' in lines
+    assert 'hunter_rule_hits_total{rule="php-powered"} 2' in lines
+    assert 'hunter_scan_cache_total{result="stale"} 1' in lines
+
+def test_label_values_are_escaped():
+    metrics = ScanMetrics()
+    metrics.rule_hits['we"ird\\rule'] += 1
+    assert 'hunter_rule_hits_total{rule="we\\"ird\\\\rule"} 1' in prometheus.render(metrics).splitlines()
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from backend_hunter.domain.entities import Company
+from backend_hunter.infrastructure.analysis.analyzer_service import AnalyzerService
+from backend_hunter.infrastructure.analysis.fingerprint_db import DEFAULT_DATABASE_PATH, FingerprintStore
+from backend_hunter.infrastructure.analysis.process_pool import ProcessPoolAnalyzer
+
+PAGES = [
+    ('<html><head><meta name="generator" content="WordPress 6.4"></head>'
+     '<body><a href="/aviso-legal">Aviso legal</a><p>Palma 07001</p></body></html>', {}),
+    ('<html><head><script id="__NEXT_DATA__"></script></head></html>', {"x-powered-by": "Express"}),
+    ('<html><form><input name="csrfmiddlewaretoken"></form><p>Madrid 28001</p></html>', {}),
+]
+
+def _summary(company: Company):
+    return (company.detected_stacks, company.detected_frameworks, company.compliance_status,
+            company.postal_code, company.matched_rules)
+
+@pytest.fixture
+def pool(tmp_path):
+    store = FingerprintStore(DEFAULT_DATABASE_PATH, tmp_path)
+    with ProcessPoolAnalyzer(workers=1, fingerprints=store) as analyzer:
+        yield analyzer
+
+async def test_pool_results_match_in_process_analysis(pool):
+    local = AnalyzerService(fingerprints=pool.fingerprints)
+    for html, headers in PAGES:
+        remote = await pool.analyze_async(html, headers, Company(url="https://example.test/"))
+        expected = local.analyze(html, headers, Company(url="https://example.test/"))
+        assert _summary(remote) == _summary(expected)
+        assert await pool.find_legal_links(html, "https://example.test/") == \
+            local.legal_links(html, "https://example.test/", 3)
+
+async def test_workers_follow_a_reload_in_the_main_process(tmp_path):
+    rules = tmp_path / "rules.json"
+    rules.write_text(json.dumps({"fingerprints": []}), encoding="utf-8")
+    store = FingerprintStore(rules, tmp_path / "cache")
+    with ProcessPoolAnalyzer(workers=1, fingerprints=store) as analyzer:
+        headers = {"x-powered-by": "PHP/8.2"}
+        assert not (await analyzer.analyze_async("<html></html>", headers, Company(url=""))).detected_stacks
+
+        rules.write_text(json.dumps({"fingerprints": [
+            {"id": "php", "signal": "header", "key": "x-powered-by", "contains": "php", "stack": "PHP"},
+        ]}), encoding="utf-8")
+        assert store.reload()
+        company = await analyzer.analyze_async("<html></html>", headers, Company(url=""))
+        assert company.matched_rules == ["php"]
@@ -0,0 +1,71 @@
+import pytest
+
+from backend_hunter.application.bulk_scan import error_row, export_report
+from backend_hunter.application.ports import FetchError
+from backend_hunter.application.report_writers import (
+    REPORT_COLUMNS, ArrowReportWriter, ParquetReportWriter, ReportColumns, open_report_writer,
+)
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq  # noqa: E402
+
+def _row(i: int):
+    return {
+        'url': f"https://site{i}.test/", 'status': 'success', 'error': '',
+        'tech_stacks': ['PHP', 'Node.js', 'PHP, Python'][i % 3], 'frameworks': '',
+        'compliance': 'Compliant', 'postal_code': '07001', 'scanned_at': '2024-05-01T10:00:00.123456',
+        'cache': 'miss', 'pages': 2, 'truncated': i % 2 == 0, 'attempts': 1, 'error_class': '',
+        'ips': '192.0.2.1', 'stack_mask': 1 << (i % 3), 'framework_mask': 0,
+    }
+
+ROWS = [_row(i) for i in range(5)] + [error_row("https://down.test/", FetchError("refused", "connect", 3))]
+
+def _read(path, format):
+    if format == 'parquet':
+        return pq.read_table(str(path))
+    with pa.ipc.open_file(str(path)) as reader:
+        return reader.read_all()
+
+@pytest.mark.parametrize("writer_class, format", [(ParquetReportWriter, 'parquet'), (ArrowReportWriter, 'arrow')])
+def test_columnar_writers_round_trip_typed_columns(tmp_path, writer_class, format):
+    path = tmp_path / f"report.{format}"
+    # Lotes pequeños: los diccionarios crecen entre lotes
+    with writer_class(str(path), batch_size=2) as writer:
+        for row in ROWS:
+            writer.write(row)
+
+    table = _read(path, format)
+    assert table.column_names == REPORT_COLUMNS
+    assert pa.types.is_dictionary(table.schema.field('tech_stacks').type)
+    assert table.schema.field('stack_mask').type == pa.uint16()
+    assert table.schema.field('pages').type == pa.int16()
+    assert table.schema.field('truncated').type == pa.bool_()
+    assert pa.types.is_timestamp(table.schema.field('scanned_at').type)
+
+    rows = table.to_pylist()
+    assert [r['url'] for r in rows] == [r['url'] for r in ROWS]
+    assert [r['tech_stacks'] for r in rows] == [r['tech_stacks'] for r in ROWS]
+    assert [r['truncated'] for r in rows] == [r['truncated'] for r in ROWS]
+    assert rows[-1]['attempts'] == 3 and rows[-1]['error_class'] == 'connect'
+
+def test_dataframe_uses_compact_dtypes():
+    columns = ReportColumns()
+    for row in ROWS:
+        columns.append(row)
+    df = columns.to_dataframe()
+    assert str(df['tech_stacks'].dtype) == 'category'
+    assert str(df['stack_mask'].dtype) == 'uint16'
+    assert str(df['scanned_at'].dtype).startswith('datetime64')
+    assert df['tech_stacks'].tolist() == [r['tech_stacks'] for r in ROWS]
+
+@pytest.mark.parametrize("format", ['parquet', 'arrow'])
+def test_export_keeps_the_same_schema_as_the_stream_writers(tmp_path, format):
+    columns = ReportColumns()
+    for row in ROWS:
+        columns.append(row)
+    exported, streamed = tmp_path / f"full.{format}", tmp_path / f"stream.{format}"
+    export_report(columns.to_dataframe(), str(exported), format)
+    with open_report_writer(str(streamed), format) as writer:
+        for row in ROWS:
+            writer.write(row)
+    assert _read(exported, format).schema.equals(_read(streamed, format).schema)
@@ -0,0 +1,94 @@
+import httpx
+import pytest
+
+from backend_hunter.application.ports import FetchError
+from backend_hunter.infrastructure.scraping.retry import CircuitBreaker, RetryPolicy, classify_error, counts_against_host
+from backend_hunter.infrastructure.scraping.scraper import AsyncWebScraper
+
+def _mocked(handler, **options) -> AsyncWebScraper:
+    scraper = AsyncWebScraper(**options)
+    scraper._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return scraper
+
+def _replies(*statuses):
+    """Handler que contesta con `statuses` en orden (el último se repite)."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = statuses[min(len(calls), len(statuses) - 1)]
+        calls.append(request.url.host)
+        if status == 0:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(status, headers={"content-type": "text/html"}, content=b"<html></html>")
+
+    return handler, calls
+
+@pytest.mark.parametrize("method, error_class, retryable", [
+    ("GET", "timeout", True),
+    ("GET", "connect", True),
+    ("HEAD", "http_503", True),
+    ("GET", "http_429", True),
+    ("GET", "http_404", False),
+    ("GET", "dns", False),
+    ("POST", "timeout", False),
+])
+def test_only_transient_failures_of_idempotent_methods_are_retried(method, error_class, retryable):
+    assert RetryPolicy().is_retryable(method, error_class) is retryable
+
+def test_backoff_is_capped_full_jitter():
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+    for attempt, cap in ((1, 1.0), (2, 2.0), (3, 4.0), (10, 5.0)):
+        delays = [policy.backoff(attempt) for _ in range(200)]
+        assert all(0 <= d <= cap for d in delays)
+
+def test_errors_are_classified_for_reports():
+    request = httpx.Request("GET", "http://example.test/")
+    assert classify_error(httpx.ConnectTimeout("t", request=request)) == "timeout"
+    assert classify_error(httpx.ConnectError("[Errno -2] Name or service not known", request=request)) == "dns"
+    assert classify_error(httpx.ConnectError("refused", request=request)) == "connect"
+    assert not counts_against_host("http_404") and not counts_against_host("http_429")
+    assert counts_against_host("http_502")
+
+async def test_transient_status_is_retried_until_success():
+    handler, calls = _replies(503, 503, 200)
+    async with _mocked(handler, retry=RetryPolicy(max_attempts=3, base_delay=0)) as scraper:
+        result = await scraper.fetch("http://example.test/")
+    assert (result.status_code, result.attempts, len(calls)) == (200, 3, 3)
+    assert scraper.retries == 2
+
+async def test_client_errors_are_not_retried():
+    handler, calls = _replies(404)
+    async with _mocked(handler, retry=RetryPolicy(max_attempts=3, base_delay=0)) as scraper:
+        with pytest.raises(FetchError) as error:
+            await scraper.fetch("http://example.test/")
+    assert (error.value.error_class, error.value.attempts, len(calls)) == ("http_404", 1, 1)
+
+async def test_open_circuit_fails_fast_and_a_successful_probe_closes_it():
+    handler, calls = _replies(0, 0, 200)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    async with _mocked(handler, retry=RetryPolicy(max_attempts=1), breaker=breaker) as scraper:
+        for _ in range(2):
+            with pytest.raises(FetchError):
+                await scraper.fetch("http://down.test/")
+        with pytest.raises(FetchError) as error:
+            await scraper.fetch("http://down.test/")
+        assert error.value.error_class == "circuit_open"
+        assert len(calls) == 2
+        assert breaker.open_hosts == 1
+
+        # Otros hosts no se ven afectados
+        assert (await scraper.fetch("http://up.test/")).status_code == 200
+
+        breaker.reset_timeout = 0
+        assert (await scraper.fetch("http://down.test/")).status_code == 200
+        assert breaker.open_hosts == 0
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure("a.test")
+    assert breaker.allow("a.test")
+    # Solo una prueba a la vez
+    assert not breaker.allow("a.test")
+    breaker.record_failure("a.test")
+    assert breaker.open_hosts == 1
+    assert breaker.allow("a.test")
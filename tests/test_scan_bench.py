@@ -0,0 +1,37 @@
+import socket
+import sys
+from pathlib import Path
+
+import pytest
+
+# Los benchmarks son scripts (importan `web_farm` como módulo hermano)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+from scan_bench import compare, run_scenario  # noqa: E402
+from web_farm import FarmConfig, WebFarm  # noqa: E402
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@pytest.mark.parametrize("scenario", ["bulk", "api"])
+def test_scenario_matches_the_farm_ground_truth(scenario, tmp_path, monkeypatch):
+    monkeypatch.setenv("HUNTER_JOB_STORE", str(tmp_path / "jobs.sqlite"))
+    monkeypatch.setenv("HUNTER_CACHE_DIR", str(tmp_path / "cache"))
+    config = FarmConfig(sites=40, latency_ms=1, page_kb=4, large_kb=64, single_host=True)
+    with WebFarm(config, port=_free_port()) as farm:
+        result = run_scenario(scenario, config, farm.port, count=40, concurrency=8)
+    assert result["success"] + result["errors"] == 40
+    assert result["errors"] > 0  # la semilla 42 incluye sitios con 500
+    assert result["accuracy"] == 1.0
+    assert result["urls_per_sec"] > 0 and result["p99_ms"] >= result["p50_ms"]
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {"scenarios": {"bulk": {"urls_per_sec": 100, "p99_ms": 50, "peak_rss_mb": 80, "accuracy": 1.0}}}
+    current = {"scenarios": {
+        "bulk": {"urls_per_sec": 95, "p99_ms": 70, "peak_rss_mb": 60, "accuracy": 0.99},
+        "api": {"urls_per_sec": 1, "accuracy": 1.0},
+    }}
+    regressions = compare(current, baseline, tolerance=0.1)
+    assert [line.split(":")[0] for line in regressions] == ["bulk.p99_ms", "bulk.accuracy"]
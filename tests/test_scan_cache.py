@@ -0,0 +1,31 @@
+import time
+
+from backend_hunter.application.ports import CachedScan
+from backend_hunter.domain.entities import Company
+from backend_hunter.domain.enums import BackendStack
+from backend_hunter.infrastructure.cache.scan_cache import SQLiteScanCache, company_from_dict
+
+async def test_entry_survives_restart_with_scan_metadata(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    company = Company(
+        url="https://example.test/", detected_stacks={BackendStack.PHP},
+        pages_scanned=3, truncated=True, ip_addresses=["192.0.2.1"],
+    )
+    cache = SQLiteScanCache(path)
+    await cache.put("example.test/", CachedScan(company=company, content_hash="abc", stored_at=time.time()))
+    cache.close()
+
+    # Proceso nuevo: sin la LRU en memoria, se lee de SQLite
+    cache = SQLiteScanCache(path)
+    try:
+        restored = (await cache.get("example.test/")).company
+    finally:
+        cache.close()
+    assert restored.detected_stacks == {BackendStack.PHP}
+    assert restored.pages_scanned == 3
+    assert restored.truncated is True
+    assert restored.ip_addresses == ["192.0.2.1"]
+
+def test_entries_without_scan_metadata_use_defaults():
+    company = company_from_dict({"url": "https://example.test/"})
+    assert (company.pages_scanned, company.truncated, company.ip_addresses) == (0, False, [])
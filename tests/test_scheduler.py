@@ -0,0 +1,109 @@
+import asyncio
+import time
+from email.utils import formatdate
+
+import httpx
+import pytest
+
+from backend_hunter.infrastructure.scraping.scheduler import AdaptiveLimiter, RequestScheduler, parse_retry_after
+
+async def _request(scheduler: RequestScheduler, url: str) -> None:
+    async with scheduler.slot(url):
+        pass
+
+async def test_per_host_rate_spaces_sequential_requests():
+    scheduler = RequestScheduler(per_host_rate=20)
+    start = time.monotonic()
+    for _ in range(4):
+        await _request(scheduler, "http://example.test/")
+    # 4 peticiones a 20/s: tres esperas de 50 ms aunque no se solapen
+    assert time.monotonic() - start >= 0.14
+    assert scheduler.stats.rate_waits == 3
+
+async def test_per_host_rate_spaces_concurrent_requests():
+    scheduler = RequestScheduler(per_host_rate=20)
+    start = time.monotonic()
+    await asyncio.gather(*(_request(scheduler, "http://example.test/") for _ in range(4)))
+    assert time.monotonic() - start >= 0.14
+
+async def test_rate_is_per_host():
+    scheduler = RequestScheduler(per_host_rate=1)
+    start = time.monotonic()
+    for host in ("a.test", "b.test", "c.test"):
+        await _request(scheduler, f"http://{host}/")
+    assert time.monotonic() - start < 0.5
+    assert scheduler.stats.rate_waits == 0
+
+async def test_idle_hosts_are_pruned_once_their_slot_expires(monkeypatch):
+    monkeypatch.setattr("backend_hunter.infrastructure.scraping.scheduler.PRUNE_INTERVAL", 0.0)
+    scheduler = RequestScheduler()
+    await _request(scheduler, "http://a.test/")
+    await _request(scheduler, "http://b.test/")
+    # Sin ritmo ni Retry-After, el estado de a.test ya no hace falta
+    assert set(scheduler._hosts) == {"b.test"}
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(formatdate(time.time() + 60, usegmt=True)) == pytest.approx(60, abs=2)
+    assert parse_retry_after(formatdate(time.time() - 60, usegmt=True)) == 0.0
+    assert parse_retry_after("mañana") is None
+    assert parse_retry_after(None) is None
+
+async def test_retry_after_blocks_only_the_affected_host():
+    scheduler = RequestScheduler()
+    async with scheduler.slot("http://busy.test/") as slot:
+        slot.observe(httpx.Response(429, headers={"Retry-After": "1"}))
+    start = time.monotonic()
+    await _request(scheduler, "http://other.test/")
+    assert time.monotonic() - start < 0.5
+    await _request(scheduler, "http://busy.test/")
+    assert time.monotonic() - start >= 0.9
+    assert scheduler.stats.retry_after_waits == 1
+    assert scheduler.stats.congested == 1
+
+async def test_per_host_concurrency_is_capped():
+    scheduler = RequestScheduler(max_per_host=2)
+    active = peak = 0
+
+    async def request(url):
+        nonlocal active, peak
+        async with scheduler.slot(url):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(request("http://a.test/") for _ in range(6)))
+    assert peak == 2
+
+async def test_adaptive_limit_grows_while_healthy_and_backs_off_on_congestion():
+    limiter = AdaptiveLimiter(minimum=2, maximum=20, initial=4, increase=2, decrease=0.5)
+
+    async def window(congested: bool):
+        for _ in range(limiter.limit):
+            await limiter.acquire()
+            await limiter.release(0.01, congested)
+
+    await window(False)
+    assert limiter.limit == 6
+    await window(True)
+    assert limiter.limit == 3
+    for _ in range(3):
+        await window(True)
+    assert limiter.limit == 2
+
+async def test_adaptive_limit_caps_requests_in_flight():
+    limiter = AdaptiveLimiter(minimum=1, maximum=3, initial=3)
+    scheduler = RequestScheduler(max_per_host=10, limiter=limiter)
+    active = peak = 0
+
+    async def request(i):
+        nonlocal active, peak
+        async with scheduler.slot(f"http://site{i}.test/"):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(request(i) for i in range(10)))
+    assert peak == 3
@@ -0,0 +1,155 @@
+import asyncio
+
+import httpx
+import pytest
+
+from backend_hunter.application.ports import FetchError
+from backend_hunter.infrastructure.scraping.retry import CircuitBreaker, RetryPolicy
+from backend_hunter.infrastructure.scraping.scraper import AsyncWebScraper
+
+MAX_BYTES = 1024
+
+def _mocked(handler, **options) -> AsyncWebScraper:
+    """Scraper cuyas peticiones responde `handler` (sin red)."""
+    scraper = AsyncWebScraper(**options)
+    scraper._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return scraper
+
+def _scraper(body: bytes) -> AsyncWebScraper:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"content-type": "text/html"}, content=body)
+
+    return _mocked(handler, max_bytes=MAX_BYTES)
+
+@pytest.mark.parametrize("size, truncated", [(MAX_BYTES - 1, False), (MAX_BYTES, False), (MAX_BYTES + 1, True)])
+async def test_body_is_truncated_only_beyond_max_bytes(size, truncated):
+    async with _scraper(b"a" * size) as scraper:
+        result = await scraper.fetch("http://example.test/")
+    assert len(result.content) == min(size, MAX_BYTES)
+    assert result.truncated is truncated
+
+def _failing_scraper(handler) -> AsyncWebScraper:
+    return _mocked(handler, retry=RetryPolicy(max_attempts=1), breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0))
+
+async def test_cancelled_half_open_probe_does_not_block_the_host():
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            return httpx.Response(503)
+        if calls == 2:
+            await asyncio.sleep(10)  # la prueba semiabierta se cancela aquí
+        return httpx.Response(200, headers={"content-type": "text/html"}, content=b"<html></html>")
+
+    async with _failing_scraper(handler) as scraper:
+        with pytest.raises(FetchError):
+            await scraper.fetch("http://down.test/")
+        probe = asyncio.create_task(scraper.fetch("http://down.test/"))
+        await asyncio.sleep(0.05)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        assert (await scraper.fetch("http://down.test/")).status_code == 200
+
+async def test_probe_failing_with_unexpected_error_releases_the_host():
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            return httpx.Response(503)
+        if calls == 2:
+            raise ValueError("fallo ajeno al host")
+        return httpx.Response(200, headers={"content-type": "text/html"}, content=b"<html></html>")
+
+    async with _failing_scraper(handler) as scraper:
+        with pytest.raises(FetchError):
+            await scraper.fetch("http://down.test/")
+        with pytest.raises(ValueError):
+            await scraper.fetch("http://down.test/")
+        assert (await scraper.fetch("http://down.test/")).status_code == 200
+
+async def test_requests_share_one_pooled_client(site):
+    url = site.add("/", "<html></html>")
+    async with AsyncWebScraper(http2=False) as scraper:
+        client = scraper._client
+        for _ in range(3):
+            await scraper.fetch(url)
+        assert scraper._client is client
+    # Una conexión abierta y reutilizada por las dos siguientes peticiones
+    assert (scraper.stats.misses, scraper.stats.hits) == (1, 2)
+
+async def test_close_releases_the_client_and_a_new_one_is_created_lazily(site):
+    url = site.add("/", "<html></html>")
+    scraper = AsyncWebScraper(http2=False)
+    await scraper.fetch(url)
+    await scraper.aclose()
+    assert scraper._client is None
+    assert (await scraper.fetch(url)).status_code == 200
+    await scraper.aclose()
+
+async def test_fetch_takes_headers_from_the_page_get(site):
+    url = site.add("/", "<html></html>", headers={"X-Powered-By": "PHP/8.2", "Set-Cookie": "PHPSESSID=1; Path=/"})
+    async with AsyncWebScraper(http2=False) as scraper:
+        result = await scraper.fetch(url)
+    # Una sola petición: sin HEAD ni segundo GET para las cabeceras
+    assert [(method, path) for method, path, _ in site.requests] == [("GET", "/")]
+    assert result.headers["x-powered-by"] == "PHP/8.2"
+    assert result.set_cookies == ["PHPSESSID=1; Path=/"]
+
+async def test_multiple_set_cookie_headers_are_kept_one_per_line():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers=[
+            ("content-type", "text/html"),
+            ("set-cookie", "a=1; Expires=Wed, 01 Jan 2031 00:00:00 GMT"),
+            ("set-cookie", "laravel_session=2"),
+        ], content=b"<html></html>")
+
+    async with _mocked(handler) as scraper:
+        result = await scraper.fetch("http://example.test/")
+    assert result.headers["set-cookie"].splitlines() == ["a=1; Expires=Wed, 01 Jan 2031 00:00:00 GMT", "laravel_session=2"]
+
+async def test_non_html_is_rejected_without_analysis():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"content-type": "application/pdf"}, content=b"%PDF")
+
+    async with _mocked(handler) as scraper:
+        with pytest.raises(FetchError) as error:
+            await scraper.fetch("http://example.test/doc.pdf")
+    assert error.value.error_class == "content_type"
+
+def _chunked(chunks, pulled):
+    """Cuerpo servido por trozos; `pulled` cuenta los que el cliente llegó a pedir."""
+    async def body():
+        for chunk in chunks:
+            pulled.append(chunk)
+            yield chunk
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"content-type": "text/html"}, content=body())
+
+    return handler
+
+@pytest.mark.parametrize("head", [
+    [b"<html><head><title>x</title></head>"],
+    [b"<html><head><title>x</title></he", b"ad>"],  # </head> partido entre trozos
+])
+async def test_head_kb_stops_reading_once_the_head_is_closed(head):
+    chunks = head + [b"<body>" + b"a" * 1024] * 50
+    pulled = []
+    async with _mocked(_chunked(chunks, pulled), head_kb=1) as scraper:
+        result = await scraper.fetch("http://example.test/")
+    assert result.truncated
+    assert "</head>" in result.content
+    assert len(pulled) < len(chunks)
+
+async def test_head_kb_reads_the_whole_page_without_a_head_end():
+    chunks = [b"<html><body>" + b"a" * 1024] * 5
+    pulled = []
+    async with _mocked(_chunked(chunks, pulled), head_kb=1) as scraper:
+        result = await scraper.fetch("http://example.test/")
+    assert not result.truncated
+    assert len(pulled) == len(chunks)
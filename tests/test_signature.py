@@ -0,0 +1,36 @@
+from backend_hunter.infrastructure.analysis.fingerprint_db import parse_database
+from backend_hunter.infrastructure.analysis.signature import ContentSignature
+
+DATABASE = parse_database({
+    "fingerprints": [
+        {"id": "wp-old", "signal": "script", "regex": r"jquery\.js\?ver=1\.", "stack": "PHP"},
+        {"id": "pref-legacy", "signal": "cookie", "contains": "legacy=1", "stack": "Java"},
+        {"id": "generator", "signal": "meta", "key": "generator", "contains": "WordPress", "stack": "PHP"},
+    ],
+})
+
+def _signature(html: str, headers=None) -> str:
+    return ContentSignature(DATABASE).compute(html, headers or {})
+
+def test_cache_buster_query_does_not_change_signature():
+    assert _signature('<script src="/app.js?v=1"></script>') == _signature('<script src="/app.js?v=2"></script>')
+
+def test_query_read_by_a_rule_changes_signature():
+    old = '<script src="/jquery.js?ver=1.12"></script>'
+    new = '<script src="/jquery.js?ver=3.7"></script>'
+    assert _signature(old) != _signature(new)
+
+def test_cookie_value_read_by_a_rule_changes_signature():
+    old = {"Set-Cookie": "pref=legacy=1; Path=/"}
+    new = {"Set-Cookie": "pref=legacy=0; Path=/"}
+    assert _signature("<html></html>", old) != _signature("<html></html>", new)
+
+def test_cookie_value_and_expiry_ignored_otherwise():
+    old = {"Set-Cookie": "session=abc; Path=/; Expires=Wed, 01 Jan 2025 00:00:00 GMT"}
+    new = {"Set-Cookie": "session=xyz; Path=/; Expires=Thu, 02 Jan 2025 00:00:00 GMT"}
+    assert _signature("<html></html>", old) == _signature("<html></html>", new)
+
+def test_gt_inside_quoted_attribute_does_not_end_the_tag():
+    old = '<meta data-x="a>b" name="generator" content="WordPress 6.4">'
+    new = '<meta data-x="a>b" name="generator" content="Hugo">'
+    assert _signature(old) != _signature(new)
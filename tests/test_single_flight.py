@@ -0,0 +1,86 @@
+import asyncio
+from typing import Dict, List, Optional
+
+from backend_hunter.application.bulk_scan import BulkScanUseCase
+from backend_hunter.application.ports import FetchResult, IScraper
+from backend_hunter.application.single_flight import SingleFlight
+from backend_hunter.application.use_cases import ScanCompanyUseCase
+from backend_hunter.infrastructure.analysis.analyzer_service import AnalyzerService
+
+HTML = '<html><head><meta name="generator" content="WordPress 6.4"></head></html>'
+
+class CountingScraper(IScraper):
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.fetched: List[str] = []
+
+    async def fetch_page(self, url: str) -> str:
+        return HTML
+
+    async def get_headers(self, url: str) -> Dict[str, str]:
+        return {}
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        self.fetched.append(url)
+        await asyncio.sleep(self.delay)
+        return FetchResult(url=url, final_url=url, status_code=200, headers={}, content=HTML)
+
+async def test_concurrent_calls_with_the_same_key_share_one_execution():
+    flights = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(flights.run("a", work) for _ in range(5)), flights.run("b", work))
+    assert calls == 2
+    assert [shared for _, shared in results[:5]].count(False) == 1
+    assert flights.shared == 4
+    assert len(flights) == 0
+
+async def test_cancelling_one_waiter_does_not_cancel_the_others():
+    flights = SingleFlight()
+    started = asyncio.Event()
+
+    async def work():
+        started.set()
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    first = asyncio.create_task(flights.run("a", work))
+    await started.wait()
+    second = asyncio.create_task(flights.run("a", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == ("ok", True)
+
+async def test_variants_of_the_same_site_are_scanned_once():
+    scraper = CountingScraper()
+    use_case = ScanCompanyUseCase(scraper, AnalyzerService())
+    urls = ["https://example.test/", "http://example.test", "https://www.example.test/"]
+    companies = await asyncio.gather(*(use_case.execute(url) for url in urls))
+    assert len(scraper.fetched) == 1
+    assert [c.url for c in companies] == urls
+    assert all(c.detected_stacks == companies[0].detected_stacks for c in companies)
+    assert companies[0] is not companies[1]
+
+async def test_bulk_scan_keeps_one_row_per_input_for_duplicates():
+    scraper = CountingScraper()
+    bulk = BulkScanUseCase(scraper, AnalyzerService(), concurrency=2)
+    urls = ["https://a.test/", "https://b.test/", "http://a.test", "https://www.a.test/"]
+    df = await bulk.execute(urls)
+    assert sorted(scraper.fetched) == ["https://a.test/", "https://b.test/"]
+    assert df["url"].tolist() == urls
+    assert df["tech_stacks"].tolist() == ["PHP"] * 4
+    assert bulk.duplicates == 2
+
+async def test_stream_reuses_recent_results_for_duplicates():
+    scraper = CountingScraper(delay=0)
+    bulk = BulkScanUseCase(scraper, AnalyzerService(), concurrency=1)
+    summary = await bulk.execute_stream(["https://a.test/", "https://b.test/", "https://a.test"])
+    assert summary.total == 3
+    assert len(scraper.fetched) == 2
+    assert bulk.duplicates == 1
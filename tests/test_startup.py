@@ -0,0 +1,32 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Ejecuta el CLI como `hunter` y lista los módulos pesados que quedaron cargados
+PROBE = """
+import json, sys
+from backend_hunter.infrastructure.cli.app import app
+try:
+    app(sys.argv[1:], prog_name="hunter", standalone_mode=False)
+except SystemExit:
+    pass
+print(json.dumps(sorted(m for m in ("pandas", "pyarrow") if m in sys.modules)))
+"""
+
+def loaded_heavy_modules(*args: str):
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(SRC), os.environ.get("PYTHONPATH")]))}
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, *args], capture_output=True, text=True, env=env, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+@pytest.mark.parametrize("command", [["--help"], ["scan", "--help"], ["stream", "--help"]])
+def test_cli_does_not_import_pandas_or_pyarrow(command):
+    assert loaded_heavy_modules(*command) == []
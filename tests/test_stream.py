@@ -0,0 +1,71 @@
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from backend_hunter.application.report_writers import PipeReportWriter
+from backend_hunter.application.single_flight import SingleFlight
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+HUNTER = "from backend_hunter.infrastructure.cli.app import app; app(prog_name='hunter')"
+
+def _hunter(*args: str, **options) -> subprocess.Popen:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(SRC), os.environ.get("PYTHONPATH")]))}
+    return subprocess.Popen(
+        [sys.executable, "-c", HUNTER, *args], env=env, text=True,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **options,
+    )
+
+def test_stream_reads_stdin_and_writes_one_json_line_per_result(site):
+    urls = [site.add(f"/{i}", "<html><body><p>Palma 07001</p></body></html>") for i in range(5)]
+    process = _hunter("stream", "-n", "2", "--retries", "0")
+    stdout, stderr = process.communicate("\n".join(urls + ["# comentario", ""]) + "\n", timeout=60)
+    assert process.returncode == 0, stderr
+    rows = [json.loads(line) for line in stdout.splitlines()]
+    assert sorted(row["url"] for row in rows) == sorted(urls)
+    assert {row["compliance"] for row in rows} == {"Compliant"}
+    assert "5 URLs" in stderr
+
+def test_stream_exits_quietly_when_the_consumer_closes_the_pipe(site):
+    urls = [site.add(f"/{i}", "<html></html>") for i in range(300)]
+    process = _hunter("stream", "-n", "4", "--retries", "0", "-q")
+    process.stdin.write("\n".join(urls) + "\n")
+    process.stdin.close()
+    first = process.stdout.readline()
+    assert json.loads(first)["status"] == "success"
+    process.stdout.close()  # como `| head -1`
+    assert process.wait(timeout=60) == 1
+    assert "Traceback" not in process.stderr.read()
+
+async def test_pipe_writer_only_touches_the_stream_on_drain():
+    stream = io.StringIO()
+    writer = PipeReportWriter(stream, columns=["url", "status"])
+    writer.write({"url": "https://a.test/", "status": "success", "extra": 1})
+    assert stream.getvalue() == ""
+    await writer.drain()
+    assert stream.getvalue() == '{"url": "https://a.test/", "status": "success"}\n'
+    writer.write({"url": "https://b.test/"})
+    writer.close()
+    assert stream.getvalue().splitlines()[-1] == '{"url": "https://b.test/", "status": null}'
+
+async def test_execution_is_cancelled_when_every_waiter_is_cancelled():
+    flights = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiters = [asyncio.create_task(flights.run("a", work)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert len(flights) == 0
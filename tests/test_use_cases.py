@@ -0,0 +1,149 @@
+from typing import Dict, List, Optional
+
+from backend_hunter.application.ports import FetchResult, IScraper
+from backend_hunter.application.use_cases import CrawlBudget, ScanCompanyUseCase
+from backend_hunter.domain.enums import ComplianceStatus
+from backend_hunter.infrastructure.analysis.analyzer_service import AnalyzerService
+from backend_hunter.infrastructure.cache.scan_cache import SQLiteScanCache
+
+HOME = '<html><body><a href="/aviso-legal">Aviso legal</a></body></html>'
+LEGAL = '<html><body><p>Carrer de Sant Miquel 1, 07002 Palma</p></body></html>'
+
+class FakeScraper(IScraper):
+    def __init__(self, pages: Dict[str, str]):
+        self.pages = pages
+        self.fetched: List[str] = []
+
+    async def fetch_page(self, url: str) -> str:
+        return self.pages[url]
+
+    async def get_headers(self, url: str) -> Dict[str, str]:
+        return {}
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        self.fetched.append(url)
+        return FetchResult(url=url, final_url=url, status_code=200, headers={}, content=self.pages[url])
+
+async def test_cached_plain_scan_is_not_served_to_crawl_scan(tmp_path):
+    scraper = FakeScraper({"https://example.test/": HOME, "https://example.test/aviso-legal": LEGAL})
+    analyzer = AnalyzerService()
+    cache = SQLiteScanCache(str(tmp_path / "cache.sqlite"))
+    try:
+        plain = ScanCompanyUseCase(scraper, analyzer, cache=cache)
+        crawl = ScanCompanyUseCase(scraper, analyzer, cache=cache, crawl=CrawlBudget())
+
+        first = await plain.execute("https://example.test/")
+        assert first.compliance_status != ComplianceStatus.COMPLIANT
+
+        crawled = await crawl.execute("https://example.test/")
+        assert crawled.cache_status == "miss"
+        assert crawled.compliance_status == ComplianceStatus.COMPLIANT
+        assert "https://example.test/aviso-legal" in scraper.fetched
+
+        # Cada modo tiene su entrada: los dos se sirven ya desde caché
+        assert (await plain.execute("https://example.test/")).cache_status == "hit"
+        again = await crawl.execute("https://example.test/")
+        assert again.cache_status == "hit"
+        assert again.compliance_status == ComplianceStatus.COMPLIANT
+    finally:
+        cache.close()
+
+async def test_crawl_budget_counts_bytes_not_characters():
+    # 100 «ñ» son 100 caracteres pero 200 bytes: el CP queda fuera de un presupuesto de 200 bytes
+    legal = "<html><body><p>" + "ñ" * 100 + " Carrer de Sant Miquel 1, 07002 Palma</p></body></html>"
+    scraper = FakeScraper({"https://example.test/": HOME, "https://example.test/aviso-legal": legal})
+    use_case = ScanCompanyUseCase(scraper, AnalyzerService(), crawl=CrawlBudget(max_bytes=200))
+
+    company = await use_case.execute("https://example.test/")
+
+    assert company.compliance_status != ComplianceStatus.COMPLIANT
+    assert company.pages_scanned == 2
+    assert company.truncated
+
+async def test_crawled_result_is_not_revalidated_with_the_homepage_alone(tmp_path):
+    pages = {"https://example.test/": HOME, "https://example.test/aviso-legal": LEGAL}
+    scraper = FakeScraper(pages)
+    # TTL 0: cada escaneo revalida lo que hay en caché
+    cache = SQLiteScanCache(str(tmp_path / "cache.sqlite"), ttl=0)
+    try:
+        use_case = ScanCompanyUseCase(scraper, AnalyzerService(), cache=cache, crawl=CrawlBudget())
+        assert (await use_case.execute("https://example.test/")).compliance_status == ComplianceStatus.COMPLIANT
+
+        # La portada no cambia, pero el aviso legal ya no tiene el CP
+        pages["https://example.test/aviso-legal"] = "<html><body><p>Madrid</p></body></html>"
+        company = await use_case.execute("https://example.test/")
+        assert company.cache_status == "miss"
+        assert company.compliance_status != ComplianceStatus.COMPLIANT
+    finally:
+        cache.close()
+
+async def test_homepage_only_result_is_still_revalidated_by_signature(tmp_path):
+    scraper = FakeScraper({"https://example.test/": LEGAL})
+    cache = SQLiteScanCache(str(tmp_path / "cache.sqlite"), ttl=0)
+    try:
+        use_case = ScanCompanyUseCase(scraper, AnalyzerService(), cache=cache, crawl=CrawlBudget())
+        await use_case.execute("https://example.test/")
+        company = await use_case.execute("https://example.test/")
+        assert company.cache_status == "stale"
+        assert company.compliance_status == ComplianceStatus.COMPLIANT
+    finally:
+        cache.close()
+
+class ETagScraper(FakeScraper):
+    """Sirve la portada con ETag y contesta 304 a las peticiones condicionales que coinciden."""
+    def __init__(self, pages: Dict[str, str], etag: str = '"v1"'):
+        super().__init__(pages)
+        self.etag = etag
+        self.sent: List[Optional[Dict[str, str]]] = []
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        self.fetched.append(url)
+        self.sent.append(headers)
+        if headers and headers.get("If-None-Match") == self.etag:
+            return FetchResult(url=url, final_url=url, status_code=304, headers={"etag": self.etag}, content="")
+        return FetchResult(url=url, final_url=url, status_code=200, headers={"etag": self.etag}, content=self.pages[url])
+
+async def test_fresh_entry_is_served_without_network(tmp_path):
+    scraper = ETagScraper({"https://example.test/": LEGAL})
+    cache = SQLiteScanCache(str(tmp_path / "cache.sqlite"))
+    try:
+        use_case = ScanCompanyUseCase(scraper, AnalyzerService(), cache=cache)
+        assert (await use_case.execute("https://example.test/")).cache_status == "miss"
+        company = await use_case.execute("https://example.test")
+        assert company.cache_status == "hit"
+        assert company.url == "https://example.test"
+        assert company.compliance_status == ComplianceStatus.COMPLIANT
+        assert len(scraper.fetched) == 1
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+    finally:
+        cache.close()
+
+async def test_expired_entry_is_revalidated_with_a_conditional_request(tmp_path):
+    scraper = ETagScraper({"https://example.test/": LEGAL})
+    cache = SQLiteScanCache(str(tmp_path / "cache.sqlite"), ttl=0)
+    try:
+        use_case = ScanCompanyUseCase(scraper, AnalyzerService(), cache=cache)
+        await use_case.execute("https://example.test/")
+        company = await use_case.execute("https://example.test/")
+        assert scraper.sent[-1] == {"If-None-Match": '"v1"'}
+        assert company.cache_status == "stale"
+        assert company.compliance_status == ComplianceStatus.COMPLIANT
+        assert cache.stats.stale == 1
+    finally:
+        cache.close()
+
+async def test_changed_page_is_analyzed_again(tmp_path):
+    pages = {"https://example.test/": LEGAL}
+    scraper = ETagScraper(pages)
+    cache = SQLiteScanCache(str(tmp_path / "cache.sqlite"), ttl=0)
+    try:
+        use_case = ScanCompanyUseCase(scraper, AnalyzerService(), cache=cache)
+        await use_case.execute("https://example.test/")
+        scraper.etag = '"v2"'
+        pages["https://example.test/"] = "<html><body><p>Madrid</p></body></html>"
+        company = await use_case.execute("https://example.test/")
+        assert company.cache_status == "miss"
+        assert company.compliance_status != ComplianceStatus.COMPLIANT
+        assert company.changes
+    finally:
+        cache.close()